@@ -0,0 +1,76 @@
+import argparse
+import resource
+import time
+
+import task_03
+from universities_stub import UniversitiesServer
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def run_threads(names, base_url):
+    return len(task_03.fetch_threaded(names, base_url))
+
+
+def run_async(names, base_url, concurrency):
+    results, errors = task_03.fetch_async(
+        names, base_url=base_url, concurrency=concurrency
+    )
+    return len(results), len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[20, 200, 2000])
+    parser.add_argument("--per-country", type=int, default=50,
+                        help="universities served per country")
+    parser.add_argument("--delay", type=float, default=0.02,
+                        help="simulated server latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    print(f"server latency: {args.delay * 1000:.0f} ms, "
+          f"{args.per_country} universities per country, "
+          f"async concurrency: {args.concurrency}")
+    print(f"{'countries':>10} {'threads [s]':>12} {'connections':>12} "
+          f"{'async [s]':>10} {'connections':>12} {'speedup':>8}")
+    for size in args.sizes:
+        names = [f"Country {number:04d}" for number in range(size)]
+
+        if task_03.requests is not None:
+            with UniversitiesServer(args.per_country, args.delay) as server:
+                thread_time, fetched = timed(
+                    lambda: run_threads(names, server.base_url)
+                )
+                thread_connections = server.connections
+            assert fetched == size
+            thread_text = f"{thread_time:>12.2f} {thread_connections:>12}"
+        else:
+            thread_time = None
+            thread_text = f"{'-':>12} {'-':>12}"
+
+        with UniversitiesServer(args.per_country, args.delay) as server:
+            async_time, (fetched, failed) = timed(
+                lambda: run_async(names, server.base_url, args.concurrency)
+            )
+            async_connections = server.connections
+        assert fetched == size and not failed
+
+        speedup = (
+            f"{thread_time / async_time:>7.1f}x" if thread_time
+            else f"{'-':>8}"
+        )
+        print(f"{size:>10} {thread_text} {async_time:>10.2f} "
+              f"{async_connections:>12} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
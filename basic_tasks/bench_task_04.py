@@ -0,0 +1,165 @@
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import cpu_count
+from pathlib import Path
+
+import task_04
+
+START = 1
+STEP = 0.01
+STRAGGLER_POINTS = 2_000_000
+STRAGGLER_DELAY = 1e-6
+
+STREAM_PROBE = """
+import resource, sys, task_04
+path, start, end, step, processes = sys.argv[1:]
+count = task_04.tabulate_to_file(
+    path, float(start), float(end), float(step), int(processes)
+)
+with open("/proc/self/status") as status:
+    own = next(int(line.split()[1]) for line in status
+               if line.startswith("VmHWM:"))
+peak = max(own, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+print(count, peak)
+"""
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def run_pool(count, processes):
+    end = START + count * STEP
+    return len(task_04.tabulate_pool(START, end, STEP, processes))
+
+
+def run_shared(count, processes):
+    end = START + count * STEP
+    with task_04.tabulate_shared(START, end, STEP, processes) as results:
+        return len(results)
+
+
+def run_dynamic(count, processes, func=task_04.f_vectorized):
+    end = START + count * STEP
+    return sum(
+        len(x) for x, _ in task_04.tabulate_dynamic(
+            START, end, STEP, func, processes
+        )
+    )
+
+
+def run_static(count, processes, func):
+    end = START + count * STEP
+    with task_04.Pool(processes) as pool:
+        chunks = task_04.index_chunks(
+            task_04.point_count(START, end, STEP), processes
+        )
+        return sum(pool.starmap(
+            static_chunk, [(func, first, last) for first, last in chunks]
+        ))
+
+
+def static_chunk(func, first, last):
+    for block_first, block_last in task_04.blocks(first, last):
+        task_04.compute_block(START, STEP, block_first, block_last, func)
+    return last - first
+
+
+def f_straggler(x):
+    if x[0] < START + STRAGGLER_POINTS * STEP:
+        time.sleep(len(x) * STRAGGLER_DELAY)
+    return task_04.f_vectorized(x)
+
+
+def max_drift(count, processes):
+    end = START + count * STEP
+    legacy = task_04.tabulate_pool(START, end, STEP, processes)
+    with task_04.tabulate_shared(START, end, STEP, processes) as results:
+        size = min(len(legacy), len(results))
+        exact = task_04.np.array([x for x, _ in legacy[:size]])
+        return float(abs(exact - results[:size, 0]).max())
+
+
+def run_stream(count, processes, directory):
+    path = Path(directory) / f"tabulated-{count}.npy"
+    end = START + count * STEP
+    try:
+        output = subprocess.run(
+            [sys.executable, "-c", STREAM_PROBE, str(path), str(START),
+             str(end), str(STEP), str(processes)],
+            cwd=Path(__file__).parent, check=True, capture_output=True,
+            text=True,
+        ).stdout.split()
+        return int(output[0]), int(output[1]), path.stat().st_size
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=float, nargs="+",
+                        default=[1e6, 1e7, 1e8])
+    parser.add_argument("--pool-max", type=float, default=1e7)
+    parser.add_argument("--shared-max", type=float, default=1e8,
+                        help="largest size held in shared memory")
+    parser.add_argument("--processes", type=int, default=cpu_count())
+    parser.add_argument("--stream-dir", default=tempfile.gettempdir(),
+                        help="directory for the streamed .npy files")
+    args = parser.parse_args()
+
+    print(f"processes: {args.processes}")
+    print(f"x drift of the while loop at 1e6 points: "
+          f"{max_drift(10 ** 6, args.processes):.3e}")
+    print(f"{'points':>12} {'Pool.map [s]':>14} {'numpy+shm [s]':>14} "
+          f"{'speedup':>8}")
+    for size in args.sizes:
+        count = int(size)
+        if count > args.shared_max:
+            continue
+        shared_time, computed = timed(
+            lambda: run_shared(count, args.processes)
+        )
+        if count <= args.pool_max:
+            pool_time, _ = timed(lambda: run_pool(count, args.processes))
+            pool_text = f"{pool_time:>14.2f}"
+            speedup = f"{pool_time / shared_time:>7.1f}x"
+        else:
+            pool_text = f"{'-':>14}"
+            speedup = f"{'-':>8}"
+        print(f"{computed:>12} {pool_text} {shared_time:>14.2f} {speedup}")
+
+    print()
+    print(f"{'points':>12} {'dynamic [s]':>12} {'straggler static [s]':>21} "
+          f"{'straggler dynamic [s]':>22}")
+    for size in args.sizes:
+        count = int(size)
+        dynamic_time, computed = timed(
+            lambda: run_dynamic(count, args.processes)
+        )
+        static_slow, _ = timed(
+            lambda: run_static(count, args.processes, f_straggler)
+        )
+        dynamic_slow, _ = timed(
+            lambda: run_dynamic(count, args.processes, f_straggler)
+        )
+        print(f"{computed:>12} {dynamic_time:>12.2f} {static_slow:>21.2f} "
+              f"{dynamic_slow:>22.2f}")
+
+    print()
+    print(f"{'points':>12} {'stream [s]':>12} {'file [MiB]':>12} "
+          f"{'peak RSS [MiB]':>16}")
+    for size in args.sizes:
+        elapsed, (computed, peak_kib, file_size) = timed(
+            lambda: run_stream(int(size), args.processes, args.stream_dir)
+        )
+        print(f"{computed:>12} {elapsed:>12.2f} "
+              f"{file_size / 2 ** 20:>12.0f} {peak_kib / 1024:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
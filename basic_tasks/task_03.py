@@ -1,5 +1,21 @@
-import requests
+import argparse
+import asyncio
+import codecs
+import json
+import random
+import re
+import sqlite3
+import ssl
+import sys
 import threading
+import time
+from collections import namedtuple
+from urllib.parse import quote, urlsplit
+
+try:
+    import requests
+except ImportError:
+    requests = None
 
 BASE_URL = "http://universities.hipolabs.com/search?country="
 
@@ -11,12 +27,46 @@ countries = [
     "Switzerland", "Croatia"
 ]
 
-results = {}
-lock = threading.Lock()
+READ_SIZE = 64 * 1024
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+SEPARATORS = re.compile(r"[\s,]*")
+
+CACHE_SCHEMA = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at);
+"""
+
+CachedResponse = namedtuple(
+    "CachedResponse", "etag last_modified names fresh"
+)
+
+
+class FetchError(Exception):
+    pass
+
+
+class StatusError(FetchError):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
 
+class ProtocolError(FetchError):
+    pass
 
-def fetch_universities(country):
-    response = requests.get(BASE_URL + country)
+
+def fetch_universities(country, results, lock, base_url=BASE_URL):
+    response = requests.get(base_url + country)
     data = response.json()
 
     universities = [uni["name"] for uni in data]
@@ -24,18 +74,395 @@ def fetch_universities(country):
     with lock:
         results[country] = universities
 
-threads = []
 
-for country in countries:
-    thread = threading.Thread(
-        target=fetch_universities,
-        args=(country,)
+def fetch_threaded(countries, base_url=BASE_URL):
+    results = {}
+    lock = threading.Lock()
+    threads = []
+
+    for country in countries:
+        thread = threading.Thread(
+            target=fetch_universities,
+            args=(country, results, lock, base_url)
+        )
+        threads.append(thread)
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+class NameStream:
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.text = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.started = False
+        self.finished = False
+        self.names = []
+
+    def feed(self, data, final=False):
+        buffer = self.buffer + self.text.decode(data, final)
+        position = SEPARATORS.match(buffer).end()
+        if not self.started and position < len(buffer):
+            if buffer[position] != "[":
+                raise FetchError("Expected a JSON array")
+            self.started = True
+            position += 1
+
+        while self.started and not self.finished:
+            position = SEPARATORS.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            if buffer[position] == "]":
+                self.finished = True
+                position += 1
+                break
+            try:
+                item, position = self.decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            if not isinstance(item, dict) or not isinstance(
+                item.get("name"), str
+            ):
+                raise FetchError("University entry without a name")
+            self.names.append(item["name"])
+
+        self.buffer = buffer[position:]
+
+    def close(self):
+        self.feed(b"", final=True)
+        if not self.finished or self.buffer.strip():
+            raise FetchError("Truncated JSON response")
+        return self.names
+
+
+class ResponseCache:
+    def __init__(self, path, ttl=86_400.0, max_bytes=64 * 2 ** 20,
+                 clock=time.time):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.db = sqlite3.connect(path)
+        self.db.executescript(CACHE_SCHEMA)
+
+    def get(self, url):
+        row = self.db.execute(
+            "SELECT etag, last_modified, body, stored_at FROM responses "
+            "WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        now = self.clock()
+        self.db.execute(
+            "UPDATE responses SET used_at = ? WHERE url = ?", (now, url)
+        )
+        etag, last_modified, body, stored_at = row
+        return CachedResponse(
+            etag, last_modified, json.loads(body), now - stored_at < self.ttl
+        )
+
+    def put(self, url, etag, last_modified, names):
+        body = json.dumps(names, ensure_ascii=False)
+        size = len(url) + len(body.encode())
+        now = self.clock()
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, size, now, now),
+            )
+            self.db.execute(
+                "DELETE FROM responses WHERE url IN ("
+                "SELECT url FROM (SELECT url, SUM(size) OVER ("
+                "ORDER BY used_at DESC, url) AS running FROM responses) "
+                "WHERE running > ?)", (self.max_bytes,)
+            )
+
+    def refresh(self, url, etag, last_modified):
+        now = self.clock()
+        with self.db:
+            self.db.execute(
+                "UPDATE responses SET stored_at = ?, used_at = ?, "
+                "etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, now, etag, last_modified, url),
+            )
+
+    def size(self):
+        return self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+class ConnectionPool:
+    def __init__(self, url, size):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.https = parts.scheme == "https"
+        self.port = parts.port or (443 if self.https else 80)
+        self.size = size
+        self.idle = []
+
+    async def acquire(self):
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        context = ssl.create_default_context() if self.https else None
+        return await asyncio.open_connection(
+            self.host, self.port, ssl=context
+        )
+
+    def release(self, connection, reusable):
+        if reusable and len(self.idle) < self.size:
+            self.idle.append(connection)
+        else:
+            connection[1].close()
+
+    async def close(self):
+        idle, self.idle = self.idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+async def read_head(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed before the response")
+    try:
+        version, status, *_ = status_line.decode("latin-1").split()
+    except ValueError:
+        raise ProtocolError(f"Malformed status line {status_line!r}") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return version, parse_size(status, "status"), headers
+
+
+def parse_size(value, what, base=10):
+    try:
+        size = int(value, base)
+    except ValueError:
+        size = -1
+    if size < 0:
+        raise ProtocolError(f"Malformed {what} {value!r}")
+    return size
+
+
+async def iter_body(reader, headers):
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            line = await reader.readline()
+            size = parse_size(line.split(b";")[0], "chunk size", 16)
+            if size == 0:
+                while await reader.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            yield await reader.readexactly(size)
+            await reader.readexactly(2)
+    elif "content-length" in headers:
+        remaining = parse_size(headers["content-length"], "content length")
+        while remaining:
+            data = await reader.read(min(READ_SIZE, remaining))
+            if not data:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            remaining -= len(data)
+            yield data
+    else:
+        while data := await reader.read(READ_SIZE):
+            yield data
+
+
+def keep_alive(version, headers, bodyless=False):
+    framed = (
+        bodyless or "content-length" in headers
+        or "transfer-encoding" in headers
+    )
+    return (
+        framed and version == "HTTP/1.1"
+        and headers.get("connection", "").lower() != "close"
     )
-    threads.append(thread)
-    thread.start()
 
-for thread in threads:
-    thread.join()
 
-for country, universities in results.items():
-    print(f"{country}: {universities}")
+class UniversityFetcher:
+    def __init__(self, base_url=BASE_URL, concurrency=20, timeout=10.0,
+                 retries=3, backoff=0.2, cache=None):
+        parts = urlsplit(base_url)
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        self.netloc = parts.netloc
+        self.target = parts.path + ("?" + parts.query if parts.query else "")
+        self.pool = ConnectionPool(base_url, concurrency)
+        self.limit = asyncio.Semaphore(concurrency)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.pool.close()
+
+    async def fetch(self, country):
+        target = self.target + quote(country)
+        url = self.origin + target
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and cached.fresh:
+            return cached.names
+
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.limit:
+                    names, headers = await asyncio.wait_for(
+                        self.get_names(target, cached), self.timeout
+                    )
+                return self.store(url, cached, names, headers)
+            except StatusError as error:
+                if error.status not in RETRY_STATUSES:
+                    raise
+                failure = error
+            except (OSError, asyncio.TimeoutError,
+                    asyncio.IncompleteReadError, ProtocolError) as error:
+                failure = error
+            if attempt < self.retries:
+                delay = self.backoff * 2 ** attempt
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+        raise FetchError(
+            f"{country}: giving up after {self.retries + 1} attempts "
+            f"({failure!r})"
+        ) from failure
+
+    def store(self, url, cached, names, headers):
+        if self.cache is None:
+            return names
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if names is None:
+            self.cache.refresh(url, etag, last_modified)
+            return cached.names
+        self.cache.put(url, etag, last_modified, names)
+        return names
+
+    async def get_names(self, target, cached=None):
+        validators = ""
+        if cached is not None and cached.etag:
+            validators += f"If-None-Match: {cached.etag}\r\n"
+        if cached is not None and cached.last_modified:
+            validators += f"If-Modified-Since: {cached.last_modified}\r\n"
+
+        reader, writer = connection = await self.pool.acquire()
+        reusable = False
+        try:
+            writer.write(
+                f"GET {target} HTTP/1.1\r\n"
+                f"Host: {self.netloc}\r\n"
+                "Accept: application/json\r\n"
+                "Accept-Encoding: identity\r\n"
+                f"{validators}"
+                "\r\n".encode("latin-1")
+            )
+            await writer.drain()
+            version, status, headers = await read_head(reader)
+            if status == 304 and validators:
+                reusable = keep_alive(version, headers, bodyless=True)
+                return None, headers
+            if status != 200:
+                raise StatusError(status)
+            stream = NameStream()
+            async for data in iter_body(reader, headers):
+                stream.feed(data)
+            names = stream.close()
+            reusable = keep_alive(version, headers)
+            return names, headers
+        finally:
+            self.pool.release(connection, reusable)
+
+
+async def fetch_all(countries, **options):
+    async with UniversityFetcher(**options) as fetcher:
+        outcomes = await asyncio.gather(
+            *(fetcher.fetch(country) for country in countries),
+            return_exceptions=True,
+        )
+    results = {}
+    errors = {}
+    for country, outcome in zip(countries, outcomes):
+        if isinstance(outcome, FetchError):
+            errors[country] = outcome
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            results[country] = outcome
+    return results, errors
+
+
+def fetch_async(countries, **options):
+    return asyncio.run(fetch_all(countries, **options))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=("async", "threads"),
+                        default="async")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--cache", help="SQLite file for cached responses")
+    parser.add_argument("--cache-ttl", type=float, default=86_400.0,
+                        help="seconds before a cached response is "
+                        "revalidated")
+    parser.add_argument("--cache-max-bytes", type=int, default=64 * 2 ** 20)
+    args = parser.parse_args()
+
+    if args.mode == "threads":
+        if requests is None:
+            parser.error("--mode threads requires requests")
+        if args.cache:
+            parser.error("--cache requires --mode async")
+        results = fetch_threaded(countries, args.base_url)
+    else:
+        cache = None
+        if args.cache:
+            cache = ResponseCache(
+                args.cache, args.cache_ttl, args.cache_max_bytes
+            )
+        try:
+            results, errors = fetch_async(
+                countries, base_url=args.base_url,
+                concurrency=args.concurrency, timeout=args.timeout,
+                retries=args.retries, cache=cache,
+            )
+        finally:
+            if cache is not None:
+                cache.close()
+        for country, error in errors.items():
+            print(f"{country}: {error}", file=sys.stderr)
+
+    for country, universities in results.items():
+        print(f"{country}: {universities}")
+
+
+if __name__ == "__main__":
+    main()
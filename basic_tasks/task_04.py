@@ -1,10 +1,29 @@
+import argparse
+import importlib
 import math
-from multiprocessing import Pool, cpu_count
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import closing, contextmanager
+from multiprocessing import Pool, cpu_count, shared_memory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BLOCK_POINTS = 1 << 20
+MIN_CHUNK_POINTS = 1 << 14
+
 
 def f(x):
     return math.cos(x) + math.log(x + 1) ** 2
 
 
+def f_vectorized(x):
+    return np.cos(x) + np.log(x + 1) ** 2
+
+
 def compute_range(args):
     start, end, step = args
     results = []
@@ -15,12 +34,242 @@ def compute_range(args):
     return results
 
 
-def main():
-    start = 1
-    end = 1_000_0
-    step = 0.01
+def point_count(start, end, step):
+    if step <= 0:
+        raise ValueError("Step must be positive")
+    count = max(0, math.ceil((end - start) / step))
+    while count > 0 and start + (count - 1) * step >= end:
+        count -= 1
+    return count
+
+
+def index_chunks(count, parts):
+    bounds = [count * i // parts for i in range(parts + 1)]
+    return [
+        (first, last) for first, last in zip(bounds, bounds[1:])
+        if first < last
+    ]
+
+
+def blocks(first, last):
+    for block_first in range(first, last, BLOCK_POINTS):
+        yield block_first, min(block_first + BLOCK_POINTS, last)
+
+
+def compute_block(start, step, first, last, func=f_vectorized):
+    x = np.arange(first, last, dtype=np.float64)
+    x *= step
+    x += start
+    return x, func(x)
+
+
+def fill_chunk(out, start, step, first, last):
+    for block_first, block_last in blocks(first, last):
+        x, y = compute_block(start, step, block_first, block_last)
+        out[block_first:block_last, 0] = x
+        out[block_first:block_last, 1] = y
+
+
+def compute_chunk_shared(args):
+    name, count, start, step, first, last = args
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        out = np.ndarray((count, 2), dtype=np.float64, buffer=shm.buf)
+        fill_chunk(out, start, step, first, last)
+        del out
+    finally:
+        shm.close()
+    return last - first
+
+
+@contextmanager
+def tabulate_shared(start, end, step, num_processes=None):
+    num_processes = num_processes or cpu_count()
+    count = point_count(start, end, step)
+    shm = shared_memory.SharedMemory(create=True, size=max(count, 1) * 16)
+    try:
+        tasks = [
+            (shm.name, count, start, step, first, last)
+            for first, last in index_chunks(count, num_processes)
+        ]
+        with Pool(num_processes) as pool:
+            pool.map(compute_chunk_shared, tasks)
+        results = np.ndarray((count, 2), dtype=np.float64, buffer=shm.buf)
+        try:
+            yield results
+        finally:
+            del results
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def compute_chunk_file(args, func=f_vectorized):
+    path, offset, start, step, first, last = args
+    for block_first, block_last in blocks(first, last):
+        window = np.memmap(
+            path, dtype=np.float64, mode="r+",
+            offset=offset + block_first * 16,
+            shape=(block_last - block_first, 2),
+        )
+        window[:, 0], window[:, 1] = compute_block(
+            start, step, block_first, block_last, func
+        )
+        window.flush()
+        del window
+    return last - first
+
+
+def create_npy(path, count):
+    out = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float64, shape=(count, 2)
+    )
+    offset = out.offset
+    del out
+    return offset
+
+
+def tabulate_to_file(path, start, end, step, num_processes=None):
+    num_processes = num_processes or cpu_count()
+    count = point_count(start, end, step)
+    offset = create_npy(path, count)
+
+    tasks = [
+        (str(path), offset, start, step, first, last)
+        for first, last in index_chunks(count, num_processes)
+    ]
+    with Pool(num_processes) as pool:
+        pool.map(compute_chunk_file, tasks)
+    return count
+
+
+def guided_chunks(count, num_processes, min_points=MIN_CHUNK_POINTS,
+                  max_points=BLOCK_POINTS):
+    first = 0
+    while first < count:
+        size = (count - first) // (2 * num_processes)
+        size = min(max(size, min_points), max_points)
+        last = min(first + size, count)
+        yield first, last
+        first = last
+
 
-    num_processes = cpu_count()
+def compute_chunk_dynamic(func, start, step, first, last):
+    return (first,) + compute_block(start, step, first, last, func)
+
+
+def compute_chunk_dynamic_file(func, path, offset, start, step, first, last):
+    return compute_chunk_file((path, offset, start, step, first, last), func)
+
+
+def guided_map(task, args, count, num_processes, cancel=None, backlog=None,
+               min_points=MIN_CHUNK_POINTS, max_points=BLOCK_POINTS):
+    chunks = guided_chunks(count, num_processes, min_points, max_points)
+    window = 4 * num_processes
+    in_flight = {}
+
+    with ProcessPoolExecutor(num_processes) as executor:
+        def submit():
+            while len(in_flight) + (backlog() if backlog else 0) < window:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                future = executor.submit(task, *args, *chunk)
+                in_flight[future] = chunk
+
+        try:
+            submit()
+            while in_flight:
+                if cancel is not None and cancel.is_set():
+                    return
+                finished, _ = wait(
+                    in_flight, timeout=0.1, return_when=FIRST_COMPLETED
+                )
+                for future in finished:
+                    del in_flight[future]
+                if finished:
+                    yield [future.result() for future in finished]
+                submit()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+class Progress:
+    def __init__(self, total, interval=1.0, stream=None):
+        self.total = total
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.started = time.perf_counter()
+        self.reported = self.started
+
+    def __call__(self, done):
+        now = time.perf_counter()
+        if now - self.reported >= self.interval or done == self.total:
+            self.reported = now
+            elapsed = now - self.started
+            rate = done / elapsed if elapsed > 0 else 0.0
+            percent = 100.0 * done / self.total if self.total else 100.0
+            print(f"{done}/{self.total} points ({percent:5.1f}%), "
+                  f"{rate:,.0f} points/s", file=self.stream)
+
+
+def tabulate_dynamic(start, end, step, func=f_vectorized, num_processes=None,
+                     progress=None, cancel=None, min_points=MIN_CHUNK_POINTS,
+                     max_points=BLOCK_POINTS):
+    num_processes = num_processes or cpu_count()
+    count = point_count(start, end, step)
+    ready = {}
+    next_first = 0
+    done = 0
+
+    batches = guided_map(
+        compute_chunk_dynamic, (func, start, step), count, num_processes,
+        cancel, lambda: len(ready), min_points, max_points,
+    )
+    with closing(batches):
+        for finished in batches:
+            for first, x, y in finished:
+                ready[first] = x, y
+                done += len(x)
+            if progress is not None:
+                progress(done)
+            while next_first in ready:
+                x, y = ready.pop(next_first)
+                next_first += len(x)
+                yield x, y
+
+
+def tabulate_dynamic_to_file(path, start, end, step, func=f_vectorized,
+                             num_processes=None, progress=None, cancel=None,
+                             min_points=MIN_CHUNK_POINTS,
+                             max_points=BLOCK_POINTS):
+    num_processes = num_processes or cpu_count()
+    count = point_count(start, end, step)
+    offset = create_npy(path, count)
+    done = 0
+
+    batches = guided_map(
+        compute_chunk_dynamic_file, (func, str(path), offset, start, step),
+        count, num_processes, cancel, None, min_points, max_points,
+    )
+    with closing(batches):
+        for finished in batches:
+            done += sum(finished)
+            if progress is not None:
+                progress(done)
+    return done
+
+
+def load_function(spec):
+    module_name, _, name = spec.rpartition(":")
+    if not module_name:
+        raise ValueError("Function must be given as module:name")
+    return getattr(importlib.import_module(module_name), name)
+
+
+def tabulate_pool(start, end, step, num_processes=None):
+    num_processes = num_processes or cpu_count()
 
     chunk_size = (end - start) / num_processes
     tasks = []
@@ -33,12 +282,79 @@ def main():
     with Pool(num_processes) as pool:
         results = pool.map(compute_range, tasks)
 
-    all_results = [item for sublist in results for item in sublist]
+    return [item for sublist in results for item in sublist]
+
 
-    print(f"Computed {len(all_results)} values")
+def print_results(count, first_results):
+    print(f"Computed {count} values")
     print("First 5 results:")
-    for r in all_results[:5]:
+    for r in first_results:
         print(r)
 
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=("pool", "numpy", "dynamic"),
+                        default="pool")
+    parser.add_argument("--processes", type=int, default=cpu_count())
+    parser.add_argument("--start", type=float, default=1)
+    parser.add_argument("--end", type=float, default=1_000_0)
+    parser.add_argument("--step", type=float, default=0.01)
+    parser.add_argument("--out", help="stream results into this .npy file")
+    parser.add_argument("--function", help="module:name of a vectorized "
+                        "function for --mode dynamic")
+    args = parser.parse_args()
+
+    start = args.start
+    end = args.end
+    step = args.step
+
+    if args.mode == "dynamic":
+        if np is None:
+            parser.error("--mode dynamic requires numpy")
+        func = load_function(args.function) if args.function else f_vectorized
+        count = point_count(start, end, step)
+        if args.out:
+            tabulate_dynamic_to_file(
+                args.out, start, end, step, func, args.processes,
+                progress=Progress(count),
+            )
+            results = np.load(args.out, mmap_mode="r")
+            first = [tuple(row) for row in results[:5].tolist()]
+            del results
+        else:
+            results = tabulate_dynamic(
+                start, end, step, func, args.processes,
+                progress=Progress(count),
+            )
+            first = []
+            for x, y in results:
+                if len(first) < 5:
+                    first += zip(x[:5 - len(first)].tolist(),
+                                 y[:5 - len(first)].tolist())
+        print_results(count, first)
+        return
+
+    if args.out:
+        if np is None:
+            parser.error("--out requires numpy")
+        count = tabulate_to_file(args.out, start, end, step, args.processes)
+        results = np.load(args.out, mmap_mode="r")
+        first = [tuple(row) for row in results[:5].tolist()]
+        del results
+        print_results(count, first)
+        return
+
+    if args.mode == "numpy":
+        if np is None:
+            parser.error("--mode numpy requires numpy")
+        with tabulate_shared(start, end, step, args.processes) as results:
+            first = [tuple(row) for row in results[:5].tolist()]
+            print_results(len(results), first)
+        return
+
+    all_results = tabulate_pool(start, end, step, args.processes)
+    print_results(len(all_results), all_results[:5])
+
 if __name__ == "__main__":
     main()
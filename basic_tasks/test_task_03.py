@@ -0,0 +1,271 @@
+import json
+import os
+import tempfile
+import unittest
+
+import task_03
+from task_03 import (
+    FetchError, NameStream, ResponseCache, fetch_async, fetch_threaded
+)
+from universities_stub import UniversitiesServer, universities
+
+
+def expected_names(country, count=50):
+    return [uni["name"] for uni in universities(country, count)]
+
+
+class TestNameStream(unittest.TestCase):
+
+    def test_byte_by_byte(self):
+        data = [{"name": "Uniwersytet Łódzki", "domains": ["a", "b"]},
+                {"web_pages": [], "name": "Zürich [ETH], \"main\""}]
+        stream = NameStream()
+        for byte in json.dumps(data, ensure_ascii=False).encode():
+            stream.feed(bytes([byte]))
+        self.assertEqual(stream.close(), [item["name"] for item in data])
+
+    def test_empty_array(self):
+        stream = NameStream()
+        stream.feed(b" [ ] ")
+        self.assertEqual(stream.close(), [])
+
+    def test_truncated(self):
+        stream = NameStream()
+        stream.feed(b'[{"name": "A"}, {"name": ')
+        with self.assertRaises(FetchError):
+            stream.close()
+
+    def test_item_without_name(self):
+        stream = NameStream()
+        with self.assertRaises(FetchError):
+            stream.feed(b'[{"name": "A"}, ["B"]]')
+
+    def test_not_an_array(self):
+        stream = NameStream()
+        with self.assertRaises(FetchError):
+            stream.feed(b'{"name": "A"}')
+
+
+class TestFetchAsync(unittest.TestCase):
+
+    def test_matches_canned_data(self):
+        with UniversitiesServer() as server:
+            results, errors = fetch_async(
+                task_03.countries, base_url=server.base_url
+            )
+        self.assertEqual(errors, {})
+        self.assertEqual(list(results), task_03.countries)
+        for country in task_03.countries:
+            self.assertEqual(results[country], expected_names(country))
+
+    def test_chunked_transfer_encoding(self):
+        with UniversitiesServer(per_country=200, chunked=True) as server:
+            results, _ = fetch_async(["Poland"], base_url=server.base_url)
+        self.assertEqual(results["Poland"], expected_names("Poland", 200))
+
+    def test_connections_are_pooled(self):
+        names = [f"Country {number}" for number in range(40)]
+        with UniversitiesServer() as server:
+            results, _ = fetch_async(
+                names, base_url=server.base_url, concurrency=4
+            )
+        self.assertEqual(len(results), 40)
+        self.assertEqual(server.requests, 40)
+        self.assertLessEqual(server.connections, 4)
+
+    def test_concurrency_limit(self):
+        names = [f"Country {number}" for number in range(12)]
+        with UniversitiesServer(delay=0.05) as server:
+            fetch_async(names, base_url=server.base_url, concurrency=3)
+        self.assertLessEqual(server.peak, 3)
+
+    def test_retries_with_backoff(self):
+        with UniversitiesServer() as server:
+            server.fail("Spain", 2)
+            results, errors = fetch_async(
+                ["Spain"], base_url=server.base_url, backoff=0.01
+            )
+        self.assertEqual(errors, {})
+        self.assertEqual(results["Spain"], expected_names("Spain"))
+        self.assertEqual(server.requests, 3)
+
+    def test_gives_up_after_retries(self):
+        with UniversitiesServer() as server:
+            server.fail("Spain", 10)
+            results, errors = fetch_async(
+                ["Spain", "Italy"], base_url=server.base_url,
+                retries=2, backoff=0.01,
+            )
+        self.assertEqual(list(results), ["Italy"])
+        self.assertIsInstance(errors["Spain"], FetchError)
+        self.assertEqual(server.requests, 4)
+
+    def test_client_errors_are_not_retried(self):
+        with UniversitiesServer() as server:
+            server.fail("Spain", 10, status=404)
+            _, errors = fetch_async(
+                ["Spain"], base_url=server.base_url, backoff=0.01
+            )
+        self.assertEqual(errors["Spain"].status, 404)
+        self.assertEqual(server.requests, 1)
+
+    def test_timeout(self):
+        with UniversitiesServer(delay=0.5) as server:
+            _, errors = fetch_async(
+                ["Spain"], base_url=server.base_url, timeout=0.1, retries=0
+            )
+        self.assertIn("TimeoutError", str(errors["Spain"]))
+
+    def test_garbage_chunk_size_is_retried(self):
+        with UniversitiesServer() as server:
+            server.raw_responses["Spain"] = (
+                b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                b"zz\r\n[]\r\n0\r\n\r\n"
+            )
+            results, errors = fetch_async(
+                ["Spain", "Italy"], base_url=server.base_url,
+                retries=1, backoff=0.01,
+            )
+        self.assertEqual(list(results), ["Italy"])
+        self.assertIsInstance(errors["Spain"], FetchError)
+        self.assertIn("chunk size", str(errors["Spain"]))
+        self.assertEqual(server.requests, 3)
+
+    def test_garbage_status_line(self):
+        with UniversitiesServer() as server:
+            server.raw_responses["Spain"] = b"HTTP/1.1 OK\r\n\r\n"
+            _, errors = fetch_async(
+                ["Spain"], base_url=server.base_url, retries=0
+            )
+        self.assertIn("status", str(errors["Spain"]))
+
+    def test_entry_without_name(self):
+        body = b'[{"name": "A"}, {"country": "Spain"}]'
+        with UniversitiesServer() as server:
+            server.raw_responses["Spain"] = (
+                b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s"
+                % (len(body), body)
+            )
+            results, errors = fetch_async(
+                ["Spain", "Italy"], base_url=server.base_url, backoff=0.01
+            )
+        self.assertEqual(list(results), ["Italy"])
+        self.assertIsInstance(errors["Spain"], FetchError)
+        self.assertEqual(server.requests, 2)
+
+    def test_connection_refused(self):
+        server = UniversitiesServer()
+        base_url = server.base_url
+        server.server_close()
+        _, errors = fetch_async(
+            ["Spain"], base_url=base_url, retries=1, backoff=0.01
+        )
+        self.assertIsInstance(errors["Spain"], FetchError)
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite")
+        self.now = 1000.0
+        self.caches = []
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+        self.directory.cleanup()
+
+    def open_cache(self, **options):
+        cache = ResponseCache(self.path, clock=lambda: self.now, **options)
+        self.caches.append(cache)
+        return cache
+
+    def fetch(self, server, names=None, **options):
+        return fetch_async(
+            names or task_03.countries, base_url=server.base_url,
+            cache=self.open_cache(**options),
+        )
+
+    def test_entries_expire_after_ttl(self):
+        cache = self.open_cache(ttl=60)
+        cache.put("http://a/", '"v1"', None, ["A"])
+        self.assertTrue(cache.get("http://a/").fresh)
+        self.now += 61
+        entry = cache.get("http://a/")
+        self.assertFalse(entry.fresh)
+        self.assertEqual(entry, ('"v1"', None, ["A"], False))
+        cache.refresh("http://a/", '"v2"', None)
+        self.assertEqual(cache.get("http://a/"), ('"v2"', None, ["A"], True))
+
+    def test_persists_across_instances(self):
+        self.open_cache().put("http://a/", None, "Mon", ["Ł"])
+        self.caches.pop().close()
+        self.assertEqual(self.open_cache().get("http://a/").names, ["Ł"])
+
+    def test_evicts_least_recently_used(self):
+        cache = self.open_cache(max_bytes=100)
+        for name in "abc":
+            cache.put(f"http://{name}/", None, None, ["x" * 20])
+            self.now += 1
+        cache.get("http://a/")
+        self.now += 1
+        cache.put("http://d/", None, None, ["x" * 20])
+        self.assertLessEqual(cache.size(), 100)
+        self.assertIsNone(cache.get("http://b/"))
+        self.assertIsNotNone(cache.get("http://a/"))
+        self.assertIsNotNone(cache.get("http://d/"))
+
+    def test_fresh_entries_skip_the_network(self):
+        with UniversitiesServer() as server:
+            first, _ = self.fetch(server)
+            second, _ = self.fetch(server)
+        self.assertEqual(first, second)
+        self.assertEqual(server.requests, len(task_03.countries))
+
+    def test_revalidation_sends_almost_no_bytes(self):
+        with UniversitiesServer() as server:
+            first, _ = self.fetch(server, ttl=0)
+            downloaded = server.bytes_sent
+            second, errors = self.fetch(server, ttl=0)
+            revalidated = server.bytes_sent - downloaded
+        self.assertEqual(errors, {})
+        self.assertEqual(first, second)
+        self.assertEqual(server.not_modified, len(task_03.countries))
+        self.assertLess(revalidated, downloaded / 20)
+
+    def test_changed_data_is_downloaded_again(self):
+        with UniversitiesServer() as server:
+            self.fetch(server, ["Poland"], ttl=0)
+            server.per_country = 60
+            results, _ = self.fetch(server, ["Poland"], ttl=0)
+        self.assertEqual(results["Poland"], expected_names("Poland", 60))
+        self.assertEqual(server.not_modified, 0)
+
+    def test_last_modified_without_etag(self):
+        with UniversitiesServer() as server:
+            server.etags = False
+            self.fetch(server, ["Poland"], ttl=0)
+            results, _ = self.fetch(server, ["Poland"], ttl=0)
+            server.modified += 10
+            changed, _ = self.fetch(server, ["Poland"], ttl=0)
+        self.assertEqual(results["Poland"], expected_names("Poland"))
+        self.assertEqual(changed["Poland"], expected_names("Poland"))
+        self.assertEqual(server.not_modified, 1)
+        self.assertEqual(server.requests, 3)
+
+
+@unittest.skipIf(task_03.requests is None, "requests is not installed")
+class TestFetchThreaded(unittest.TestCase):
+
+    def test_matches_async(self):
+        with UniversitiesServer() as server:
+            threaded = fetch_threaded(task_03.countries, server.base_url)
+            results, _ = fetch_async(
+                task_03.countries, base_url=server.base_url
+            )
+        self.assertEqual(threaded, results)
+
+
+if __name__ == "__main__":
+    unittest.main()
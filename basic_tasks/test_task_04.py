@@ -0,0 +1,142 @@
+import os
+import tempfile
+import threading
+import unittest
+
+import task_04
+from task_04 import guided_chunks, index_chunks, point_count
+
+np = task_04.np
+
+
+class TestPointCount(unittest.TestCase):
+
+    def test_matches_python_loop(self):
+        for start, end, step in [(1, 2, 0.1), (0, 1, 0.25), (1, 100, 0.01),
+                                 (-1, 1, 0.3), (0.5, 0.7, 0.2)]:
+            xs = []
+            x = start
+            while x < end:
+                xs.append(x)
+                x += step
+            self.assertEqual(point_count(start, end, step), len(xs))
+
+    def test_end_is_exclusive(self):
+        self.assertEqual(point_count(0, 1, 0.5), 2)
+        self.assertEqual(point_count(0, 1.0000001, 0.5), 3)
+
+    def test_empty_range(self):
+        self.assertEqual(point_count(5, 5, 1), 0)
+        self.assertEqual(point_count(5, 1, 1), 0)
+
+    def test_step_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            point_count(0, 1, 0)
+        with self.assertRaises(ValueError):
+            point_count(0, 1, -0.1)
+
+
+class TestChunks(unittest.TestCase):
+
+    def assertCovers(self, chunks, count):
+        self.assertEqual(chunks[0][0] if chunks else 0, 0)
+        for (_, last), (first, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(last, first)
+        self.assertEqual(chunks[-1][1] if chunks else 0, count)
+
+    def test_index_chunks_are_even(self):
+        chunks = index_chunks(10, 3)
+        self.assertCovers(chunks, 10)
+        sizes = [last - first for first, last in chunks]
+        self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+    def test_index_chunks_skip_empty(self):
+        self.assertEqual(index_chunks(2, 4), [(0, 1), (1, 2)])
+        self.assertEqual(index_chunks(0, 4), [])
+
+    def test_guided_chunks_shrink(self):
+        chunks = list(guided_chunks(10_000, 2, min_points=10,
+                                    max_points=2_000))
+        self.assertCovers(chunks, 10_000)
+        sizes = [last - first for first, last in chunks]
+        self.assertEqual(sizes[0], 2_000)
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertTrue(all(size >= 10 for size in sizes[:-1]))
+
+    def test_guided_chunks_small_range(self):
+        self.assertEqual(list(guided_chunks(5, 4, min_points=10)), [(0, 5)])
+        self.assertEqual(list(guided_chunks(0, 4)), [])
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestTabulateDynamic(unittest.TestCase):
+
+    START = 1.0
+    STEP = 0.01
+    OPTIONS = {"num_processes": 2, "min_points": 10, "max_points": 100}
+
+    def expected(self, count):
+        x = np.arange(count, dtype=np.float64) * self.STEP + self.START
+        return x, task_04.f_vectorized(x)
+
+    def test_blocks_arrive_in_order(self):
+        end = self.START + 2_000 * self.STEP
+        count = point_count(self.START, end, self.STEP)
+        blocks = list(task_04.tabulate_dynamic(
+            self.START, end, self.STEP, **self.OPTIONS
+        ))
+        x, y = self.expected(count)
+        self.assertGreater(len(blocks), 1)
+        np.testing.assert_array_equal(np.concatenate([b[0] for b in blocks]),
+                                      x)
+        np.testing.assert_allclose(np.concatenate([b[1] for b in blocks]), y)
+
+    def test_reports_progress(self):
+        end = self.START + 500 * self.STEP
+        reported = []
+        for _ in task_04.tabulate_dynamic(self.START, end, self.STEP,
+                                          progress=reported.append,
+                                          **self.OPTIONS):
+            pass
+        self.assertEqual(reported, sorted(reported))
+        self.assertEqual(reported[-1], point_count(self.START, end, self.STEP))
+
+    def test_cancel_stops_early(self):
+        end = self.START + 100_000 * self.STEP
+        cancel = threading.Event()
+        computed = 0
+        for x, _ in task_04.tabulate_dynamic(self.START, end, self.STEP,
+                                             cancel=cancel, **self.OPTIONS):
+            computed += len(x)
+            cancel.set()
+        self.assertGreater(computed, 0)
+        self.assertLess(computed, point_count(self.START, end, self.STEP))
+
+    def test_writes_file_in_place(self):
+        end = self.START + 2_000 * self.STEP
+        count = point_count(self.START, end, self.STEP)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.npy")
+            written = task_04.tabulate_dynamic_to_file(
+                path, self.START, end, self.STEP, **self.OPTIONS
+            )
+            results = np.load(path)
+        x, y = self.expected(count)
+        self.assertEqual(written, count)
+        np.testing.assert_array_equal(results[:, 0], x)
+        np.testing.assert_allclose(results[:, 1], y)
+
+    def test_file_cancelled_before_start(self):
+        end = self.START + 2_000 * self.STEP
+        cancel = threading.Event()
+        cancel.set()
+        with tempfile.TemporaryDirectory() as directory:
+            written = task_04.tabulate_dynamic_to_file(
+                os.path.join(directory, "out.npy"), self.START, end,
+                self.STEP, cancel=cancel, **self.OPTIONS
+            )
+        self.assertEqual(written, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import sys
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def universities(country, count):
+    slug = country.lower().replace(" ", "-")
+    return [
+        {
+            "alpha_two_code": country[:2].upper(),
+            "country": country,
+            "domains": [f"uni{number}.{slug}.example"],
+            "name": f"University {number} of {country}",
+            "state-province": None,
+            "web_pages": [f"https://uni{number}.{slug}.example/"],
+        }
+        for number in range(count)
+    ]
+
+
+class CountingWriter:
+    def __init__(self, raw, server):
+        self.raw = raw
+        self.server = server
+
+    def write(self, data):
+        with self.server.lock:
+            self.server.bytes_sent += len(data)
+        return self.raw.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+class UniversitiesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.wfile = CountingWriter(self.wfile, self.server)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlsplit(self.path).query)
+        country = query.get("country", [""])[0]
+        with server.lock:
+            server.requests += 1
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            failures = server.failures.get(country, 0)
+            if failures:
+                server.failures[country] = failures - 1
+        try:
+            if server.delay:
+                time.sleep(server.delay)
+            if failures:
+                self.send_body(server.failure_status, b"[]")
+                return
+            if country in server.raw_responses:
+                self.wfile.write(server.raw_responses[country])
+                self.close_connection = True
+                return
+            body = json.dumps(
+                universities(country, server.per_country)
+            ).encode()
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+            validators = {}
+            if server.etags:
+                validators["ETag"] = etag
+            if server.modified is not None:
+                validators["Last-Modified"] = formatdate(
+                    server.modified, usegmt=True
+                )
+            if self.not_modified(etag):
+                with server.lock:
+                    server.not_modified += 1
+                self.send_response(304)
+                for name, value in validators.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+            self.send_body(200, body, validators)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def not_modified(self, etag):
+        server = self.server
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return server.etags and etag in (
+                tag.strip() for tag in if_none_match.split(",")
+            )
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is None or server.modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(server.modified) <= since
+
+    def send_body(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.server.chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(body), 1000):
+                piece = body[start:start + 1000]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UniversitiesServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, per_country=50, delay=0.0, chunked=False):
+        super().__init__(("127.0.0.1", 0), UniversitiesHandler)
+        self.per_country = per_country
+        self.delay = delay
+        self.chunked = chunked
+        self.etags = True
+        self.modified = int(time.time())
+        self.failures = {}
+        self.raw_responses = {}
+        self.failure_status = 503
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.active = 0
+        self.peak = 0
+        self.bytes_sent = 0
+        self.not_modified = 0
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/search?country="
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def fail(self, country, times, status=503):
+        self.failures[country] = times
+        self.failure_status = status
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+        self.thread.join()
@@ -0,0 +1,117 @@
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import analytics
+from analytics import SalesAnalytics
+from order import Order
+from product import Product
+from user import User
+
+ORIGIN = datetime(2024, 1, 1)
+DAYS = 365
+
+
+def build_orders(count, product_count):
+    generator = random.Random(42)
+    user = User("U001", "bench", "bench@example.com")
+    products = [
+        Product(f"P{number:06d}", f"Product {number}",
+                round(generator.uniform(1, 500), 2), 1_000_000)
+        for number in range(product_count)
+    ]
+    orders = []
+    for number in range(count):
+        lines = [
+            (product, generator.randint(1, 3))
+            for product in generator.sample(products, generator.randint(1, 3))
+        ]
+        order = Order(f"ORD-{number:07d}", user, lines)
+        order.creation_date = ORIGIN + timedelta(
+            seconds=generator.randrange(DAYS * 86400)
+        )
+        orders.append(order)
+    return orders
+
+
+def naive_revenue_per_product_per_day(orders, start, end):
+    totals = defaultdict(int)
+    for order in orders:
+        if not start <= order.creation_date < end:
+            continue
+        day = order.creation_date.date()
+        for line in order.items:
+            totals[(line.product_id, day)] += line.total_minor_units
+    return totals
+
+
+def naive_top_products(orders, start, end, limit):
+    totals = defaultdict(int)
+    for order in orders:
+        if start <= order.creation_date < end:
+            for line in order.items:
+                totals[line.product_id] += line.total_minor_units
+    return sorted(totals.items(), key=lambda item: -item[1])[:limit]
+
+
+def timed(func, repeat=5):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    args = parser.parse_args()
+
+    orders = build_orders(args.count, args.products)
+    rollups = SalesAnalytics()
+    started = time.perf_counter()
+    for order in orders:
+        rollups.record_order(order)
+    elapsed = time.perf_counter() - started
+    print(f"backend: {'numpy' if analytics.np is not None else 'python'}")
+    print(
+        f"recording {args.count} orders: {elapsed:.2f} s "
+        f"({elapsed / args.count * 1e6:.2f} us/order)"
+    )
+
+    start = ORIGIN + timedelta(days=90)
+    end = start + timedelta(days=30)
+    product_id = orders[0].items[0].product_id
+    cases = [
+        ("naive revenue/product/day (30d)",
+         lambda: naive_revenue_per_product_per_day(orders, start, end)),
+        ("naive top 10 products (30d)",
+         lambda: naive_top_products(orders, start, end, 10)),
+        ("top 10 products (30d)",
+         lambda: rollups.top_products(start, end, 10)),
+        ("top 10 products (all)",
+         lambda: rollups.top_products(limit=10)),
+        ("daily timeseries (all)",
+         lambda: rollups.timeseries("day")),
+        ("hourly timeseries (30d)",
+         lambda: rollups.timeseries("hour", start, end)),
+        ("daily timeseries, one product",
+         lambda: rollups.timeseries("day", product_id=product_id)),
+        ("totals (30d)",
+         lambda: rollups.totals(start, end)),
+    ]
+
+    print(f"{'query':<34} {'ms':>10}")
+    for label, func in cases:
+        repeat = 1 if label.startswith("naive") else 5
+        print(f"{label:<34} {timed(func, repeat):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
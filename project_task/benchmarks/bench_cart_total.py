@@ -0,0 +1,43 @@
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from cart import Cart
+from product import Product
+
+CART_SIZES = (10, 1_000, 100_000)
+
+
+def resum_total(cart):
+    return sum(
+        product.price * quantity
+        for product, quantity in cart.get_items()
+    )
+
+
+def build_cart(size):
+    cart = Cart("U001")
+    for index in range(size):
+        product = Product(f"P{index:06d}", "Item", 19.99, 10)
+        cart.add_item(product, 1 + index % 3)
+    return cart
+
+
+def best_of(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number
+
+
+def main():
+    print(f"{'lines':>8} {'re-sum [us]':>14} {'cached [us]':>14}")
+    for size in CART_SIZES:
+        cart = build_cart(size)
+        number = max(1, 100_000 // size)
+        resum = best_of(lambda: resum_total(cart), number)
+        cached = best_of(cart.get_total_price, 10_000)
+        print(f"{size:>8} {resum * 1e6:>14.2f} {cached * 1e6:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
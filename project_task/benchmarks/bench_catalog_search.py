@@ -0,0 +1,63 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from catalog_index import CatalogIndex
+from product import Product
+
+WORDS = (
+    "laptop", "mouse", "keyboard", "monitor", "cable", "stand", "gaming",
+    "wireless", "usb", "hub", "adapter", "headphones", "speaker", "case",
+    "charger", "dock", "webcam", "microphone", "ssd", "router",
+)
+
+QUERIES = [
+    ("prefix 'lap'", dict(query="lap")),
+    ("prefix 'wire hub'", dict(query="wire hub")),
+    ("contains 'phone'", dict(contains="phone")),
+    ("price 100-110", dict(min_price=100, max_price=110, sort="price")),
+    ("top price", dict(sort="-price")),
+    ("name, in stock", dict(in_stock=True)),
+    ("prefix + price", dict(query="gam", min_price=500, sort="price")),
+    ("deep page", dict(sort="price", offset=10_000)),
+]
+
+
+def build_index(count):
+    generator = random.Random(42)
+    index = CatalogIndex()
+    for number in range(count):
+        name = " ".join(generator.sample(WORDS, 3)) + f" {number}"
+        index.add(Product(
+            f"P{number:07d}", name,
+            round(generator.uniform(1, 1000), 2),
+            generator.choice((0, 5, 50)),
+        ))
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    index = build_index(args.count)
+    started = time.perf_counter()
+    index.search()
+    print(f"initial index build: {time.perf_counter() - started:.2f} s")
+
+    print(f"{'query':<20} {'ms':>10}")
+    for label, filters in QUERIES:
+        started = time.perf_counter()
+        for _ in range(5):
+            index.search(limit=50, **filters)
+        elapsed = (time.perf_counter() - started) / 5
+        print(f"{label:<20} {elapsed * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
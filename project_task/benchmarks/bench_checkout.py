@@ -0,0 +1,51 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from ecommerce import ECommercePlatform
+from product import Product
+from user import User
+
+CHECKOUTS_PER_THREAD = 2000
+THREAD_COUNTS = (1, 2, 4, 8, 16)
+
+
+def build_platform(thread_count):
+    platform = ECommercePlatform()
+    platform.register_product(Product("HOT", "Hot item", 9.99, 10 ** 9))
+    user_ids = []
+    for index in range(thread_count * CHECKOUTS_PER_THREAD):
+        user_id = f"U{index:07d}"
+        product_id = f"P{index:07d}"
+        user = User(user_id, user_id, f"{user_id}@example.com")
+        user.set_address("Sample Address")
+        platform.register_user(user)
+        platform.register_product(Product(product_id, "Item", 1.0, 1))
+        platform.add_to_cart(user_id, product_id, 1)
+        if index % 10 == 0:
+            platform.add_to_cart(user_id, "HOT", 1)
+        user_ids.append(user_id)
+    return platform, user_ids
+
+
+def run(thread_count):
+    platform, user_ids = build_platform(thread_count)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=thread_count) as executor:
+        orders = list(executor.map(platform.checkout, user_ids))
+    elapsed = time.perf_counter() - started
+    assert all(orders)
+    return len(orders) / elapsed
+
+
+def main():
+    print(f"{'threads':>8} {'checkouts/s':>14}")
+    for thread_count in THREAD_COUNTS:
+        print(f"{thread_count:>8} {run(thread_count):>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from ecommerce import ECommercePlatform
+from event_log import (
+    EventLogStorage, encode_cart_item, encode_checkout, encode_product,
+    encode_status, encode_user, to_microseconds
+)
+from order import OrderLine
+from product import Product
+from user import User
+
+STATUS_CHAIN = ("pending", "confirmed", "shipped", "delivered")
+CHUNK = 10_000
+
+
+def generate_log(path, events, products, users, seed=42, first_order=0,
+                 register=True):
+    generator = random.Random(seed)
+    created = to_microseconds(datetime(2024, 1, 1))
+    carts = [dict() for _ in range(users)]
+    statuses = bytearray()
+    chunk = []
+
+    with open(path, "ab") as log:
+        def write(record):
+            chunk.append(record)
+            if len(chunk) == CHUNK:
+                log.write(b"".join(chunk))
+                chunk.clear()
+
+        if register:
+            for number in range(products):
+                write(encode_product(
+                    f"P{number:06d}", f"Product {number}",
+                    round(generator.uniform(1, 500), 2), 10 ** 12,
+                ))
+            for number in range(users):
+                write(encode_user(
+                    f"U{number:06d}", f"user{number}",
+                    f"user{number}@example.com", "Sample Address",
+                ))
+            events -= products + users
+
+        for _ in range(events):
+            roll = generator.random()
+            user = generator.randrange(users)
+            cart = carts[user]
+            if roll < 0.05 and cart:
+                lines = [
+                    OrderLine(f"P{product:06d}", f"Product {product}",
+                              10.0, quantity)
+                    for product, quantity in cart.items()
+                ]
+                created += 1_000_000
+                write(encode_checkout(
+                    f"ORD-{first_order + len(statuses) + 1:06d}",
+                    f"U{user:06d}", "pending", 1, created, lines,
+                ))
+                statuses.append(0)
+                cart.clear()
+            elif roll < 0.15 and statuses:
+                order = generator.randrange(len(statuses))
+                if statuses[order] < len(STATUS_CHAIN) - 1:
+                    statuses[order] += 1
+                    write(encode_status(
+                        f"ORD-{first_order + order + 1:06d}",
+                        STATUS_CHAIN[statuses[order]], statuses[order] + 1,
+                    ))
+            elif roll < 0.30 and cart:
+                product = generator.choice(list(cart))
+                del cart[product]
+                write(encode_cart_item(
+                    f"U{user:06d}", f"P{product:06d}", 0
+                ))
+            else:
+                product = generator.randrange(products)
+                cart[product] = cart.get(product, 0) + 1
+                write(encode_cart_item(
+                    f"U{user:06d}", f"P{product:06d}", cart[product]
+                ))
+        log.write(b"".join(chunk))
+    return len(statuses)
+
+
+def cold_start(directory):
+    started = time.perf_counter()
+    storage = EventLogStorage(directory, fsync=False)
+    recovered = time.perf_counter()
+    platform = ECommercePlatform(storage=storage)
+    loaded = time.perf_counter()
+    return platform, storage, recovered - started, loaded - recovered
+
+
+def bench_group_commit(directory, threads, appends):
+    storage = EventLogStorage(directory, fsync=True)
+    platform = ECommercePlatform(storage=storage)
+    platform.register_product(Product("P001", "Laptop", 1.0, 10 ** 9))
+    for number in range(threads):
+        platform.register_user(User(f"U{number}", "bench", "b@example.com"))
+
+    def worker(number):
+        for _ in range(appends):
+            platform.add_to_cart(f"U{number}", "P001", 1)
+
+    started = time.perf_counter()
+    workers = [
+        threading.Thread(target=worker, args=(number,))
+        for number in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    storage.close()
+    return threads * appends / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--tail", type=float, default=0.01,
+                        help="fraction of events written after the snapshot")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench-event-log-"))
+    try:
+        directory = root / "log"
+        directory.mkdir()
+
+        started = time.perf_counter()
+        orders = generate_log(
+            directory / "log-00000000.bin", args.events,
+            args.products, args.users,
+        )
+        size = sum(path.stat().st_size for path in directory.iterdir())
+        print(
+            f"generated {args.events} events ({orders} orders, "
+            f"{size / 2 ** 20:.0f} MiB) in "
+            f"{time.perf_counter() - started:.1f} s"
+        )
+
+        platform, storage, replay, load = cold_start(directory)
+        print(f"full replay:           {replay:8.2f} s replay "
+              f"+ {load:6.2f} s platform load")
+
+        started = time.perf_counter()
+        storage.snapshot()
+        snapshot_size = sum(
+            path.stat().st_size for path in directory.glob("snapshot-*")
+        )
+        print(f"snapshot written:      {time.perf_counter() - started:8.2f} s "
+              f"({snapshot_size / 2 ** 20:.0f} MiB)")
+        storage.close()
+        del platform, storage
+
+        tail = int(args.events * args.tail)
+        segment = sorted(directory.glob("log-*.bin"))[-1]
+        generate_log(segment, tail, args.products, args.users, seed=7,
+                     first_order=orders, register=False)
+        platform, storage, replay, load = cold_start(directory)
+        print(f"snapshot + {tail} tail: {replay:8.2f} s replay "
+              f"+ {load:6.2f} s platform load")
+        storage.close()
+        del platform, storage
+
+        print()
+        print(f"{'threads':>8} {'appends/s (fsync)':>20}")
+        for threads in (1, 4, 16):
+            group_dir = root / f"group-{threads}"
+            rate = bench_group_commit(group_dir, threads, 200)
+            print(f"{threads:>8} {rate:>20.0f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
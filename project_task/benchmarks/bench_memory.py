@@ -0,0 +1,90 @@
+import argparse
+import gc
+import sys
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from order import Order
+from product import Product
+from user import User
+
+
+class DictProduct:
+    def __init__(self, product_id, name, price, stock):
+        self.product_id = product_id
+        self.name = name
+        self.price = price
+        self.stock = stock
+
+
+class DictOrder:
+    def __init__(self, order_id, user, items):
+        self.order_id = order_id
+        self.user = user
+        self.items = items
+        self.status = "pending"
+        self.version = 1
+        self.creation_date = datetime.now()
+        self.total_price = sum(p.price * q for p, q in items)
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    gc.collect()
+    return size
+
+
+def build_products(product_class, count):
+    return [
+        product_class(f"P{index:07d}", "Product", 19.99 + index, 100)
+        for index in range(count)
+    ]
+
+
+def build_orders(order_class, product_class, count):
+    user = User("U001", "john_doe", "john@example.com")
+    products = build_products(product_class, 100)
+    return [
+        order_class(
+            f"ORD-{index:07d}", user,
+            [(products[index % 100], 1), (products[(index + 1) % 100], 2)],
+        )
+        for index in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+    count = args.count
+
+    cases = [
+        (
+            "products",
+            lambda: build_products(DictProduct, count),
+            lambda: build_products(Product, count),
+        ),
+        (
+            "orders",
+            lambda: build_orders(DictOrder, DictProduct, count),
+            lambda: build_orders(Order, Product, count),
+        ),
+    ]
+    print(f"{'objects':<10} {'__dict__ [B/obj]':>17} {'slots [B/obj]':>14}")
+    for name, legacy, compact in cases:
+        before = measure(legacy) / count
+        after = measure(compact) / count
+        print(f"{name:<10} {before:>17.1f} {after:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
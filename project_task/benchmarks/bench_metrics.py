@@ -0,0 +1,69 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import metrics
+from ecommerce import ECommercePlatform
+from product import Product
+from user import User
+
+
+def per_call_ns(func, count):
+    started = time.perf_counter_ns()
+    for _ in range(count):
+        func()
+    return (time.perf_counter_ns() - started) / count
+
+
+def build_platform():
+    platform = ECommercePlatform()
+    platform.register_product(Product("P001", "Laptop", 999.99, 10 ** 9))
+    platform.register_user(User("U001", "bench", "bench@example.com"))
+    return platform
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    def noop():
+        return None
+
+    platform = build_platform()
+    plain_add = platform.add_to_cart.__wrapped__
+    cases = [
+        ("noop", noop, metrics.registry.timed(noop, name="noop"),
+         args.count),
+        ("add_to_cart",
+         lambda: plain_add(platform, "U001", "P001", 1),
+         lambda: platform.add_to_cart("U001", "P001", 1),
+         args.count // 10),
+    ]
+
+    print(f"{'case':<28} {'plain':>8} {'disabled':>10} {'enabled':>10}")
+    for label, plain, wrapped, count in cases:
+        metrics.registry.enabled = False
+        plain_ns = per_call_ns(plain, count)
+        disabled_ns = per_call_ns(wrapped, count)
+        metrics.registry.enabled = True
+        enabled_ns = per_call_ns(wrapped, count)
+        print(f"{label + ' (ns/call)':<28} {plain_ns:>8.0f} "
+              f"{disabled_ns:>10.0f} {enabled_ns:>10.0f}")
+
+    started = time.perf_counter()
+    text = metrics.registry.render()
+    print(f"\nrender /metrics: {(time.perf_counter() - started) * 1e3:.2f} ms "
+          f"({len(text.splitlines())} lines)")
+    histogram = metrics.registry.histogram(
+        metrics.CALL_SECONDS, "", function="ECommercePlatform.add_to_cart"
+    )
+    print(f"add_to_cart p50/p99: {histogram.quantile(0.5) * 1e6:.1f} / "
+          f"{histogram.quantile(0.99) * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from flask import jsonify
+
+import flask_api
+from product import Product
+from serializers import order_to_dict, product_to_dict
+
+PRODUCT_COUNT = 10_000
+ORDER_COUNT = 200
+
+
+def seed():
+    platform = flask_api.platform
+    for index in range(PRODUCT_COUNT):
+        platform.register_product(
+            Product(f"B{index:06d}", f"Item {index}", 9.99, 10 ** 6)
+        )
+    for index in range(ORDER_COUNT):
+        platform.add_to_cart("U001", f"B{index:06d}", 1)
+        platform.add_to_cart("U001", "P002", 1)
+        platform.checkout("U001")
+
+
+def legacy_products():
+    return jsonify({
+        'products': [
+            product_to_dict(p) for p in flask_api.platform.get_all_products()
+        ]
+    }).get_data()
+
+
+def legacy_user_orders():
+    orders = flask_api.platform.get_user_orders("U001", limit=ORDER_COUNT)
+    return jsonify({
+        'orders': [order_to_dict(o) for o in orders]
+    }).get_data()
+
+
+def best_of(func, number=20):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    seed()
+    client = flask_api.app.test_client()
+    cases = [
+        ("/api/products", legacy_products),
+        (
+            f"/api/users/U001/orders?limit={ORDER_COUNT}",
+            legacy_user_orders,
+        ),
+    ]
+    print(f"{'endpoint':<40} {'before [ms]':>12} {'after [ms]':>12}")
+    with flask_api.app.test_request_context():
+        for url, legacy in cases:
+            before = best_of(legacy)
+            after = best_of(lambda: client.get(url).get_data())
+            print(f"{url:<40} {before * 1e3:>12.2f} {after * 1e3:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
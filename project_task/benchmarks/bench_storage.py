@@ -0,0 +1,69 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from ecommerce import ECommercePlatform
+from order import OrderStatus
+from product import Product
+from storage import InMemoryStorage, SQLiteStorage
+from user import User
+
+PRODUCT_COUNT = 10_000
+USER_COUNT = 1_000
+CHECKOUT_COUNT = 5_000
+
+
+def run(storage):
+    platform = ECommercePlatform(storage=storage)
+    results = {}
+
+    started = time.perf_counter()
+    for index in range(PRODUCT_COUNT):
+        platform.register_product(
+            Product(f"P{index:06d}", "Item", 9.99, 10 ** 6)
+        )
+    for index in range(USER_COUNT):
+        user = User(f"U{index:05d}", "user", "user@example.com")
+        user.set_address("Sample Address")
+        platform.register_user(user)
+    results["register/s"] = (
+        (PRODUCT_COUNT + USER_COUNT) / (time.perf_counter() - started)
+    )
+
+    started = time.perf_counter()
+    for index in range(CHECKOUT_COUNT):
+        user_id = f"U{index % USER_COUNT:05d}"
+        platform.add_to_cart(user_id, f"P{index % PRODUCT_COUNT:06d}", 1)
+        platform.add_to_cart(user_id, f"P{index * 7 % PRODUCT_COUNT:06d}", 2)
+        platform.checkout(user_id)
+    results["checkout/s"] = CHECKOUT_COUNT / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for order in platform.get_all_orders():
+        platform.update_order_status(order.order_id, OrderStatus.CONFIRMED)
+    results["status/s"] = CHECKOUT_COUNT / (time.perf_counter() - started)
+
+    platform.close()
+    return results
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        backends = [
+            ("memory", InMemoryStorage()),
+            ("sqlite", SQLiteStorage(str(Path(directory) / "shop.db"))),
+        ]
+        print(f"{'backend':<8} {'register/s':>12} {'checkout/s':>12} "
+              f"{'status/s':>12}")
+        for name, storage in backends:
+            results = run(storage)
+            print(f"{name:<8} {results['register/s']:>12.0f} "
+                  f"{results['checkout/s']:>12.0f} "
+                  f"{results['status/s']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
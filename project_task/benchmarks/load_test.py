@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def open_connection(host, port):
+    return await asyncio.open_connection(host, port)
+
+
+async def fetch(reader, writer, host, path):
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Connection: keep-alive\r\n\r\n".encode("latin-1")
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    status = int(status_line.split()[1])
+
+    length = None
+    chunked = False
+    closing = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        value = value.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value:
+            chunked = True
+        elif name == "connection" and value == "close":
+            closing = True
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length is not None:
+        await reader.readexactly(length)
+    else:
+        await reader.read()
+        closing = True
+    return status, closing
+
+
+async def worker(url, deadline, latencies, errors):
+    parts = urlsplit(url)
+    host = parts.hostname
+    port = parts.port or 80
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    reader, writer = await open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status, closing = await fetch(reader, writer, host, path)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                errors.append("connection")
+                writer.close()
+                reader, writer = await open_connection(host, port)
+                continue
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors.append(status)
+            if closing:
+                writer.close()
+                reader, writer = await open_connection(host, port)
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * fraction))
+    return ordered[index]
+
+
+async def run(url, connections, duration):
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        worker(url, deadline, latencies, errors)
+        for _ in range(connections)
+    ))
+    elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Keep-alive HTTP load test for the Flask and ASGI APIs"
+    )
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'url':<50} {'req/s':>10} {'p50 ms':>10} "
+        f"{'p99 ms':>10} {'errors':>8}"
+    )
+    for url in args.urls:
+        latencies, errors, elapsed = asyncio.run(
+            run(url, args.connections, args.duration)
+        )
+        if not latencies:
+            print(f"{url:<50} {'no responses':>10}")
+            continue
+        print(
+            f"{url:<50} {len(latencies) / elapsed:>10.0f} "
+            f"{statistics.median(latencies) * 1e3:>10.2f} "
+            f"{percentile(latencies, 0.99) * 1e3:>10.2f} "
+            f"{len(errors):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
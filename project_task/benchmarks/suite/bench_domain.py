@@ -0,0 +1,60 @@
+"""Benchmarks for cart and order domain objects."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from cart import Cart
+from datasets import make_order, make_products
+
+CART_SIZES = (10, 1_000, 100_000)
+ORDER_LINES = (1, 10, 100)
+
+
+@pytest.fixture(scope="module")
+def products():
+    """Build one product list shared by all cart sizes."""
+    return make_products(max(CART_SIZES))
+
+
+@pytest.mark.benchmark(group="cart.add_item")
+class TestCartAddItem:
+    """Benchmarks for filling a cart with distinct products."""
+
+    @pytest.mark.parametrize("size", CART_SIZES)
+    def test_add_item(self, benchmark, products, size):
+        """Benchmark adding size distinct products to an empty cart."""
+        selection = products[:size]
+
+        def fill(cart):
+            for product in selection:
+                cart.add_item(product, 1)
+
+        benchmark.pedantic(
+            fill, setup=lambda: ((Cart("U000000"),), {}),
+            rounds=max(5, 10_000 // size),
+        )
+
+
+@pytest.mark.benchmark(group="cart.get_total_price")
+class TestCartTotal:
+    """Benchmarks for reading the cart total."""
+
+    @pytest.mark.parametrize("size", CART_SIZES)
+    def test_get_total_price(self, benchmark, products, size):
+        """Benchmark the total of a cart holding size products."""
+        cart = Cart("U000000")
+        for product in products[:size]:
+            cart.add_item(product, 1)
+        assert benchmark(cart.get_total_price) > 0
+
+
+@pytest.mark.benchmark(group="order.to_xml")
+class TestOrderXml:
+    """Benchmarks for rendering an order as XML."""
+
+    @pytest.mark.parametrize("lines", ORDER_LINES)
+    def test_to_xml(self, benchmark, lines):
+        """Benchmark rendering an order with the given number of lines."""
+        order = make_order(lines)
+        assert benchmark(order.to_xml).count("<item>") == lines
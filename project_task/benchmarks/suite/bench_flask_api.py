@@ -0,0 +1,75 @@
+"""Benchmarks for the main Flask routes through the test client."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("flask")
+
+import flask_api
+from datasets import make_platform, place_orders
+
+CATALOG_SIZES = (100, 10_000)
+ORDER_HISTORY = 200
+
+
+@pytest.fixture(scope="module", params=CATALOG_SIZES)
+def client(request):
+    """Serve a seeded platform of the given catalog size."""
+    platform = make_platform(products=request.param)
+    place_orders(platform, "U000000", ORDER_HISTORY)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(flask_api, "platform", platform)
+        yield flask_api.app.test_client(), platform
+
+
+def get_ok(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.data
+
+
+@pytest.mark.benchmark(group="flask.products")
+class TestProductRoutes:
+    """Benchmarks for catalog routes."""
+
+    def test_list_products(self, benchmark, client):
+        """Benchmark GET /api/products for the whole catalog."""
+        benchmark(get_ok, client[0], "/api/products")
+
+    def test_search_products(self, benchmark, client):
+        """Benchmark a prefix search limited to one page."""
+        benchmark(get_ok, client[0], "/api/products?q=prod&limit=50")
+
+    def test_get_product(self, benchmark, client):
+        """Benchmark GET /api/products/<product_id>."""
+        benchmark(get_ok, client[0], "/api/products/P000042")
+
+
+@pytest.mark.benchmark(group="flask.orders")
+class TestOrderRoutes:
+    """Benchmarks for order routes."""
+
+    def test_user_orders(self, benchmark, client):
+        """Benchmark the first page of a user's order history."""
+        benchmark(get_ok, client[0], "/api/users/U000000/orders?limit=50")
+
+    def test_order_xml(self, benchmark, client):
+        """Benchmark downloading a cached order XML."""
+        benchmark(get_ok, client[0], "/api/orders/ORD-000001/xml")
+
+    def test_add_to_cart_and_checkout(self, benchmark, client):
+        """Benchmark POST /api/cart/<id>/add followed by checkout."""
+        test_client, platform = client
+
+        def place():
+            response = test_client.post(
+                "/api/cart/U000000/add",
+                json={"product_id": "P000001", "quantity": 1},
+            )
+            assert response.status_code == 201
+            response = test_client.post(
+                "/api/orders", json={"user_id": "U000000"}
+            )
+            assert response.status_code == 201
+
+        benchmark.pedantic(place, rounds=200)
@@ -0,0 +1,60 @@
+"""Benchmarks for ECommercePlatform operations."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from datasets import fill_cart, make_platform, place_orders
+
+CHECKOUT_LINES = (1, 10, 100)
+ORDER_HISTORY_SIZES = (10, 1_000, 10_000)
+
+
+@pytest.mark.benchmark(group="platform.checkout")
+class TestCheckout:
+    """Benchmarks for placing orders."""
+
+    @pytest.mark.parametrize("lines", CHECKOUT_LINES)
+    def test_checkout(self, benchmark, lines):
+        """Benchmark checking out a cart with the given number of lines."""
+        platform = make_platform(products=max(CHECKOUT_LINES))
+
+        def setup():
+            fill_cart(platform, "U000000", lines)
+            return ("U000000",), {}
+
+        order = benchmark.pedantic(platform.checkout, setup=setup, rounds=200)
+        assert len(order.items) == lines
+
+
+@pytest.fixture(scope="module", params=ORDER_HISTORY_SIZES)
+def history(request):
+    """Build a platform whose only user has a given number of orders."""
+    platform = make_platform()
+    place_orders(platform, "U000000", request.param)
+    return platform, request.param
+
+
+@pytest.mark.benchmark(group="platform.get_user_orders")
+class TestUserOrders:
+    """Benchmarks for paging through a user's order history."""
+
+    def test_first_page(self, benchmark, history):
+        """Benchmark reading the first page of 50 orders."""
+        platform, size = history
+        orders = benchmark(platform.get_user_orders, "U000000", limit=50)
+        assert len(orders) == min(size, 50)
+
+    def test_page_after_cursor(self, benchmark, history):
+        """Benchmark reading a page from the middle of the history."""
+        platform, size = history
+        cursor = platform.get_user_orders("U000000")[size // 2].order_id
+        benchmark(
+            platform.get_user_orders, "U000000", limit=50,
+            after_order_id=cursor,
+        )
+
+    def test_full_history(self, benchmark, history):
+        """Benchmark reading the whole history without a limit."""
+        platform, size = history
+        assert len(benchmark(platform.get_user_orders, "U000000")) == size
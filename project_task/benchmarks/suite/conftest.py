@@ -0,0 +1,12 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src'))
+
+# Importing flask_api builds the module-level platform and the metrics
+# registry; keep them in memory and uninstrumented whatever the shell sets.
+for name in (
+    'ECOMMERCE_DATABASE', 'ECOMMERCE_EVENT_LOG', 'ECOMMERCE_METRICS',
+):
+    os.environ.pop(name, None)
@@ -0,0 +1,48 @@
+from ecommerce import ECommercePlatform
+from order import Order
+from product import Product
+from user import User
+
+STOCK = 10 ** 9
+
+
+def make_products(count):
+    return [
+        Product(f"P{index:06d}", f"Product {index}",
+                round(1 + index % 500 + 0.99, 2), STOCK)
+        for index in range(count)
+    ]
+
+
+def make_user(index=0):
+    user = User(f"U{index:06d}", f"user{index}", f"user{index}@example.com")
+    user.set_address("Sample Address")
+    return user
+
+
+def make_platform(products=100, users=1):
+    platform = ECommercePlatform()
+    for product in make_products(products):
+        platform.register_product(product)
+    for index in range(users):
+        platform.register_user(make_user(index))
+    return platform
+
+
+def fill_cart(platform, user_id, lines, offset=0):
+    products = len(platform.get_all_products())
+    for line in range(lines):
+        product_id = f"P{(offset + line) % products:06d}"
+        platform.add_to_cart(user_id, product_id, 1)
+
+
+def place_orders(platform, user_id, count, lines=3):
+    for index in range(count):
+        fill_cart(platform, user_id, lines, offset=index)
+        platform.checkout(user_id)
+
+
+def make_order(lines):
+    items = [(product, 1 + index % 3)
+             for index, product in enumerate(make_products(lines))]
+    return Order("ORD-000001", make_user(), items)
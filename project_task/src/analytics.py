@@ -0,0 +1,323 @@
+import heapq
+from array import array
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from money import from_minor_units
+from order import Order
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EPOCH = datetime(1970, 1, 1)
+GRANULARITIES = {"hour": 1, "day": 24}
+RANKINGS = ("revenue", "units", "orders")
+
+_MIN_HOUR = -(2 ** 62)
+_MAX_HOUR = 2 ** 62
+
+
+def hour_bucket(moment: datetime) -> int:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - EPOCH) // timedelta(hours=1)
+
+
+def bucket_start(hour: int) -> datetime:
+    return EPOCH + timedelta(hours=hour)
+
+
+class ProductSales(NamedTuple):
+    product_id: str
+    revenue: float
+    units: int
+    orders: int
+
+
+class SalesBucket(NamedTuple):
+    start: datetime
+    revenue: float
+    units: int
+    orders: int
+
+
+class SalesTotals(NamedTuple):
+    revenue: float
+    units: int
+    orders: int
+
+
+class _Rollup:
+    __slots__ = ("hours", "slots", "revenue", "units", "orders", "_rows")
+
+    def __init__(self):
+        self.hours = array("q")
+        self.slots = array("q")
+        self.revenue = array("q")
+        self.units = array("q")
+        self.orders = array("q")
+        self._rows: Dict[Tuple[int, int], int] = {}
+
+    def add(
+        self, hour: int, slot: int, revenue: int, units: int, orders: int
+    ) -> None:
+        row = self._rows.get((hour, slot))
+        if row is None:
+            self._rows[(hour, slot)] = len(self.hours)
+            self.hours.append(hour)
+            self.slots.append(slot)
+            self.revenue.append(revenue)
+            self.units.append(units)
+            self.orders.append(orders)
+            return
+        self.revenue[row] += revenue
+        self.units[row] += units
+        self.orders[row] += orders
+
+    def measures(self) -> Tuple[array, array, array]:
+        return self.revenue, self.units, self.orders
+
+    def __len__(self) -> int:
+        return len(self.hours)
+
+
+class SalesAnalytics:
+    def __init__(self):
+        self._by_product = _Rollup()
+        self._by_hour = _Rollup()
+        self._product_slots: Dict[str, int] = {}
+        self._product_ids: List[str] = []
+        self._lock = Lock()
+
+    def record_order(self, order: Order) -> None:
+        self._apply(order, 1)
+
+    def cancel_order(self, order: Order) -> None:
+        self._apply(order, -1)
+
+    def top_products(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 10,
+        by: str = "revenue",
+    ) -> List[ProductSales]:
+        if by not in RANKINGS:
+            raise ValueError(f"Unknown ranking: {by}")
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+
+        low, high = self._hour_range(start, end)
+        with self._lock:
+            if not len(self._by_product):
+                return []
+            if np is not None:
+                ranked = self._top_products_numpy(low, high, limit, by)
+            else:
+                ranked = self._top_products_python(low, high, limit, by)
+            return [
+                ProductSales(
+                    self._product_ids[slot], from_minor_units(revenue),
+                    units, orders
+                )
+                for slot, revenue, units, orders in ranked
+            ]
+
+    def timeseries(
+        self,
+        granularity: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        product_id: Optional[str] = None,
+    ) -> List[SalesBucket]:
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+
+        step = GRANULARITIES[granularity]
+        low, high = self._hour_range(start, end)
+        with self._lock:
+            if product_id is None:
+                rollup, slot = self._by_hour, None
+            elif product_id in self._product_slots:
+                rollup = self._by_product
+                slot = self._product_slots[product_id]
+            else:
+                return []
+            if not len(rollup):
+                return []
+            if np is not None:
+                buckets = self._buckets_numpy(rollup, slot, low, high, step)
+            else:
+                buckets = self._buckets_python(rollup, slot, low, high, step)
+            return [
+                SalesBucket(
+                    bucket_start(bucket * step), from_minor_units(revenue),
+                    units, orders
+                )
+                for bucket, revenue, units, orders in buckets
+                if orders
+            ]
+
+    def totals(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> SalesTotals:
+        low, high = self._hour_range(start, end)
+        with self._lock:
+            rollup = self._by_hour
+            if not len(rollup):
+                return SalesTotals(0.0, 0, 0)
+            if np is not None:
+                revenue, units, orders = self._totals_numpy(rollup, low, high)
+            else:
+                revenue, units, orders = self._totals_python(
+                    rollup, low, high
+                )
+        return SalesTotals(from_minor_units(revenue), units, orders)
+
+    def _apply(self, order: Order, sign: int) -> None:
+        hour = hour_bucket(order.creation_date)
+        with self._lock:
+            revenue = 0
+            units = 0
+            for line in order.items:
+                line_total = line.total_minor_units
+                revenue += line_total
+                units += line.quantity
+                self._by_product.add(
+                    hour, self._slot_for(line.product_id),
+                    sign * line_total, sign * line.quantity, sign
+                )
+            self._by_hour.add(hour, 0, sign * revenue, sign * units, sign)
+
+    def _slot_for(self, product_id: str) -> int:
+        slot = self._product_slots.get(product_id)
+        if slot is None:
+            slot = len(self._product_ids)
+            self._product_slots[product_id] = slot
+            self._product_ids.append(product_id)
+        return slot
+
+    @staticmethod
+    def _hour_range(
+        start: Optional[datetime], end: Optional[datetime]
+    ) -> Tuple[int, int]:
+        low = hour_bucket(start) if start is not None else _MIN_HOUR
+        high = hour_bucket(end) if end is not None else _MAX_HOUR
+        return low, high
+
+    def _top_products_numpy(
+        self, low: int, high: int, limit: int, by: str
+    ) -> List[Tuple[int, int, int, int]]:
+        rollup = self._by_product
+        hours = np.frombuffer(rollup.hours, dtype=np.int64)
+        mask = (hours >= low) & (hours < high)
+        slots = np.frombuffer(rollup.slots, dtype=np.int64)[mask]
+        sums = [
+            np.bincount(
+                slots,
+                weights=np.frombuffer(column, dtype=np.int64)[mask],
+                minlength=len(self._product_ids),
+            ).astype(np.int64)
+            for column in rollup.measures()
+        ]
+        key = sums[RANKINGS.index(by)]
+        candidates = np.flatnonzero(sums[2] > 0)
+        if len(candidates) > limit:
+            candidates = candidates[
+                np.argpartition(-key[candidates], limit - 1)[:limit]
+            ]
+        candidates = candidates[np.lexsort((candidates, -key[candidates]))]
+        return [
+            (int(slot), int(sums[0][slot]), int(sums[1][slot]),
+             int(sums[2][slot]))
+            for slot in candidates
+        ]
+
+    def _top_products_python(
+        self, low: int, high: int, limit: int, by: str
+    ) -> List[Tuple[int, int, int, int]]:
+        rollup = self._by_product
+        totals: Dict[int, List[int]] = {}
+        for row, hour in enumerate(rollup.hours):
+            if not low <= hour < high:
+                continue
+            sums = totals.setdefault(rollup.slots[row], [0, 0, 0])
+            sums[0] += rollup.revenue[row]
+            sums[1] += rollup.units[row]
+            sums[2] += rollup.orders[row]
+
+        position = RANKINGS.index(by)
+        ranked = heapq.nlargest(
+            limit,
+            (item for item in totals.items() if item[1][2] > 0),
+            key=lambda item: (item[1][position], -item[0]),
+        )
+        return [(slot, *sums) for slot, sums in ranked]
+
+    @staticmethod
+    def _totals_numpy(
+        rollup: _Rollup, low: int, high: int
+    ) -> Tuple[int, int, int]:
+        hours = np.frombuffer(rollup.hours, dtype=np.int64)
+        mask = (hours >= low) & (hours < high)
+        revenue, units, orders = (
+            int(np.frombuffer(column, dtype=np.int64)[mask].sum())
+            for column in rollup.measures()
+        )
+        return revenue, units, orders
+
+    @staticmethod
+    def _totals_python(
+        rollup: _Rollup, low: int, high: int
+    ) -> Tuple[int, int, int]:
+        rows = [
+            row for row, hour in enumerate(rollup.hours)
+            if low <= hour < high
+        ]
+        revenue, units, orders = (
+            sum(column[row] for row in rows)
+            for column in rollup.measures()
+        )
+        return revenue, units, orders
+
+    @staticmethod
+    def _buckets_numpy(
+        rollup: _Rollup, slot: Optional[int], low: int, high: int, step: int
+    ) -> List[Tuple[int, int, int, int]]:
+        hours = np.frombuffer(rollup.hours, dtype=np.int64)
+        mask = (hours >= low) & (hours < high)
+        if slot is not None:
+            mask &= np.frombuffer(rollup.slots, dtype=np.int64) == slot
+        buckets, inverse = np.unique(hours[mask] // step, return_inverse=True)
+        sums = [
+            np.bincount(
+                inverse,
+                weights=np.frombuffer(column, dtype=np.int64)[mask],
+                minlength=len(buckets),
+            ).astype(np.int64)
+            for column in rollup.measures()
+        ]
+        return [
+            (int(bucket), int(revenue), int(units), int(orders))
+            for bucket, revenue, units, orders in zip(buckets, *sums)
+        ]
+
+    @staticmethod
+    def _buckets_python(
+        rollup: _Rollup, slot: Optional[int], low: int, high: int, step: int
+    ) -> List[Tuple[int, int, int, int]]:
+        totals: Dict[int, List[int]] = {}
+        for row, hour in enumerate(rollup.hours):
+            if not low <= hour < high:
+                continue
+            if slot is not None and rollup.slots[row] != slot:
+                continue
+            sums = totals.setdefault(hour // step, [0, 0, 0])
+            sums[0] += rollup.revenue[row]
+            sums[1] += rollup.units[row]
+            sums[2] += rollup.orders[row]
+        return [(bucket, *totals[bucket]) for bucket in sorted(totals)]
@@ -0,0 +1,657 @@
+import asyncio
+import io
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from time import perf_counter_ns
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List,
+    Optional, Tuple, Union
+)
+from urllib.parse import parse_qs
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bootstrap import (
+    DEFAULT_ORDERS_PAGE_SIZE, DEFAULT_PRODUCTS_PAGE_SIZE,
+    MAX_ORDERS_PAGE_SIZE, MAX_PRODUCTS_PAGE_SIZE, PRODUCT_SEARCH_ARGS,
+    create_platform
+)
+from bulk_import import iter_csv, iter_ndjson
+from cart import CartOperation
+from ecommerce import ECommercePlatform
+import metrics
+from order import OrderStatus, iter_orders_xml
+from product import Product
+from serializers import (
+    cart_to_dict, dumps, encode_list, encode_object, encode_order,
+    encode_product, encode_user, order_to_dict, product_to_dict,
+    sales_bucket_to_dict, user_to_dict
+)
+from user import User
+
+WORKER_THREADS = int(os.environ.get('ECOMMERCE_WORKER_THREADS', '8'))
+STREAM_BATCH_SIZE = 64
+UPLOAD_BUFFER_SIZE = 64 * 1024
+ETAG_PATTERN = re.compile(r'\*|(?:W/)?"([^"]*)"')
+
+Body = Union[bytes, AsyncIterator[bytes]]
+
+
+class BodyStream(io.RawIOBase):
+    def __init__(
+        self,
+        receive: Callable[[], Awaitable[Dict[str, Any]]],
+        loop: asyncio.AbstractEventLoop,
+    ):
+        self._receive = receive
+        self._loop = loop
+        self._chunk = memoryview(b'')
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._chunk and not self._done:
+            message = asyncio.run_coroutine_threadsafe(
+                self._receive(), self._loop
+            ).result()
+            if message['type'] == 'http.disconnect':
+                raise ConnectionError('Client disconnected')
+            self._chunk = memoryview(message.get('body', b''))
+            self._done = not message.get('more_body')
+        count = min(len(buffer), len(self._chunk))
+        buffer[:count] = self._chunk[:count]
+        self._chunk = self._chunk[count:]
+        return count
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "body", "stream")
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        query_string: bytes,
+        headers: List[Tuple[bytes, bytes]],
+        body: bytes,
+        stream: Optional[BodyStream] = None,
+    ):
+        self.method = method
+        self.path = path
+        self.query = parse_qs(query_string.decode('latin-1'))
+        self.headers = {
+            name.decode('latin-1').lower(): value.decode('latin-1')
+            for name, value in headers
+        }
+        self.body = body
+        self.stream = stream
+
+    def arg(
+        self, name: str, default: Any = None,
+        type: Optional[Callable[[str], Any]] = None
+    ) -> Any:
+        values = self.query.get(name)
+        if not values:
+            return default
+        if type is None:
+            return values[0]
+        try:
+            return type(values[0])
+        except ValueError:
+            return default
+
+    def has_args(self, names: Iterable[str]) -> bool:
+        return any(name in self.query for name in names)
+
+    def json(self) -> Any:
+        return json.loads(self.body or b'null')
+
+    @property
+    def mimetype(self) -> str:
+        content_type = self.headers.get('content-type', '')
+        return content_type.split(';', 1)[0].strip().lower()
+
+
+class Response:
+    __slots__ = ("status", "body", "headers")
+
+    def __init__(
+        self,
+        body: Body = b'',
+        status: int = 200,
+        content_type: Optional[str] = 'application/json',
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.status = status
+        self.body = body
+        self.headers = dict(headers or {})
+        if content_type is not None:
+            self.headers['content-type'] = content_type
+
+
+Handler = Callable[..., Awaitable[Response]]
+
+
+class AsgiApp:
+    def __init__(self, platform: ECommercePlatform, workers: int):
+        self.platform = platform
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='asgi-worker'
+        )
+        self._routes: List[Tuple[str, str, re.Pattern, Handler, bool]] = []
+
+    def route(
+        self,
+        pattern: str,
+        methods: Tuple[str, ...] = ("GET",),
+        stream: bool = False,
+    ):
+        regex = re.compile(
+            '^' + re.sub(r'<(\w+)>', r'(?P<\1>[^/]+)', pattern) + '$'
+        )
+
+        def register(handler: Handler) -> Handler:
+            for method in methods:
+                self._routes.append(
+                    (method, pattern, regex, handler, stream)
+                )
+            return handler
+
+        return register
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, partial(func, *args)
+        )
+
+    async def stream_blocking(
+        self, chunks: Iterator[str]
+    ) -> AsyncIterator[bytes]:
+        while True:
+            batch = await self.run_blocking(
+                lambda: ''.join(islice(chunks, STREAM_BATCH_SIZE))
+            )
+            if not batch:
+                return
+            yield batch.encode('utf-8')
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        request = Request(
+            scope['method'], scope['path'], scope.get('query_string', b''),
+            scope.get('headers', []), b''
+        )
+        started = perf_counter_ns()
+        route, response = await self._dispatch(request, receive)
+        try:
+            await self._send(send, response)
+        finally:
+            if metrics.registry.enabled:
+                metrics.registry.observe_request(
+                    request.method, route, response.status,
+                    perf_counter_ns() - started
+                )
+
+    async def _read_body(self, receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def _dispatch(
+        self, request: Request, receive
+    ) -> Tuple[str, Response]:
+        path_matched = False
+        for method, pattern, regex, handler, stream in self._routes:
+            match = regex.match(request.path)
+            if not match:
+                continue
+            if request.method == 'OPTIONS':
+                return pattern, preflight_response()
+            path_matched = True
+            if method != request.method:
+                continue
+            if stream:
+                request.stream = BodyStream(
+                    receive, asyncio.get_running_loop()
+                )
+            else:
+                request.body = await self._read_body(receive)
+            return pattern, await self._handle(request, handler, match)
+
+        if request.method == 'OPTIONS':
+            return metrics.UNMATCHED_ROUTE, preflight_response()
+        if path_matched:
+            return metrics.UNMATCHED_ROUTE, json_response(
+                {'error': 'Method not allowed'}, 405
+            )
+        return metrics.UNMATCHED_ROUTE, json_response(
+            {'error': 'Not found'}, 404
+        )
+
+    async def _handle(
+        self, request: Request, handler: Handler, match: re.Match
+    ) -> Response:
+        try:
+            return await handler(request, **match.groupdict())
+        except Exception as e:
+            return json_response({'error': str(e)}, 400)
+
+    async def _send(self, send, response: Response) -> None:
+        headers = [
+            (name.encode('latin-1'), value.encode('latin-1'))
+            for name, value in response.headers.items()
+        ]
+        headers.append((b'access-control-allow-origin', b'*'))
+        await send({
+            'type': 'http.response.start',
+            'status': response.status,
+            'headers': headers,
+        })
+        if isinstance(response.body, bytes):
+            await send({'type': 'http.response.body', 'body': response.body})
+            return
+        async for chunk in response.body:
+            await send({
+                'type': 'http.response.body', 'body': chunk,
+                'more_body': True,
+            })
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                self.platform.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    body = payload if isinstance(payload, bytes) else dumps(payload)
+    return Response(body, status)
+
+
+def preflight_response() -> Response:
+    return Response(status=204, headers={
+        'access-control-allow-methods': 'GET, POST, PUT, DELETE',
+        'access-control-allow-headers': 'Content-Type, Idempotency-Key',
+    })
+
+
+def not_found(message: str) -> Response:
+    return json_response({'error': message}, 404)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    return any(
+        match.group(0) == '*' or match.group(1) == etag
+        for match in ETAG_PATTERN.finditer(if_none_match)
+    )
+
+
+def import_records(request: Request):
+    if request.stream is not None:
+        stream = io.BufferedReader(request.stream, UPLOAD_BUFFER_SIZE)
+    else:
+        stream = io.BytesIO(request.body)
+    if request.mimetype == 'text/csv':
+        return iter_csv(stream)
+    return iter_ndjson(stream)
+
+
+def analytics_period(
+    request: Request
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    start, end = (
+        datetime.fromisoformat(request.arg(name))
+        if request.arg(name) else None
+        for name in ('start', 'end')
+    )
+    return start, end
+
+
+def orders_page_limit(request: Request) -> int:
+    limit = request.arg('limit', DEFAULT_ORDERS_PAGE_SIZE, type=int)
+    if limit < 1:
+        raise ValueError('Parametr limit musi być większy od zera')
+    return min(limit, MAX_ORDERS_PAGE_SIZE)
+
+
+def page_of(items: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = items[-1].order_id if has_more else None
+    return items, next_cursor
+
+
+platform = create_platform()
+app = AsgiApp(platform, WORKER_THREADS)
+
+
+@app.route("/metrics")
+async def get_metrics(request: Request) -> Response:
+    return Response(
+        metrics.registry.render().encode('utf-8'),
+        content_type=metrics.CONTENT_TYPE
+    )
+
+
+@app.route("/api/products")
+async def get_products(request: Request) -> Response:
+    if request.has_args(PRODUCT_SEARCH_ARGS):
+        search = partial(
+            platform.search_products,
+            query=request.arg('q'),
+            contains=request.arg('contains'),
+            min_price=request.arg('min_price', type=float),
+            max_price=request.arg('max_price', type=float),
+            in_stock=request.arg('in_stock') in ('1', 'true'),
+            sort=request.arg('sort', 'name'),
+            limit=min(
+                request.arg('limit', DEFAULT_PRODUCTS_PAGE_SIZE, type=int),
+                MAX_PRODUCTS_PAGE_SIZE
+            ),
+            offset=request.arg('offset', 0, type=int)
+        )
+    else:
+        search = platform.get_all_products
+    products = await app.run_blocking(search)
+    return json_response(
+        encode_list('products', map(encode_product, products))
+    )
+
+
+@app.route("/api/products", methods=("POST",))
+async def create_product(request: Request) -> Response:
+    data = request.json()
+    product = Product(
+        data['product_id'],
+        data['name'],
+        float(data['price']),
+        int(data['stock'])
+    )
+    await app.run_blocking(platform.register_product, product)
+    return json_response({
+        'message': 'Produkt dodany',
+        'product': product_to_dict(product)
+    }, 201)
+
+
+@app.route("/api/products/import", methods=("POST",), stream=True)
+async def import_products(request: Request) -> Response:
+    report = await app.run_blocking(
+        platform.register_products_bulk,
+        import_records(request),
+        request.arg('batch_size', 1000, type=int)
+    )
+    return json_response(report.to_dict())
+
+
+@app.route("/api/products/<product_id>")
+async def get_product(request: Request, product_id: str) -> Response:
+    product = await app.run_blocking(platform.get_product, product_id)
+    if not product:
+        return not_found('Produkt nie znaleziony')
+    return json_response(encode_object('product', encode_product(product)))
+
+
+@app.route("/api/users")
+async def get_users(request: Request) -> Response:
+    users = platform._users
+    return json_response(
+        encode_list('users', map(encode_user, users.values()))
+    )
+
+
+@app.route("/api/users", methods=("POST",))
+async def create_user(request: Request) -> Response:
+    data = request.json()
+    user = User(data['user_id'], data['username'], data['email'])
+    if data.get('address'):
+        user.set_address(data['address'])
+    await app.run_blocking(platform.register_user, user)
+    return json_response({
+        'message': 'Użytkownik utworzony',
+        'user': user_to_dict(user)
+    }, 201)
+
+
+@app.route("/api/users/import", methods=("POST",), stream=True)
+async def import_users(request: Request) -> Response:
+    report = await app.run_blocking(
+        platform.register_users_bulk,
+        import_records(request),
+        request.arg('batch_size', 1000, type=int)
+    )
+    return json_response(report.to_dict())
+
+
+@app.route("/api/users/<user_id>")
+async def get_user(request: Request, user_id: str) -> Response:
+    user = await app.run_blocking(platform.get_user, user_id)
+    if not user:
+        return not_found('Użytkownik nie znaleziony')
+    return json_response(encode_object('user', encode_user(user)))
+
+
+@app.route("/api/users/<user_id>/address", methods=("POST",))
+async def update_user_address(request: Request, user_id: str) -> Response:
+    user = await app.run_blocking(platform.get_user, user_id)
+    if not user:
+        return not_found('Użytkownik nie znaleziony')
+    data = request.json()
+    await app.run_blocking(
+        platform.set_user_address, user_id, data['address']
+    )
+    return json_response({
+        'message': 'Adres zaktualizowany',
+        'user': user_to_dict(user)
+    })
+
+
+@app.route("/api/users/<user_id>/orders")
+async def get_user_orders(request: Request, user_id: str) -> Response:
+    if not await app.run_blocking(platform.get_user, user_id):
+        return not_found('Użytkownik nie znaleziony')
+    limit = orders_page_limit(request)
+    orders, next_cursor = page_of(platform.get_user_orders(
+        user_id, limit=limit + 1,
+        after_order_id=request.arg('after_order_id')
+    ), limit)
+    return json_response(encode_list(
+        'orders', map(encode_order, orders), next_cursor=next_cursor
+    ))
+
+
+@app.route("/api/cart/<user_id>")
+async def get_cart(request: Request, user_id: str) -> Response:
+    cart = await app.run_blocking(platform.get_cart, user_id)
+    if not cart:
+        return not_found('Użytkownik nie znaleziony')
+    return json_response(cart_to_dict(cart))
+
+
+@app.route("/api/cart/<user_id>/add", methods=("POST",))
+async def add_to_cart(request: Request, user_id: str) -> Response:
+    data = request.json()
+    added = await app.run_blocking(
+        platform.add_to_cart, user_id, data['product_id'], data['quantity']
+    )
+    if not added:
+        return json_response({'error': 'Nie można dodać do koszyka'}, 400)
+    return json_response({'message': 'Produkt dodany do koszyka'}, 201)
+
+
+@app.route("/api/cart/<user_id>/remove", methods=("DELETE",))
+async def remove_from_cart(request: Request, user_id: str) -> Response:
+    data = request.json()
+    await app.run_blocking(
+        platform.remove_from_cart, user_id, data['product_id']
+    )
+    return json_response({'message': 'Produkt usunięty z koszyka'})
+
+
+@app.route("/api/cart/<user_id>/batch", methods=("POST",))
+async def apply_cart_batch(request: Request, user_id: str) -> Response:
+    data = request.json()
+    operations = [
+        CartOperation.from_dict(operation)
+        for operation in data['operations']
+    ]
+    result = await app.run_blocking(
+        platform.apply_cart_batch, user_id, operations,
+        data.get('atomic', True)
+    )
+    if result is None:
+        return not_found('Użytkownik nie znaleziony')
+    status = 409 if result.failed and not result.applied else 200
+    return json_response(result.to_dict(), status)
+
+
+@app.route("/api/orders", methods=("POST",))
+async def create_order(request: Request) -> Response:
+    data = request.json()
+    order = await app.run_blocking(
+        platform.checkout, data['user_id'],
+        request.headers.get('idempotency-key')
+    )
+    if not order:
+        return json_response({
+            'error': 'Nie można utworzyć zamówienia. Sprawdź czy koszyk nie '
+                     'jest pusty i czy użytkownik ma ustawiony adres.'
+        }, 400)
+    return json_response({
+        'message': 'Zamówienie złożone',
+        'order': order_to_dict(order)
+    }, 201)
+
+
+@app.route("/api/orders")
+async def get_orders_by_status(request: Request) -> Response:
+    try:
+        status = OrderStatus(request.arg('status', '').lower())
+    except ValueError:
+        return json_response({'error': 'Nieprawidłowy status'}, 400)
+    limit = orders_page_limit(request)
+    orders, next_cursor = page_of(await app.run_blocking(
+        platform.get_orders_by_status, status, limit + 1,
+        request.arg('after_order_id')
+    ), limit)
+    return json_response(encode_list(
+        'orders', map(encode_order, orders), next_cursor=next_cursor
+    ))
+
+
+@app.route("/api/orders/xml")
+async def download_all_orders_xml(request: Request) -> Response:
+    chunks = iter_orders_xml(platform.get_all_orders())
+    return Response(
+        app.stream_blocking(chunks),
+        content_type='application/xml',
+        headers={'content-disposition': 'attachment; filename=orders.xml'}
+    )
+
+
+@app.route("/api/orders/<order_id>")
+async def get_order(request: Request, order_id: str) -> Response:
+    order = platform.get_order(order_id)
+    if not order:
+        return not_found('Zamówienie nie znaleziono')
+    return json_response(encode_object('order', encode_order(order)))
+
+
+@app.route("/api/orders/<order_id>/status", methods=("PUT",))
+async def update_order_status(request: Request, order_id: str) -> Response:
+    order = platform.get_order(order_id)
+    if not order:
+        return not_found('Zamówienie nie znaleziono')
+    try:
+        new_status = OrderStatus(request.json()['status'].lower())
+    except ValueError:
+        return json_response({'error': 'Nieprawidłowy status'}, 400)
+
+    old_status = order.status
+    updated = await app.run_blocking(
+        platform.update_order_status, order_id, new_status
+    )
+    if not updated:
+        return json_response({
+            'error': f'Niedozwolona zmiana statusu z '
+                     f'{old_status.value} na {new_status.value}'
+        }, 409)
+    return json_response({'message': 'Status zamówienia zaktualizowany'})
+
+
+@app.route("/api/orders/<order_id>/xml")
+async def download_order_xml(request: Request, order_id: str) -> Response:
+    export = await app.run_blocking(platform.get_order_xml, order_id)
+    if not export:
+        return not_found('Zamówienie nie znaleziono')
+
+    etag, xml_content = export
+    headers = {
+        'etag': f'"{etag}"',
+        'content-disposition': f'attachment; filename={order_id}.xml',
+    }
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status=304, content_type=None, headers=headers)
+    return Response(
+        xml_content, content_type='application/xml', headers=headers
+    )
+
+
+@app.route("/api/analytics/products")
+async def get_top_products(request: Request) -> Response:
+    start, end = analytics_period(request)
+    products = await app.run_blocking(
+        platform.get_top_products, start, end,
+        min(request.arg('limit', 10, type=int), MAX_PRODUCTS_PAGE_SIZE),
+        request.arg('by', 'revenue')
+    )
+    return json_response({
+        'products': [sales._asdict() for sales in products]
+    })
+
+
+@app.route("/api/analytics/timeseries")
+async def get_sales_timeseries(request: Request) -> Response:
+    start, end = analytics_period(request)
+    granularity = request.arg('granularity', 'day')
+    buckets = await app.run_blocking(
+        platform.get_sales_timeseries, granularity, start, end,
+        request.arg('product_id')
+    )
+    return json_response({
+        'granularity': granularity,
+        'buckets': [sales_bucket_to_dict(bucket) for bucket in buckets]
+    })
+
+
+@app.route("/api/analytics/summary")
+async def get_sales_summary(request: Request) -> Response:
+    start, end = analytics_period(request)
+    totals = await app.run_blocking(platform.get_sales_totals, start, end)
+    return json_response(totals._asdict())
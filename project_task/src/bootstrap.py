@@ -0,0 +1,69 @@
+import os
+from pathlib import Path
+from ecommerce import ECommercePlatform
+from event_log import EventLogStorage
+from product import Product
+from storage import InMemoryStorage, SQLiteStorage, Storage
+from user import User
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+DEFAULT_PRODUCTS_PAGE_SIZE = 50
+MAX_PRODUCTS_PAGE_SIZE = 500
+PRODUCT_SEARCH_ARGS = (
+    'q', 'contains', 'min_price', 'max_price', 'in_stock', 'sort',
+    'limit', 'offset',
+)
+DEFAULT_ORDERS_PAGE_SIZE = 50
+MAX_ORDERS_PAGE_SIZE = 200
+
+RESERVATION_TTL = float(os.environ.get('ECOMMERCE_RESERVATION_TTL', '900'))
+RESERVATION_SWEEP_INTERVAL = float(
+    os.environ.get('ECOMMERCE_RESERVATION_SWEEP', '30')
+)
+
+
+def create_storage() -> Storage:
+    database = os.environ.get('ECOMMERCE_DATABASE')
+    if database:
+        return SQLiteStorage(database)
+    event_log = os.environ.get('ECOMMERCE_EVENT_LOG')
+    if event_log:
+        return EventLogStorage(event_log)
+    return InMemoryStorage()
+
+
+def seed_demo_data(platform: ECommercePlatform) -> None:
+    demo_products = [
+        Product("P001", "Laptop", 999.99, 10),
+        Product("P002", "Mysz", 29.99, 50),
+        Product("P003", "Klawiatura", 99.99, 30),
+        Product("P004", "Monitor", 299.99, 15),
+        Product("P005", "Headphones", 149.99, 20),
+    ]
+
+    demo_users = [
+        User("U001", "john_doe", "john@example.com"),
+        User("U002", "anna_nowak", "anna@example.com"),
+        User("U003", "bob_smith", "bob@example.com"),
+    ]
+
+    for product in demo_products:
+        platform.register_product(product)
+
+    for user in demo_users:
+        user.set_address("Sample Address")
+        platform.register_user(user)
+
+
+def create_platform(data_dir: Path = DATA_DIR) -> ECommercePlatform:
+    data_dir.mkdir(parents=True, exist_ok=True)
+    platform = ECommercePlatform(
+        export_dir=data_dir / 'exports',
+        storage=create_storage(),
+        reservation_ttl=RESERVATION_TTL,
+        reservation_sweep_interval=RESERVATION_SWEEP_INTERVAL,
+    )
+    if not platform.get_all_products():
+        seed_demo_data(platform)
+    return platform
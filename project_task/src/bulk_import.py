@@ -0,0 +1,155 @@
+import csv
+import json
+import math
+from typing import (
+    IO, Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Union
+)
+from product import Product
+from user import User
+
+Record = Union[str, bytes, Mapping[str, Any], "InvalidRecord"]
+
+MAX_REPORTED_ERRORS = 1000
+
+
+class RowError(NamedTuple):
+    row: int
+    error: str
+
+
+class InvalidRecord(NamedTuple):
+    error: str
+
+
+class ImportReport:
+    __slots__ = ("imported", "failed", "errors")
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[RowError] = []
+
+    def add_error(self, row: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(row, error))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": [error._asdict() for error in self.errors],
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"ImportReport(imported={self.imported}, failed={self.failed})"
+        )
+
+
+def iter_ndjson(stream: IO[Any]) -> Iterator[Union[str, bytes]]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def iter_csv(stream: IO[Any]) -> Iterator[Record]:
+    lines = (
+        line.decode("utf-8", "surrogateescape")
+        if isinstance(line, bytes) else line
+        for line in stream
+    )
+    for row in csv.DictReader(lines):
+        try:
+            for value in row.values():
+                if isinstance(value, str):
+                    value.encode("utf-8")
+        except UnicodeEncodeError:
+            yield InvalidRecord("Row is not valid UTF-8")
+        else:
+            yield row
+
+
+def read_records(records: Iterable[Record]) -> Iterator[Record]:
+    iterator = iter(records)
+    while True:
+        try:
+            record = next(iterator)
+        except StopIteration:
+            return
+        except (ValueError, csv.Error) as error:
+            yield InvalidRecord(f"Unreadable input: {error}")
+            return
+        yield record
+
+
+def product_from_record(record: Record) -> Product:
+    row = _as_mapping(record)
+    return Product(
+        _required_text(row, "product_id"),
+        _required_text(row, "name"),
+        _required_float(row, "price"),
+        _required_int(row, "stock"),
+    )
+
+
+def user_from_record(record: Record) -> User:
+    row = _as_mapping(record)
+    user = User(
+        _required_text(row, "user_id"),
+        _required_text(row, "username"),
+        _required_text(row, "email"),
+    )
+    if row.get("address"):
+        user.set_address(str(row["address"]))
+    return user
+
+
+def _as_mapping(record: Record) -> Mapping[str, Any]:
+    if isinstance(record, InvalidRecord):
+        raise ValueError(record.error)
+    if isinstance(record, (str, bytes)):
+        record = json.loads(record)
+    if not isinstance(record, Mapping):
+        raise ValueError("Row must be an object")
+    return record
+
+
+def _required(row: Mapping[str, Any], field: str) -> Any:
+    value = row.get(field)
+    if value is None or value == "":
+        raise ValueError(f"Missing field: {field}")
+    return value
+
+
+def _required_int(row: Mapping[str, Any], field: str) -> int:
+    value = _required(row, field)
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"Field {field} must be an integer")
+    return int(value)
+
+
+def _required_float(row: Mapping[str, Any], field: str) -> float:
+    value = float(_required(row, field))
+    if not math.isfinite(value):
+        raise ValueError(f"Field {field} must be a finite number")
+    return value
+
+
+def _required_text(row: Mapping[str, Any], field: str) -> str:
+    value = str(_required(row, field)).strip()
+    if not value:
+        raise ValueError(f"Missing field: {field}")
+    return value
+
+
+def batched(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    batch: List[Record] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
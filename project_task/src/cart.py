@@ -1,10 +1,58 @@
-from typing import Dict, List, Tuple
+from typing import (
+    Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+)
+from money import from_minor_units, to_minor_units
 from product import Product
 
+CART_ACTIONS = ("add", "update", "remove")
+
+
+class CartOperation(NamedTuple):
+    action: str
+    product_id: str
+    quantity: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "CartOperation":
+        return cls(
+            str(data["action"]),
+            str(data["product_id"]),
+            int(data.get("quantity", 0)),
+        )
+
+
+class OperationResult(NamedTuple):
+    index: int
+    action: str
+    product_id: str
+    ok: bool
+    error: Optional[str] = None
+
+
+class BatchResult(NamedTuple):
+    applied: bool
+    results: List[OperationResult]
+
+    @property
+    def failed(self) -> int:
+        return sum(not result.ok for result in self.results)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "applied": self.applied,
+            "failed": self.failed,
+            "results": [result._asdict() for result in self.results],
+        }
+
+
 class Cart:
+    __slots__ = ("user_id", "_items", "_unit_prices", "_total_minor")
+
     def __init__(self, user_id: str):
         self.user_id = user_id
         self._items: Dict[str, Tuple[Product, int]] = {}
+        self._unit_prices: Dict[str, int] = {}
+        self._total_minor = 0
 
     def add_item(self, product: Product, quantity: int) -> bool:
         if quantity <= 0:
@@ -16,17 +64,22 @@ class Cart:
             if new_quantity > product.stock:
                 return False
             self._items[product.product_id] = (product, new_quantity)
+            unit_price = self._unit_prices[product.product_id]
         else:
             if quantity > product.stock:
                 return False
             self._items[product.product_id] = (product, quantity)
+            unit_price = to_minor_units(product.price)
+            self._unit_prices[product.product_id] = unit_price
 
+        self._total_minor += unit_price * quantity
         return True
 
     def remove_item(self, product_id: str) -> bool:
         if product_id not in self._items:
             return False
-        del self._items[product_id]
+        _, quantity = self._items.pop(product_id)
+        self._total_minor -= self._unit_prices.pop(product_id) * quantity
         return True
 
     def update_quantity(self, product_id: str, quantity: int) -> bool:
@@ -37,28 +90,142 @@ class Cart:
             return False
 
         if quantity == 0:
-            del self._items[product_id]
-            return True
+            return self.remove_item(product_id)
 
-        product, _ = self._items[product_id]
+        product, current_qty = self._items[product_id]
         if quantity > product.stock:
             return False
 
         self._items[product_id] = (product, quantity)
+        self._total_minor += (
+            self._unit_prices[product_id] * (quantity - current_qty)
+        )
         return True
 
+    def apply_batch(
+        self,
+        operations: Sequence[CartOperation],
+        products: Mapping[str, Product],
+        atomic: bool = True,
+        limits: Optional[Mapping[str, int]] = None,
+    ) -> BatchResult:
+        if not operations:
+            raise ValueError("Batch must contain at least one operation")
+
+        quantities = {
+            product_id: quantity
+            for product_id, (_, quantity) in self._items.items()
+        }
+        errors: List[Optional[str]] = []
+        touched: Dict[str, List[int]] = {}
+        failed: Set[str] = set()
+        for index, operation in enumerate(operations):
+            error = self._simulate(operation, products, quantities)
+            errors.append(error)
+            if error is None:
+                touched.setdefault(operation.product_id, []).append(index)
+            else:
+                failed.add(operation.product_id)
+
+        accepted: List[Product] = []
+        for product_id, indexes in touched.items():
+            if product_id in failed:
+                for index in indexes:
+                    errors[index] = "Another operation on product failed"
+                continue
+            product = (
+                self._items[product_id][0] if product_id in self._items
+                else products[product_id]
+            )
+            limit = (
+                limits.get(product_id, product.stock) if limits is not None
+                else product.stock
+            )
+            if quantities[product_id] > limit:
+                for index in indexes:
+                    errors[index] = "Insufficient stock"
+            else:
+                accepted.append(product)
+
+        results = [
+            OperationResult(
+                index, operation.action, operation.product_id,
+                error is None, error
+            )
+            for index, (operation, error)
+            in enumerate(zip(operations, errors))
+        ]
+        if atomic and any(error is not None for error in errors):
+            return BatchResult(False, results)
+
+        for product in accepted:
+            self.set_quantity(product, quantities[product.product_id])
+        return BatchResult(bool(accepted), results)
+
+    @staticmethod
+    def _simulate(
+        operation: CartOperation,
+        products: Mapping[str, Product],
+        quantities: Dict[str, int],
+    ) -> Optional[str]:
+        product_id = operation.product_id
+        if operation.action == "add":
+            if operation.quantity <= 0:
+                return "Quantity must be positive"
+            if product_id not in quantities and product_id not in products:
+                return "Unknown product"
+            quantities[product_id] = (
+                quantities.get(product_id, 0) + operation.quantity
+            )
+        elif operation.action == "update":
+            if operation.quantity < 0:
+                return "Quantity cannot be negative"
+            if not quantities.get(product_id):
+                return "Product not in cart"
+            quantities[product_id] = operation.quantity
+        elif operation.action == "remove":
+            if not quantities.get(product_id):
+                return "Product not in cart"
+            quantities[product_id] = 0
+        else:
+            return f"Unknown action: {operation.action}"
+        return None
+
+    def set_quantity(self, product: Product, quantity: int) -> None:
+        if quantity < 0:
+            raise ValueError("Quantity cannot be negative")
+
+        product_id = product.product_id
+        if quantity == 0:
+            if product_id in self._items:
+                self.remove_item(product_id)
+            return
+
+        _, current_qty = self._items.get(product_id, (product, 0))
+        if product_id not in self._unit_prices:
+            self._unit_prices[product_id] = to_minor_units(product.price)
+        self._items[product_id] = (product, quantity)
+        self._total_minor += (
+            self._unit_prices[product_id] * (quantity - current_qty)
+        )
+
+    def get_quantity(self, product_id: str) -> int:
+        item = self._items.get(product_id)
+        return item[1] if item else 0
+
     def get_items(self) -> List[Tuple[Product, int]]:
         return list(self._items.values())
 
+    def get_total_minor_units(self) -> int:
+        return self._total_minor
+
     def get_total_price(self) -> float:
-        total = sum(
-            product.price * quantity
-            for product, quantity in self._items.values()
-        )
-        return total
+        return from_minor_units(self._total_minor)
 
     def clear(self) -> None:
         self._items.clear()
+        self._unit_prices.clear()
+        self._total_minor = 0
 
     def is_empty(self) -> bool:
         return len(self._items) == 0
@@ -0,0 +1,216 @@
+import math
+import re
+from bisect import bisect_left, bisect_right, insort
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from product import Product
+
+SORT_KEYS = ("name", "-name", "price", "-price")
+RESORT_THRESHOLD = 256
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class CatalogIndex:
+    def __init__(self):
+        self._products: Dict[str, Product] = {}
+        self._by_price: List[Tuple[float, str]] = []
+        self._prices: List[float] = []
+        self._by_name: List[Tuple[str, str]] = []
+        self._tokens: Dict[str, Set[str]] = {}
+        self._sorted_tokens: List[str] = []
+        self._pending: List[Product] = []
+        self._pending_tokens: List[str] = []
+        self._lock = Lock()
+
+    def add(self, product: Product) -> None:
+        with self._lock:
+            self._products[product.product_id] = product
+            self._pending.append(product)
+            for token in tokenize(product.name):
+                if token not in self._tokens:
+                    self._tokens[token] = set()
+                    self._pending_tokens.append(token)
+                self._tokens[token].add(product.product_id)
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        contains: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock: bool = False,
+        sort: str = "name",
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Product]:
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        if offset < 0:
+            raise ValueError("Offset cannot be negative")
+
+        with self._lock:
+            self._refresh()
+            candidates = self._match_text(query, contains)
+            low, high = self._price_bounds(min_price, max_price)
+
+            if candidates is not None and self._prefer_sorting(
+                len(candidates), high - low, offset + limit
+            ):
+                ordered = self._sort_candidates(candidates, sort)
+            elif sort.lstrip("-") == "price":
+                ordered = self._scan(self._by_price, low, high, sort)
+            else:
+                ordered = self._scan(
+                    self._by_name, 0, len(self._by_name), sort
+                )
+
+            results: List[Product] = []
+            skipped = 0
+            for product_id in ordered:
+                product = self._products[product_id]
+                if candidates is not None and product_id not in candidates:
+                    continue
+                if min_price is not None and product.price < min_price:
+                    continue
+                if max_price is not None and product.price > max_price:
+                    continue
+                if in_stock and product.available <= 0:
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                results.append(product)
+                if len(results) == limit:
+                    break
+            return results
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    @staticmethod
+    def _prefer_sorting(matched: int, scanned: int, wanted: int) -> bool:
+        if matched == 0:
+            return True
+        if matched >= scanned:
+            return False
+        expected_scan = wanted * scanned / matched
+        return matched * math.log2(matched + 1) < expected_scan
+
+    def _refresh(self) -> None:
+        if not self._pending:
+            return
+
+        if len(self._pending) <= RESORT_THRESHOLD:
+            for product in self._pending:
+                entry = (product.price, product.product_id)
+                position = bisect_right(self._by_price, entry)
+                self._by_price.insert(position, entry)
+                self._prices.insert(position, product.price)
+                insort(
+                    self._by_name, (product.name.lower(), product.product_id)
+                )
+            for token in self._pending_tokens:
+                insort(self._sorted_tokens, token)
+        else:
+            self._by_price.extend(
+                (product.price, product.product_id)
+                for product in self._pending
+            )
+            self._by_price.sort()
+            self._prices = [price for price, _ in self._by_price]
+            self._by_name.extend(
+                (product.name.lower(), product.product_id)
+                for product in self._pending
+            )
+            self._by_name.sort()
+            self._sorted_tokens.extend(self._pending_tokens)
+            self._sorted_tokens.sort()
+
+        self._pending.clear()
+        self._pending_tokens.clear()
+
+    def _match_text(
+        self, query: Optional[str], contains: Optional[str]
+    ) -> Optional[Set[str]]:
+        candidates: Optional[Set[str]] = None
+        for prefix in tokenize(query or ""):
+            matches = self._ids_for_prefix(prefix)
+            candidates = (
+                matches if candidates is None else candidates & matches
+            )
+
+        if contains:
+            needle = contains.lower()
+            words = tokenize(needle)
+            if words:
+                longest = max(words, key=len)
+                matches = set()
+                for token in self._sorted_tokens:
+                    if longest in token:
+                        matches |= self._tokens[token]
+                if needle != longest:
+                    matches = {
+                        product_id for product_id in matches
+                        if needle in self._products[product_id].name.lower()
+                    }
+            else:
+                matches = {
+                    product_id for product_id, product
+                    in self._products.items()
+                    if needle in product.name.lower()
+                }
+            candidates = (
+                matches if candidates is None else candidates & matches
+            )
+        return candidates
+
+    def _ids_for_prefix(self, prefix: str) -> Set[str]:
+        position = bisect_left(self._sorted_tokens, prefix)
+        matches: Set[str] = set()
+        while position < len(self._sorted_tokens):
+            token = self._sorted_tokens[position]
+            if not token.startswith(prefix):
+                break
+            matches |= self._tokens[token]
+            position += 1
+        return matches
+
+    def _price_bounds(
+        self, min_price: Optional[float], max_price: Optional[float]
+    ) -> Tuple[int, int]:
+        low = 0
+        high = len(self._prices)
+        if min_price is not None:
+            low = bisect_left(self._prices, min_price)
+        if max_price is not None:
+            high = bisect_right(self._prices, max_price)
+        return low, high
+
+    def _sort_candidates(self, candidates: Set[str], sort: str) -> List[str]:
+        by_price = sort.lstrip("-") == "price"
+
+        def sort_key(product_id: str) -> Tuple[object, str]:
+            product = self._products[product_id]
+            if by_price:
+                return product.price, product_id
+            return product.name.lower(), product_id
+
+        return sorted(
+            candidates, key=sort_key, reverse=sort.startswith("-")
+        )
+
+    @staticmethod
+    def _scan(
+        index: List[Tuple[object, str]], low: int, high: int, sort: str
+    ) -> Iterator[str]:
+        positions: Iterable[int] = range(low, high)
+        if sort.startswith("-"):
+            positions = reversed(positions)
+        return (index[position][1] for position in positions)
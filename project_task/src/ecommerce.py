@@ -1,84 +1,421 @@
-from typing import Dict, List, Optional
-from cart import Cart
-from order import Order, OrderStatus
+import hashlib
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from analytics import (
+    ProductSales, SalesAnalytics, SalesBucket, SalesTotals
+)
+from bulk_import import (
+    ImportReport, Record, batched, product_from_record, read_records,
+    user_from_record
+)
+from cart import BatchResult, Cart, CartOperation
+from catalog_index import CatalogIndex
+from export_cache import Export, XmlExportCache
+from idempotency import IdempotencyTable
+from metrics import timed
+from order import Order, OrderLine, OrderStatus, write_orders_xml
 from product import Product
+from reservations import ReservationBook
+from status_index import SortedOrderSet
+from storage import InMemoryStorage, Storage
 from user import User
 
 class ECommercePlatform:
-    def __init__(self):
+    def __init__(
+        self,
+        export_dir: Optional[Path] = None,
+        export_cache_entries: int = 1024,
+        export_cache_bytes: int = 32 * 1024 * 1024,
+        storage: Optional[Storage] = None,
+        reservation_ttl: float = 900.0,
+        reservation_sweep_interval: Optional[float] = None,
+        idempotency_keys: int = 100_000,
+        idempotency_ttl: float = 86_400.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self._products: Dict[str, Product] = {}
         self._users: Dict[str, User] = {}
         self._carts: Dict[str, Cart] = {}
         self._orders: Dict[str, Order] = {}
+        self._user_orders: Dict[str, List[Order]] = {}
+        self._user_order_positions: Dict[str, int] = {}
+        self._order_sequences: Dict[str, int] = {}
+        self._orders_by_status: Dict[OrderStatus, SortedOrderSet] = {
+            status: SortedOrderSet() for status in OrderStatus
+        }
+        self._status_lock = Lock()
         self._order_counter = 0
+        self._order_counter_lock = Lock()
+        self._registry_lock = Lock()
+        self._product_locks: Dict[str, Lock] = {}
+        self._user_locks: Dict[str, Lock] = {}
+        self._xml_exports = XmlExportCache(
+            export_cache_entries, export_cache_bytes, export_dir
+        )
+        self._catalog = CatalogIndex()
+        self._analytics = SalesAnalytics()
+        self._reservations = ReservationBook(reservation_ttl, clock)
+        self._checkout_keys = IdempotencyTable(
+            idempotency_keys, idempotency_ttl, clock
+        )
+        self._storage = storage if storage is not None else InMemoryStorage()
+        self._load_from_storage()
+        self._closed = Event()
+        self._sweeper: Optional[Thread] = None
+        if reservation_sweep_interval is not None:
+            if reservation_sweep_interval <= 0:
+                raise ValueError("Sweep interval must be positive")
+            self._sweeper = Thread(
+                target=self._sweep_reservations,
+                args=(reservation_sweep_interval,),
+                name="reservation-sweeper", daemon=True,
+            )
+            self._sweeper.start()
 
+    def _load_from_storage(self) -> None:
+        for product in self._storage.load_products():
+            self._add_product(product)
+        for user in self._storage.load_users():
+            self._add_user(user)
+        for order in self._storage.load_orders(self._users):
+            self._add_order(order)
+            self._order_counter = max(
+                self._order_counter, int(order.order_id.split("-")[1])
+            )
+        for user_id, product_id, quantity in self._storage.load_carts():
+            self._carts[user_id].set_quantity(
+                self._products[product_id], quantity
+            )
+
+    @timed
     def register_product(self, product: Product) -> bool:
-        if product.product_id in self._products:
-            return False
-        self._products[product.product_id] = product
+        with self._registry_lock:
+            if product.product_id in self._products:
+                return False
+            if not self._storage.insert_products([product]):
+                return False
+            self._add_product(product)
         return True
 
+    @timed
+    def register_products_bulk(
+        self, records: Iterable[Record], batch_size: int = 1000
+    ) -> ImportReport:
+        return self._register_bulk(
+            records, batch_size, product_from_record,
+            lambda product: product.product_id,
+            self._products, self._storage.insert_products, self._add_product,
+        )
+
+    def _add_product(self, product: Product) -> None:
+        self._product_locks[product.product_id] = Lock()
+        self._products[product.product_id] = product
+        self._catalog.add(product)
+
+    @timed
     def register_user(self, user: User) -> bool:
-        if user.user_id in self._users:
-            return False
-        self._users[user.user_id] = user
+        with self._registry_lock:
+            if user.user_id in self._users:
+                return False
+            if not self._storage.insert_users([user]):
+                return False
+            self._add_user(user)
+        return True
+
+    @timed
+    def register_users_bulk(
+        self, records: Iterable[Record], batch_size: int = 1000
+    ) -> ImportReport:
+        return self._register_bulk(
+            records, batch_size, user_from_record,
+            lambda user: user.user_id,
+            self._users, self._storage.insert_users, self._add_user,
+        )
+
+    def _register_bulk(
+        self,
+        records: Iterable[Record],
+        batch_size: int,
+        parse: Callable[[Record], Any],
+        key: Callable[[Any], str],
+        registry: Dict[str, Any],
+        insert: Callable[[List[Any]], List[Any]],
+        add: Callable[[Any], None],
+    ) -> ImportReport:
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+
+        report = ImportReport()
+        row_number = 0
+        for batch in batched(read_records(records), batch_size):
+            parsed = []
+            for record in batch:
+                row_number += 1
+                try:
+                    parsed.append((row_number, parse(record)))
+                except (ValueError, TypeError) as error:
+                    report.add_error(row_number, str(error))
+
+            with self._registry_lock:
+                accepted: Dict[str, Any] = {}
+                rows: Dict[str, int] = {}
+                for row, item in parsed:
+                    item_id = key(item)
+                    if item_id in registry or item_id in accepted:
+                        report.add_error(row, f"Duplicate id: {item_id}")
+                    else:
+                        accepted[item_id] = item
+                        rows[item_id] = row
+
+                inserted = insert(list(accepted.values()))
+                for item in inserted:
+                    add(item)
+                    del rows[key(item)]
+                for item_id, row in rows.items():
+                    report.add_error(row, f"Duplicate id: {item_id}")
+            report.imported += len(inserted)
+        return report
+
+    def _add_user(self, user: User) -> None:
+        self._user_locks[user.user_id] = Lock()
         self._carts[user.user_id] = Cart(user.user_id)
+        self._users[user.user_id] = user
+
+    @timed
+    def set_user_address(self, user_id: str, address: str) -> bool:
+        user = self._find_user(user_id)
+        if not user:
+            return False
+        with self._user_locks[user_id]:
+            user.set_address(address)
+            self._storage.save_users([user])
+        return True
+
+    @timed
+    def restock(self, product_id: str, quantity: int) -> bool:
+        product = self._find_product(product_id)
+        if not product:
+            return False
+        with self._product_locks[product_id]:
+            product.increase_stock(quantity)
+            self._storage.save_restock(product, quantity)
         return True
 
     def get_product(self, product_id: str) -> Optional[Product]:
-        return self._products.get(product_id)
+        return self._find_product(product_id)
 
     def get_user(self, user_id: str) -> Optional[User]:
-        return self._users.get(user_id)
+        return self._find_user(user_id)
 
     def get_cart(self, user_id: str) -> Optional[Cart]:
-        return self._carts.get(user_id)
+        return self._find_cart(user_id)
 
+    def _find_product(self, product_id: str) -> Optional[Product]:
+        product = self._products.get(product_id)
+        if product is not None:
+            return product
+        product = self._storage.load_product(product_id)
+        if product is None:
+            return None
+        with self._registry_lock:
+            if product_id not in self._products:
+                self._add_product(product)
+            return self._products[product_id]
+
+    def _find_user(self, user_id: str) -> Optional[User]:
+        user = self._users.get(user_id)
+        if user is not None:
+            return user
+        user = self._storage.load_user(user_id)
+        if user is None:
+            return None
+        with self._registry_lock:
+            if user_id not in self._users:
+                self._add_user(user)
+            return self._users[user_id]
+
+    def _find_cart(self, user_id: str) -> Optional[Cart]:
+        if self._find_user(user_id) is None:
+            return None
+        return self._carts[user_id]
+
+    @timed
     def add_to_cart(
         self, user_id: str, product_id: str, quantity: int
     ) -> bool:
-        cart = self._carts.get(user_id)
+        cart = self._find_cart(user_id)
         if not cart:
             return False
 
-        product = self._products.get(product_id)
+        product = self._find_product(product_id)
         if not product:
             return False
 
-        return cart.add_item(product, quantity)
+        with self._user_locks[user_id]:
+            previous = cart.get_quantity(product_id)
+            with self._product_locks[product_id]:
+                self._refresh_stock(self._storage.load_stock([product_id]))
+                if not cart.add_item(product, quantity):
+                    return False
+                if not self._reservations.hold(
+                    user_id, product, previous + quantity
+                ):
+                    cart.set_quantity(product, previous)
+                    return False
+            self._storage.save_cart_item(
+                user_id, product_id, previous + quantity
+            )
+        return True
 
+    @timed
     def remove_from_cart(self, user_id: str, product_id: str) -> bool:
-        cart = self._carts.get(user_id)
+        cart = self._find_cart(user_id)
         if not cart:
             return False
-        return cart.remove_item(product_id)
-
-    def checkout(self, user_id: str) -> Optional[Order]:
-        user = self._users.get(user_id)
-        cart = self._carts.get(user_id)
+        with self._user_locks[user_id]:
+            if not cart.remove_item(product_id):
+                return False
+            self._reservations.release(user_id, product_id)
+            self._storage.save_cart_item(user_id, product_id, 0)
+        return True
 
-        if not user or not cart or cart.is_empty():
+    @timed
+    def apply_cart_batch(
+        self,
+        user_id: str,
+        operations: Iterable[CartOperation],
+        atomic: bool = True,
+    ) -> Optional[BatchResult]:
+        cart = self._find_cart(user_id)
+        if not cart:
             return None
 
-        if not user.address:
+        operations = list(operations)
+        product_ids = {
+            operation.product_id for operation in operations
+            if self._find_product(operation.product_id) is not None
+        }
+        with self._user_locks[user_id]:
+            with self._locked_products(product_ids):
+                self._refresh_stock(self._storage.load_stock(product_ids))
+                limits = {
+                    product_id: self._reservations.available_for(
+                        user_id, self._products[product_id]
+                    )
+                    for product_id in product_ids
+                }
+                result = cart.apply_batch(
+                    operations, self._products, atomic, limits
+                )
+                changed = (
+                    {r.product_id for r in result.results if r.ok}
+                    if result.applied else set()
+                )
+                for product_id in changed:
+                    self._reservations.hold(
+                        user_id, self._products[product_id],
+                        cart.get_quantity(product_id),
+                    )
+            for product_id in changed:
+                self._storage.save_cart_item(
+                    user_id, product_id, cart.get_quantity(product_id)
+                )
+        return result
+
+    @timed
+    def checkout(
+        self, user_id: str, idempotency_key: Optional[str] = None
+    ) -> Optional[Order]:
+        if idempotency_key is None:
+            return self._checkout(user_id)
+
+        def place() -> Optional[str]:
+            order = self._checkout(user_id)
+            return order.order_id if order else None
+
+        order_id = self._checkout_keys.run((user_id, idempotency_key), place)
+        return self._orders.get(order_id) if order_id else None
+
+    def _checkout(self, user_id: str) -> Optional[Order]:
+        user = self._find_user(user_id)
+        cart = self._find_cart(user_id)
+
+        if not user or not cart:
             return None
 
-        self._order_counter += 1
-        order_id = f"ORD-{self._order_counter:06d}"
-        order = Order(order_id, user, cart.get_items())
+        with self._user_locks[user_id]:
+            if cart.is_empty() or not user.address:
+                return None
 
-        for product, quantity in order.items:
-            product.decrease_stock(quantity)
+            items = cart.get_items()
+            product_ids = [product.product_id for product, _ in items]
+            with self._locked_products(product_ids):
+                self._refresh_stock(self._storage.load_stock(product_ids))
+                if any(
+                    quantity > self._reservations.available_for(
+                        user_id, product
+                    )
+                    for product, quantity in items
+                ):
+                    return None
 
-        self._orders[order_id] = order
+                order = Order(self._next_order_id(), user, [
+                    OrderLine.snapshot(product, quantity)
+                    for product, quantity in items
+                ])
+                stock = self._storage.save_checkout(order)
+                if stock is None:
+                    return None
 
-        cart.clear()
+                self._reservations.consume(user_id, items)
+                self._refresh_stock(stock)
+
+            self._add_order(order)
+            cart.clear()
 
         return order
 
+    @contextmanager
+    def _locked_products(self, product_ids: Iterable[str]) -> Iterator[None]:
+        with ExitStack() as stack:
+            for product_id in sorted(product_ids):
+                stack.enter_context(self._product_locks[product_id])
+            yield
+
+    def _refresh_stock(self, stock: Dict[str, int]) -> None:
+        for product_id, level in stock.items():
+            self._products[product_id].stock = level
+
+    def _add_order(self, order: Order) -> None:
+        self._orders[order.order_id] = order
+        user_orders = self._user_orders.setdefault(order.user.user_id, [])
+        self._user_order_positions[order.order_id] = len(user_orders)
+        user_orders.append(order)
+        with self._status_lock:
+            sequence = len(self._order_sequences)
+            self._order_sequences[order.order_id] = sequence
+            self._orders_by_status[order.status].add(
+                sequence, order.order_id
+            )
+        if order.status != OrderStatus.CANCELLED:
+            self._analytics.record_order(order)
+
+    def _next_order_id(self) -> str:
+        with self._order_counter_lock:
+            self._order_counter += 1
+            return f"ORD-{self._order_counter:06d}"
+
+    def release_expired_reservations(self) -> int:
+        return self._reservations.release_expired()
+
     def get_order(self, order_id: str) -> Optional[Order]:
         return self._orders.get(order_id)
 
+    @timed
     def update_order_status(
         self, order_id: str, new_status: OrderStatus
     ) -> bool:
@@ -86,16 +423,149 @@ class ECommercePlatform:
 
         if not order:
             return False
-        order.update_status(new_status)
-        
+
+        with self._status_lock:
+            if not order.can_transition_to(new_status):
+                return False
+            old_status = order.status
+            order.update_status(new_status)
+            self._storage.save_order_status(order)
+            sequence = self._order_sequences[order_id]
+            self._orders_by_status[old_status].remove(sequence)
+            self._orders_by_status[new_status].add(sequence, order_id)
+            if new_status == OrderStatus.CANCELLED:
+                self._analytics.cancel_order(order)
+
         return True
 
-    def get_user_orders(self, user_id: str) -> List[Order]:
-        return [order for order in self._orders.values()
-                if order.user.user_id == user_id]
+    @timed
+    def get_orders_by_status(
+        self,
+        status: OrderStatus,
+        limit: int = 50,
+        after_order_id: Optional[str] = None,
+    ) -> List[Order]:
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        with self._status_lock:
+            after = None
+            if after_order_id is not None:
+                after = self._order_sequences.get(after_order_id)
+                if after is None:
+                    raise ValueError("Unknown order cursor")
+            order_ids = self._orders_by_status[status].page(limit, after)
+        return [self._orders[order_id] for order_id in order_ids]
+
+    def count_orders_by_status(self, status: OrderStatus) -> int:
+        return len(self._orders_by_status[status])
+
+    @timed
+    def get_user_orders(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        after_order_id: Optional[str] = None,
+    ) -> List[Order]:
+        user_orders = self._user_orders.get(user_id, [])
+
+        start = 0
+        if after_order_id is not None:
+            position = self._user_order_positions.get(after_order_id)
+            if position is None or (
+                self._orders[after_order_id].user.user_id != user_id
+            ):
+                raise ValueError("Unknown order cursor")
+            start = position + 1
+
+        if limit is None:
+            return user_orders[start:]
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        return user_orders[start:start + limit]
 
     def get_all_products(self) -> List[Product]:
         return list(self._products.values())
 
+    @timed
+    def search_products(
+        self,
+        query: Optional[str] = None,
+        contains: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock: bool = False,
+        sort: str = "name",
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Product]:
+        return self._catalog.search(
+            query, contains, min_price, max_price, in_stock,
+            sort, limit, offset,
+        )
+
+    @timed
+    def get_top_products(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 10,
+        by: str = "revenue",
+    ) -> List[ProductSales]:
+        return self._analytics.top_products(start, end, limit, by)
+
+    @timed
+    def get_sales_timeseries(
+        self,
+        granularity: str = "day",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        product_id: Optional[str] = None,
+    ) -> List[SalesBucket]:
+        return self._analytics.timeseries(granularity, start, end, product_id)
+
+    @timed
+    def get_sales_totals(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> SalesTotals:
+        return self._analytics.totals(start, end)
+
     def get_all_orders(self) -> List[Order]:
         return list(self._orders.values())
+
+    @timed
+    def get_order_xml(self, order_id: str) -> Optional[Export]:
+        order = self._orders.get(order_id)
+        if not order:
+            return None
+
+        key = (order.order_id, _export_revision(order))
+        export = self._xml_exports.get(key)
+        if export is None:
+            export = self._xml_exports.put(key, order.to_xml().encode("utf-8"))
+        return export
+
+    @timed
+    def export_orders_xml(self, file_path: str) -> int:
+        write_orders_xml(self._orders.values(), file_path)
+        return len(self._orders)
+
+    def _sweep_reservations(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            self._reservations.release_expired()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+        self._storage.close()
+
+
+def _export_revision(order: Order) -> str:
+    user = order.user
+    fields = (
+        str(order.version), order.creation_date.isoformat(),
+        user.user_id, user.username, user.email, user.address or "",
+    )
+    return hashlib.sha1("\0".join(fields).encode("utf-8")).hexdigest()
@@ -0,0 +1,715 @@
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+from pathlib import Path
+from threading import Condition, Thread
+from typing import (
+    Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional,
+    Tuple, Union
+)
+from order import Order, OrderLine, OrderStatus
+from product import Product
+from storage import Storage
+from user import User
+
+PRODUCT = 1
+USER = 2
+CART = 3
+CHECKOUT = 4
+STATUS = 5
+PRODUCTS = 6
+USERS = 7
+CARTS = 8
+ORDERS = 9
+END = 10
+
+SNAPSHOT_MAGIC = b"ECSNAP01"
+SNAPSHOT_SECTION_ROWS = 65536
+SEGMENT_PREFIX = "log-"
+SNAPSHOT_PREFIX = "snapshot-"
+FILE_SUFFIX = ".bin"
+
+_HEADER = struct.Struct("<II")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+Buffer = Union[bytes, mmap.mmap]
+OrderState = List[Any]
+
+
+class _Encoder:
+    __slots__ = ("buffer",)
+
+    def __init__(self, event_type: int):
+        self.buffer = bytearray((event_type,))
+
+    def text(self, value: str) -> "_Encoder":
+        data = value.encode("utf-8")
+        self.buffer += _U32.pack(len(data))
+        self.buffer += data
+        return self
+
+    def optional_text(self, value: Optional[str]) -> "_Encoder":
+        if value is None:
+            self.buffer.append(0)
+            return self
+        self.buffer.append(1)
+        return self.text(value)
+
+    def int64(self, value: int) -> "_Encoder":
+        self.buffer += _I64.pack(value)
+        return self
+
+    def float64(self, value: float) -> "_Encoder":
+        self.buffer += _F64.pack(value)
+        return self
+
+    def frame(self) -> bytes:
+        payload = bytes(self.buffer)
+        return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+class _Decoder:
+    __slots__ = ("payload", "offset")
+
+    def __init__(self, payload: bytes):
+        self.payload = payload
+        self.offset = 1
+
+    def text(self) -> str:
+        (size,) = _U32.unpack_from(self.payload, self.offset)
+        start = self.offset + 4
+        self.offset = start + size
+        return self.payload[start:self.offset].decode("utf-8")
+
+    def optional_text(self) -> Optional[str]:
+        present = self.payload[self.offset]
+        self.offset += 1
+        return self.text() if present else None
+
+    def int64(self) -> int:
+        (value,) = _I64.unpack_from(self.payload, self.offset)
+        self.offset += 8
+        return value
+
+    def float64(self) -> float:
+        (value,) = _F64.unpack_from(self.payload, self.offset)
+        self.offset += 8
+        return value
+
+
+class _ColumnEncoder:
+    __slots__ = ("parts",)
+
+    def __init__(self, section: int):
+        self.parts = [bytes((section,))]
+
+    def numbers(
+        self, typecode: str, values: Iterable[Any]
+    ) -> "_ColumnEncoder":
+        column = array(typecode, values)
+        self.parts += [_I64.pack(len(column)), column.tobytes()]
+        return self
+
+    def texts(self, values: List[str]) -> "_ColumnEncoder":
+        self.numbers("q", map(len, values))
+        blob = "".join(values).encode("utf-8")
+        self.parts += [_I64.pack(len(blob)), blob]
+        return self
+
+    def frame(self) -> bytes:
+        payload = b"".join(self.parts)
+        return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+class _ColumnDecoder:
+    __slots__ = ("view", "offset")
+
+    def __init__(self, payload: bytes):
+        self.view = memoryview(payload)
+        self.offset = 1
+
+    def numbers(self, typecode: str) -> array:
+        (count,) = _I64.unpack_from(self.view, self.offset)
+        column = array(typecode)
+        start = self.offset + 8
+        self.offset = start + count * column.itemsize
+        column.frombytes(self.view[start:self.offset])
+        return column
+
+    def texts(self) -> List[str]:
+        offsets = list(accumulate(self.numbers("q"), initial=0))
+        (size,) = _I64.unpack_from(self.view, self.offset)
+        start = self.offset + 8
+        self.offset = start + size
+        text = str(self.view[start:self.offset], "utf-8")
+        return [text[a:b] for a, b in zip(offsets, islice(offsets, 1, None))]
+
+
+def encode_product(
+    product_id: str, name: str, price: float, stock: int
+) -> bytes:
+    return (
+        _Encoder(PRODUCT).text(product_id).text(name)
+        .float64(price).int64(stock).frame()
+    )
+
+
+def encode_user(
+    user_id: str, username: str, email: str, address: Optional[str]
+) -> bytes:
+    return (
+        _Encoder(USER).text(user_id).text(username).text(email)
+        .optional_text(address).frame()
+    )
+
+
+def encode_cart_item(user_id: str, product_id: str, quantity: int) -> bytes:
+    return (
+        _Encoder(CART).text(user_id).text(product_id).int64(quantity)
+        .frame()
+    )
+
+
+def encode_checkout(
+    order_id: str,
+    user_id: str,
+    status: str,
+    version: int,
+    created: int,
+    lines: Iterable[OrderLine],
+) -> bytes:
+    lines = tuple(lines)
+    encoder = (
+        _Encoder(CHECKOUT).text(order_id).text(user_id).text(status)
+        .int64(version).int64(created).int64(len(lines))
+    )
+    for line in lines:
+        encoder.text(line.product_id).text(line.name)
+        encoder.float64(line.unit_price).int64(line.quantity)
+    return encoder.frame()
+
+
+def encode_status(order_id: str, status: str, version: int) -> bytes:
+    return (
+        _Encoder(STATUS).text(order_id).text(status).int64(version).frame()
+    )
+
+
+def to_microseconds(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def from_microseconds(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+class RecordReader:
+    def __init__(self, buffer: Buffer, offset: int = 0):
+        self.buffer = buffer
+        self.offset = offset
+
+    def __iter__(self) -> Iterator[bytes]:
+        buffer = self.buffer
+        size = len(buffer)
+        offset = self.offset
+        while offset + _HEADER.size <= size:
+            length, checksum = _HEADER.unpack_from(buffer, offset)
+            start = offset + _HEADER.size
+            end = start + length
+            if length == 0 or end > size:
+                return
+            payload = buffer[start:end]
+            if zlib.crc32(payload) != checksum:
+                return
+            offset = self.offset = end
+            yield payload
+
+
+class _State:
+    def __init__(self):
+        self.products: Dict[str, List[Any]] = {}
+        self.users: Dict[str, Tuple[str, str, Optional[str]]] = {}
+        self.carts: Dict[str, Dict[str, int]] = {}
+        self.orders: Dict[str, OrderState] = {}
+        self._handlers: Dict[int, Callable[[bytes], None]] = {
+            PRODUCT: self._apply_product,
+            USER: self._apply_user,
+            CART: self._apply_cart,
+            CHECKOUT: self._apply_checkout,
+            STATUS: self._apply_status,
+            PRODUCTS: self._load_products,
+            USERS: self._load_users,
+            CARTS: self._load_carts,
+            ORDERS: self._load_orders,
+        }
+
+    def apply(self, payload: bytes) -> None:
+        self._handlers[payload[0]](payload)
+
+    def sections(self) -> Iterator[bytes]:
+        for chunk in _chunks(self.products.items()):
+            yield (
+                _ColumnEncoder(PRODUCTS)
+                .texts([product_id for product_id, _ in chunk])
+                .texts([product[0] for _, product in chunk])
+                .numbers("d", (product[1] for _, product in chunk))
+                .numbers("q", (product[2] for _, product in chunk))
+                .frame()
+            )
+        for chunk in _chunks(self.users.items()):
+            yield (
+                _ColumnEncoder(USERS)
+                .texts([user_id for user_id, _ in chunk])
+                .texts([user[0] for _, user in chunk])
+                .texts([user[1] for _, user in chunk])
+                .texts([user[2] or "" for _, user in chunk])
+                .numbers("b", (user[2] is not None for _, user in chunk))
+                .frame()
+            )
+        items = (
+            (user_id, product_id, quantity)
+            for user_id, cart in self.carts.items()
+            for product_id, quantity in cart.items()
+        )
+        for chunk in _chunks(items):
+            yield (
+                _ColumnEncoder(CARTS)
+                .texts([item[0] for item in chunk])
+                .texts([item[1] for item in chunk])
+                .numbers("q", (item[2] for item in chunk))
+                .frame()
+            )
+        for chunk in _chunks(self.orders.items()):
+            lines = [line for _, order in chunk for line in order[4]]
+            yield (
+                _ColumnEncoder(ORDERS)
+                .texts([order_id for order_id, _ in chunk])
+                .texts([order[0] for _, order in chunk])
+                .texts([order[1] for _, order in chunk])
+                .numbers("q", (order[2] for _, order in chunk))
+                .numbers("q", (order[3] for _, order in chunk))
+                .numbers("q", (len(order[4]) for _, order in chunk))
+                .texts([line.product_id for line in lines])
+                .texts([line.name for line in lines])
+                .numbers("d", (line.unit_price for line in lines))
+                .numbers("q", (line.quantity for line in lines))
+                .frame()
+            )
+
+    def _apply_product(self, payload: bytes) -> None:
+        decoder = _Decoder(payload)
+        product_id = decoder.text()
+        self.products[product_id] = [
+            decoder.text(), decoder.float64(), decoder.int64()
+        ]
+
+    def _apply_user(self, payload: bytes) -> None:
+        decoder = _Decoder(payload)
+        user_id = decoder.text()
+        self.users[user_id] = (
+            decoder.text(), decoder.text(), decoder.optional_text()
+        )
+
+    def _apply_cart(self, payload: bytes) -> None:
+        decoder = _Decoder(payload)
+        user_id = decoder.text()
+        product_id = decoder.text()
+        quantity = decoder.int64()
+        items = self.carts.setdefault(user_id, {})
+        if quantity:
+            items[product_id] = quantity
+        else:
+            items.pop(product_id, None)
+            if not items:
+                del self.carts[user_id]
+
+    def _apply_checkout(self, payload: bytes) -> None:
+        decoder = _Decoder(payload)
+        order_id = decoder.text()
+        user_id = decoder.text()
+        status = decoder.text()
+        version = decoder.int64()
+        created = decoder.int64()
+        lines = tuple(
+            OrderLine(
+                decoder.text(), decoder.text(),
+                decoder.float64(), decoder.int64()
+            )
+            for _ in range(decoder.int64())
+        )
+        for line in lines:
+            self.products[line.product_id][2] -= line.quantity
+        self.carts.pop(user_id, None)
+        self.orders[order_id] = [user_id, status, version, created, lines]
+
+    def _apply_status(self, payload: bytes) -> None:
+        decoder = _Decoder(payload)
+        order = self.orders[decoder.text()]
+        order[1] = decoder.text()
+        order[2] = decoder.int64()
+
+    def _load_products(self, payload: bytes) -> None:
+        decoder = _ColumnDecoder(payload)
+        product_ids = decoder.texts()
+        self.products.update(zip(product_ids, map(list, zip(
+            decoder.texts(), decoder.numbers("d"), decoder.numbers("q")
+        ))))
+
+    def _load_users(self, payload: bytes) -> None:
+        decoder = _ColumnDecoder(payload)
+        user_ids = decoder.texts()
+        usernames = decoder.texts()
+        emails = decoder.texts()
+        addresses = decoder.texts()
+        present = decoder.numbers("b")
+        self.users.update(zip(user_ids, zip(usernames, emails, (
+            address if has_address else None
+            for address, has_address in zip(addresses, present)
+        ))))
+
+    def _load_carts(self, payload: bytes) -> None:
+        decoder = _ColumnDecoder(payload)
+        for user_id, product_id, quantity in zip(
+            decoder.texts(), decoder.texts(), decoder.numbers("q")
+        ):
+            self.carts.setdefault(user_id, {})[product_id] = quantity
+
+    def _load_orders(self, payload: bytes) -> None:
+        decoder = _ColumnDecoder(payload)
+        orders = zip(
+            decoder.texts(), decoder.texts(), decoder.texts(),
+            decoder.numbers("q"), decoder.numbers("q"), decoder.numbers("q"),
+        )
+        lines = list(map(
+            OrderLine, decoder.texts(), decoder.texts(),
+            decoder.numbers("d"), decoder.numbers("q"),
+        ))
+        position = 0
+        for order_id, user_id, status, version, created, count in orders:
+            self.orders[order_id] = [
+                user_id, status, version, created,
+                tuple(lines[position:position + count]),
+            ]
+            position += count
+
+
+def _chunks(items: Iterable[Any]) -> Iterator[List[Any]]:
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, SNAPSHOT_SECTION_ROWS))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _Group:
+    def __init__(self):
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+
+class EventLogStorage(Storage):
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        snapshot_interval: int = 1_000_000,
+        fsync: bool = True,
+    ):
+        if snapshot_interval <= 0:
+            raise ValueError("Snapshot interval must be positive")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.snapshot_interval = snapshot_interval
+        self.fsync = fsync
+
+        self._condition = Condition()
+        self._pending: List[bytes] = []
+        self._group = _Group()
+        self._flushing = False
+        self._torn: Optional[Tuple[Path, int]] = None
+        self._compaction: Optional[Thread] = None
+        self._compaction_error: Optional[BaseException] = None
+        self._state: Optional[_State] = _State()
+        self._segment = 0
+        self._segment_events = 0
+        self._recover()
+        self._file = self._open_segment()
+
+    def load_products(self) -> Iterator[Product]:
+        for product_id, (name, price, stock) in self._state.products.items():
+            yield Product(product_id, name, price, stock)
+
+    def load_users(self) -> Iterator[User]:
+        for user_id, (username, email, address) in self._state.users.items():
+            user = User(user_id, username, email)
+            user.address = address
+            yield user
+
+    def load_orders(self, users: Dict[str, User]) -> Iterator[Order]:
+        for order_id, order_state in self._state.orders.items():
+            user_id, status, version, created, lines = order_state
+            order = Order(order_id, users[user_id], lines)
+            order.status = OrderStatus(status)
+            order.version = version
+            order.creation_date = from_microseconds(created)
+            yield order
+
+    def load_carts(self) -> Iterator[Tuple[str, str, int]]:
+        state, self._state = self._state, None
+        for user_id, items in state.carts.items():
+            for product_id, quantity in items.items():
+                yield user_id, product_id, quantity
+
+    def save_products(self, products: Iterable[Product]) -> None:
+        self._append([
+            encode_product(p.product_id, p.name, p.price, p.stock)
+            for p in products
+        ])
+
+    def save_users(self, users: Iterable[User]) -> None:
+        self._append([
+            encode_user(u.user_id, u.username, u.email, u.address)
+            for u in users
+        ])
+
+    def save_cart_item(
+        self, user_id: str, product_id: str, quantity: int
+    ) -> None:
+        self._append([encode_cart_item(user_id, product_id, quantity)])
+
+    def save_checkout(self, order: Order) -> Optional[Dict[str, int]]:
+        self._append([encode_checkout(
+            order.order_id, order.user.user_id, order.status.value,
+            order.version, to_microseconds(order.creation_date), order.items,
+        )])
+        return {}
+
+    def save_order_status(self, order: Order) -> None:
+        self._append([encode_status(
+            order.order_id, order.status.value, order.version
+        )])
+
+    def snapshot(self) -> None:
+        while True:
+            self._wait_for_compaction()
+            with self._condition:
+                while self._flushing:
+                    self._condition.wait()
+                if not self._compaction_running():
+                    self._start_compaction()
+                    break
+        self._wait_for_compaction()
+        if self._compaction_error is not None:
+            error, self._compaction_error = self._compaction_error, None
+            raise error
+
+    def close(self) -> None:
+        with self._condition:
+            while self._flushing:
+                self._condition.wait()
+            self._file.close()
+        self._wait_for_compaction()
+
+    def _append(self, records: List[bytes]) -> None:
+        if not records:
+            return
+        with self._condition:
+            self._pending.extend(records)
+            group = self._group
+            while not group.done:
+                if group.error is not None:
+                    raise OSError("Event log write failed") from group.error
+                if self._flushing:
+                    self._condition.wait()
+                else:
+                    self._flush_pending()
+
+    def _flush_pending(self) -> None:
+        batch = b"".join(self._pending)
+        count = len(self._pending)
+        group, self._group = self._group, _Group()
+        self._pending.clear()
+        self._flushing = True
+        self._condition.release()
+        try:
+            if self._torn is not None:
+                os.truncate(*self._torn)
+                self._rotate()
+                self._torn = None
+            offset = self._file.seek(0, os.SEEK_END)
+            try:
+                self._write(batch)
+            except BaseException:
+                self._torn = (self._segment_path(self._segment), offset)
+                raise
+        except BaseException as error:
+            group.error = error
+            raise
+        finally:
+            self._condition.acquire()
+            self._flushing = False
+            self._condition.notify_all()
+
+        group.done = True
+        self._segment_events += count
+        if (self._segment_events >= self.snapshot_interval
+                and not self._compaction_running()):
+            self._start_compaction()
+
+    def _write(self, batch: bytes) -> None:
+        view = memoryview(batch)
+        while view:
+            view = view[self._file.write(view):]
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _start_compaction(self) -> None:
+        self._compaction = Thread(
+            target=self._run_compaction, args=(self._rotate(),),
+            name="event-log-compaction", daemon=True,
+        )
+        self._compaction.start()
+
+    def _rotate(self) -> int:
+        self._file.close()
+        self._segment += 1
+        self._segment_events = 0
+        self._file = self._open_segment()
+        return self._segment
+
+    def _open_segment(self) -> BinaryIO:
+        return open(self._segment_path(self._segment), "ab", buffering=0)
+
+    def _compaction_running(self) -> bool:
+        return self._compaction is not None and self._compaction.is_alive()
+
+    def _wait_for_compaction(self) -> None:
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def _run_compaction(self, upto: int) -> None:
+        try:
+            self._compact(upto)
+        except BaseException as error:
+            self._compaction_error = error
+
+    def _compact(self, upto: int) -> None:
+        state = _State()
+        start = self._load_latest_snapshot(state)
+        for number, path in self._files(SEGMENT_PREFIX):
+            if start <= number < upto:
+                self._replay_segment(state, path, tail=False)
+
+        path = self._snapshot_path(upto)
+        temporary = path.with_suffix(".tmp")
+        count = 0
+        with open(temporary, "wb") as snapshot:
+            snapshot.write(SNAPSHOT_MAGIC)
+            for record in state.sections():
+                snapshot.write(record)
+                count += 1
+            snapshot.write(_Encoder(END).int64(count).frame())
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary, path)
+        self._remove_before(upto)
+
+    def _recover(self) -> None:
+        for leftover in self.directory.glob(f"{SNAPSHOT_PREFIX}*.tmp"):
+            leftover.unlink()
+
+        start = self._load_latest_snapshot(self._state)
+        self._remove_before(start)
+        segments = [
+            (number, path) for number, path in self._files(SEGMENT_PREFIX)
+            if number >= start
+        ]
+        self._segment = start
+        for position, (number, path) in enumerate(segments):
+            is_tail = position == len(segments) - 1
+            count = self._replay_segment(self._state, path, tail=is_tail)
+            self._segment = number
+            self._segment_events = count
+
+    def _load_latest_snapshot(self, state: _State) -> int:
+        snapshots = self._files(SNAPSHOT_PREFIX)
+        if not snapshots:
+            return 0
+
+        number, path = snapshots[-1]
+        with open(path, "rb") as snapshot, _map(snapshot) as buffer:
+            if buffer[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                raise ValueError(f"Not a snapshot file: {path}")
+            count = 0
+            for payload in RecordReader(buffer, len(SNAPSHOT_MAGIC)):
+                if payload[0] == END:
+                    if _Decoder(payload).int64() != count:
+                        break
+                    return number
+                state.apply(payload)
+                count += 1
+        raise ValueError(f"Incomplete snapshot file: {path}")
+
+    @staticmethod
+    def _replay_segment(state: _State, path: Path, tail: bool) -> int:
+        count = 0
+        with open(path, "rb") as segment, _map(segment) as buffer:
+            reader = RecordReader(buffer)
+            for payload in reader:
+                state.apply(payload)
+                count += 1
+            valid_length = reader.offset
+            size = len(buffer)
+
+        if valid_length < size:
+            if not tail:
+                raise ValueError(f"Corrupt event log segment: {path}")
+            with open(path, "r+b") as segment:
+                segment.truncate(valid_length)
+        return count
+
+    def _remove_before(self, number: int) -> None:
+        for prefix in (SEGMENT_PREFIX, SNAPSHOT_PREFIX):
+            for file_number, path in self._files(prefix):
+                if file_number < number:
+                    path.unlink()
+
+    def _files(self, prefix: str) -> List[Tuple[int, Path]]:
+        files = []
+        for path in self.directory.glob(f"{prefix}*{FILE_SUFFIX}"):
+            number = path.name[len(prefix):-len(FILE_SUFFIX)]
+            if number.isdigit():
+                files.append((int(number), path))
+        return sorted(files)
+
+    def _segment_path(self, number: int) -> Path:
+        return self.directory / f"{SEGMENT_PREFIX}{number:08d}{FILE_SUFFIX}"
+
+    def _snapshot_path(self, number: int) -> Path:
+        return self.directory / f"{SNAPSHOT_PREFIX}{number:08d}{FILE_SUFFIX}"
+
+
+class _EmptyBuffer(bytes):
+    def __enter__(self) -> "_EmptyBuffer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+def _map(file: Any) -> Union[mmap.mmap, _EmptyBuffer]:
+    if os.fstat(file.fileno()).st_size == 0:
+        return _EmptyBuffer()
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+ExportKey = Tuple[str, str]
+Export = Tuple[str, bytes]
+
+
+class XmlExportCache:
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        directory: Optional[Path] = None,
+    ):
+        if max_entries <= 0:
+            raise ValueError("Max entries must be positive")
+        if max_bytes <= 0:
+            raise ValueError("Max bytes must be positive")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[ExportKey, Export]" = OrderedDict()
+        self._revisions: Dict[str, str] = {}
+        self._size_bytes = 0
+        self._lock = Lock()
+
+    def get(self, key: ExportKey) -> Optional[Export]:
+        with self._lock:
+            export = self._entries.get(key)
+            if export is not None:
+                self._entries.move_to_end(key)
+                return export
+
+        data = self._read_file(key)
+        if data is None:
+            return None
+        return self._store(key, data)
+
+    def put(self, key: ExportKey, data: bytes) -> Export:
+        if len(data) <= self.max_bytes:
+            self._write_file(key, data)
+        return self._store(key, data)
+
+    def _store(self, key: ExportKey, data: bytes) -> Export:
+        order_id, revision = key
+        export = (hashlib.sha1(data).hexdigest(), data)
+        evicted_orders: List[str] = []
+
+        with self._lock:
+            previous_revision = self._revisions.pop(order_id, None)
+            if previous_revision is not None:
+                previous = self._entries.pop((order_id, previous_revision))
+                self._size_bytes -= len(previous[1])
+            if len(data) > self.max_bytes:
+                if previous_revision is not None:
+                    evicted_orders.append(order_id)
+            else:
+                self._entries[key] = export
+                self._revisions[order_id] = revision
+                self._size_bytes += len(data)
+
+            while (len(self._entries) > self.max_entries
+                   or self._size_bytes > self.max_bytes):
+                (evicted_order, _), (_, evicted) = self._entries.popitem(
+                    last=False
+                )
+                del self._revisions[evicted_order]
+                self._size_bytes -= len(evicted)
+                evicted_orders.append(evicted_order)
+
+        for evicted_order in evicted_orders:
+            self._remove_file(evicted_order)
+        return export
+
+    def _file_path(self, order_id: str) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        return self.directory / f"{order_id}.export"
+
+    def _read_file(self, key: ExportKey) -> Optional[bytes]:
+        file_path = self._file_path(key[0])
+        if file_path is None:
+            return None
+        try:
+            content = file_path.read_bytes()
+        except FileNotFoundError:
+            return None
+        header, _, data = content.partition(b"\n")
+        if header.decode("utf-8", "replace") != key[1]:
+            return None
+        return data
+
+    def _write_file(self, key: ExportKey, data: bytes) -> None:
+        file_path = self._file_path(key[0])
+        if file_path is None:
+            return
+        descriptor, temporary = tempfile.mkstemp(
+            dir=self.directory, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(key[1].encode("utf-8") + b"\n")
+                file.write(data)
+            os.replace(temporary, file_path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def _remove_file(self, order_id: str) -> None:
+        file_path = self._file_path(order_id)
+        if file_path is not None:
+            try:
+                file_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: ExportKey) -> bool:
+        return key in self._entries
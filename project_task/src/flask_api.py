@@ -1,17 +1,31 @@
-import os
 import sys
 from datetime import datetime
 from pathlib import Path
+from time import perf_counter_ns
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from flask import Flask, jsonify, request, render_template, send_file
+from flask import (
+    Flask, Response, g, jsonify, request, render_template,
+    stream_with_context
+)
 from flask_cors import CORS
 from product import Product
 from user import User
-from cart import Cart
-from order import Order, OrderStatus
-from ecommerce import ECommercePlatform
+from cart import Cart, CartOperation
+from order import Order, OrderStatus, iter_orders_xml
+from bulk_import import iter_csv, iter_ndjson
+import metrics
+from bootstrap import (
+    DEFAULT_ORDERS_PAGE_SIZE, DEFAULT_PRODUCTS_PAGE_SIZE,
+    MAX_ORDERS_PAGE_SIZE, MAX_PRODUCTS_PAGE_SIZE, PRODUCT_SEARCH_ARGS,
+    create_platform
+)
+from serializers import (
+    cart_to_dict, encode_list, encode_object, encode_order, encode_product,
+    encode_user, dumps, order_to_dict, product_to_dict, sales_bucket_to_dict,
+    user_to_dict
+)
 
 parent_dir = Path(__file__).parent.parent
 
@@ -20,33 +34,70 @@ app = Flask(__name__,
             static_folder=str(parent_dir / 'static'))
 CORS(app)
 
-platform = ECommercePlatform()
+platform = create_platform()
 
-demo_products = [
-    Product("P001", "Laptop", 999.99, 10),
-    Product("P002", "Mysz", 29.99, 50),
-    Product("P003", "Klawiatura", 99.99, 30),
-    Product("P004", "Monitor", 299.99, 15),
-    Product("P005", "Headphones", 149.99, 20),
-]
 
-demo_users = [
-    User("U001", "john_doe", "john@example.com"),
-    User("U002", "anna_nowak", "anna@example.com"),
-    User("U003", "bob_smith", "bob@example.com"),
-]
+@app.before_request
+def start_request_timer():
+    if metrics.registry.enabled:
+        g.request_started = perf_counter_ns()
 
-for product in demo_products:
-    platform.register_product(product)
 
-for user in demo_users:
-    user.set_address("Sample Address")
-    platform.register_user(user)
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    method = request.method
+    route = (
+        request.url_rule.rule if request.url_rule
+        else metrics.UNMATCHED_ROUTE
+    )
 
-data_dir = parent_dir / 'data'
+    def observe():
+        metrics.registry.observe_request(
+            method, route, response.status_code, perf_counter_ns() - started
+        )
+
+    if response.is_streamed:
+        response.call_on_close(observe)
+    else:
+        observe()
+    return response
+
+
+def json_response(payload, status=200):
+    body = payload if isinstance(payload, bytes) else dumps(payload)
+    return Response(body, status=status, mimetype='application/json')
+
+
+def analytics_period():
+    return tuple(
+        datetime.fromisoformat(request.args[name])
+        if request.args.get(name) else None
+        for name in ('start', 'end')
+    )
+
+
+def orders_page_limit():
+    limit = request.args.get('limit', DEFAULT_ORDERS_PAGE_SIZE, type=int)
+    if limit < 1:
+        raise ValueError('Parametr limit musi być większy od zera')
+    return min(limit, MAX_ORDERS_PAGE_SIZE)
+
+
+def import_records():
+    if request.mimetype == 'text/csv':
+        return iter_csv(request.stream)
+    return iter_ndjson(request.stream)
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    return Response(
+        metrics.registry.render(), content_type=metrics.CONTENT_TYPE
+    )
 
-if not os.path.exists(data_dir):
-    os.makedirs(data_dir)
 
 @app.route("/")
 def index():
@@ -56,18 +107,27 @@ def index():
 @app.route("/api/products", methods=["GET"])
 def get_products():
     try:
-        products = platform.get_all_products()
-        return jsonify({
-            'products': [
-                {
-                    'product_id': p.product_id,
-                    'name': p.name,
-                    'price': p.price,
-                    'stock': p.stock
-                }
-                for p in products
-            ]
-        })
+        if any(name in request.args for name in PRODUCT_SEARCH_ARGS):
+            products = platform.search_products(
+                query=request.args.get('q'),
+                contains=request.args.get('contains'),
+                min_price=request.args.get('min_price', type=float),
+                max_price=request.args.get('max_price', type=float),
+                in_stock=request.args.get('in_stock') in ('1', 'true'),
+                sort=request.args.get('sort', 'name'),
+                limit=min(
+                    request.args.get(
+                        'limit', DEFAULT_PRODUCTS_PAGE_SIZE, type=int
+                    ),
+                    MAX_PRODUCTS_PAGE_SIZE
+                ),
+                offset=request.args.get('offset', 0, type=int)
+            )
+        else:
+            products = platform.get_all_products()
+        return json_response(
+            encode_list('products', map(encode_product, products))
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -77,14 +137,9 @@ def get_product(product_id):
         product = platform.get_product(product_id)
         if not product:
             return jsonify({'error': 'Produkt nie znaleziony'}), 404
-        return jsonify({
-            'product': {
-                'product_id': product.product_id,
-                'name': product.name,
-                'price': product.price,
-                'stock': product.stock
-            }
-        })
+        return json_response(
+            encode_object('product', encode_product(product))
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -99,15 +154,21 @@ def create_product():
             int(data['stock'])
         )
         platform.register_product(product)
-        return jsonify({
+        return json_response({
             'message': 'Produkt dodany',
-            'product': {
-                'product_id': product.product_id,
-                'name': product.name,
-                'price': product.price,
-                'stock': product.stock
-            }
-        }), 201
+            'product': product_to_dict(product)
+        }, 201)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route("/api/products/import", methods=["POST"])
+def import_products():
+    try:
+        report = platform.register_products_bulk(
+            import_records(),
+            batch_size=request.args.get('batch_size', 1000, type=int)
+        )
+        return json_response(report.to_dict())
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -115,17 +176,9 @@ def create_product():
 def get_users():
     try:
         users = platform._users
-        return jsonify({
-            'users': [
-                {
-                    'user_id': u.user_id,
-                    'username': u.username,
-                    'email': u.email,
-                    'address': u.address
-                }
-                for u in users.values()
-            ]
-        })
+        return json_response(
+            encode_list('users', map(encode_user, users.values()))
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -135,14 +188,7 @@ def get_user(user_id):
         user = platform.get_user(user_id)
         if not user:
             return jsonify({'error': 'Użytkownik nie znaleziony'}), 404
-        return jsonify({
-            'user': {
-                'user_id': user.user_id,
-                'username': user.username,
-                'email': user.email,
-                'address': user.address
-            }
-        })
+        return json_response(encode_object('user', encode_user(user)))
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -158,15 +204,21 @@ def create_user():
         if data.get('address'):
             user.set_address(data['address'])
         platform.register_user(user)
-        return jsonify({
+        return json_response({
             'message': 'Użytkownik utworzony',
-            'user': {
-                'user_id': user.user_id,
-                'username': user.username,
-                'email': user.email,
-                'address': user.address
-            }
-        }), 201
+            'user': user_to_dict(user)
+        }, 201)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route("/api/users/import", methods=["POST"])
+def import_users():
+    try:
+        report = platform.register_users_bulk(
+            import_records(),
+            batch_size=request.args.get('batch_size', 1000, type=int)
+        )
+        return json_response(report.to_dict())
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -176,18 +228,13 @@ def update_user_address(user_id):
         user = platform.get_user(user_id)
         if not user:
             return jsonify({'error': 'Użytkownik nie znaleziony'}), 404
-        
+
         data = request.get_json()
-        user.set_address(data['address'])
-        
-        return jsonify({
+        platform.set_user_address(user_id, data['address'])
+
+        return json_response({
             'message': 'Adres zaktualizowany',
-            'user': {
-                'user_id': user.user_id,
-                'username': user.username,
-                'email': user.email,
-                'address': user.address
-            }
+            'user': user_to_dict(user)
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -198,20 +245,8 @@ def get_cart(user_id):
         cart = platform.get_cart(user_id)
         if not cart:
             return jsonify({'error': 'Użytkownik nie znaleziony'}), 404
-        
-        items = cart.get_items()
-        return jsonify({
-            'items': [
-                {
-                    'product_id': product.product_id,
-                    'name': product.name,
-                    'price': product.price,
-                    'quantity': quantity
-                }
-                for product, quantity in items
-            ],
-            'total': cart.get_total_price()
-        })
+
+        return json_response(cart_to_dict(cart))
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -239,32 +274,61 @@ def remove_from_cart(user_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@app.route("/api/cart/<user_id>/batch", methods=["POST"])
+def apply_cart_batch(user_id):
+    try:
+        data = request.get_json()
+        operations = [
+            CartOperation.from_dict(operation)
+            for operation in data['operations']
+        ]
+        result = platform.apply_cart_batch(
+            user_id, operations, atomic=data.get('atomic', True)
+        )
+        if result is None:
+            return jsonify({'error': 'Użytkownik nie znaleziony'}), 404
+        status = 409 if result.failed and not result.applied else 200
+        return json_response(result.to_dict(), status)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
 @app.route("/api/orders", methods=["POST"])
 def create_order():
     try:
         data = request.get_json()
-        order = platform.checkout(data['user_id'])
+        order = platform.checkout(
+            data['user_id'], request.headers.get('Idempotency-Key')
+        )
         if not order:
             return jsonify({'error': 'Nie można utworzyć zamówienia. Sprawdź czy koszyk nie jest pusty i czy użytkownik ma ustawiony adres.'}), 400
-        return jsonify({
+        return json_response({
             'message': 'Zamówienie złożone',
-            'order': {
-                'order_id': order.order_id,
-                'user_id': order.user.user_id,
-                'status': order.status.value,
-                'total_price': order.total_price,
-                'creation_date': order.creation_date.isoformat(),
-                'items': [
-                    {
-                        'product_id': product.product_id,
-                        'name': product.name,
-                        'price': product.price,
-                        'quantity': quantity
-                    }
-                    for product, quantity in order.items
-                ]
-            }
-        }), 201
+            'order': order_to_dict(order)
+        }, 201)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route("/api/orders", methods=["GET"])
+def get_orders_by_status():
+    try:
+        status_value = request.args.get('status', '').lower()
+        try:
+            status = OrderStatus(status_value)
+        except ValueError:
+            return jsonify({'error': 'Nieprawidłowy status'}), 400
+
+        limit = orders_page_limit()
+        orders = platform.get_orders_by_status(
+            status,
+            limit=limit + 1,
+            after_order_id=request.args.get('after_order_id')
+        )
+        has_more = len(orders) > limit
+        orders = orders[:limit]
+        next_cursor = orders[-1].order_id if has_more else None
+        return json_response(encode_list(
+            'orders', map(encode_order, orders), next_cursor=next_cursor
+        ))
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -274,25 +338,8 @@ def get_order(order_id):
         order = platform.get_order(order_id)
         if not order:
             return jsonify({'error': 'Zamówienie nie znaleziono'}), 404
-        
-        return jsonify({
-            'order': {
-                'order_id': order.order_id,
-                'user_id': order.user.user_id,
-                'status': order.status.value,
-                'total_price': order.total_price,
-                'creation_date': order.creation_date.isoformat(),
-                'items': [
-                    {
-                        'product_id': product.product_id,
-                        'name': product.name,
-                        'price': product.price,
-                        'quantity': quantity
-                    }
-                    for product, quantity in order.items
-                ]
-            }
-        })
+
+        return json_response(encode_object('order', encode_order(order)))
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -316,8 +363,12 @@ def update_order_status(order_id):
         new_status = status_map.get(data['status'].lower())
         if not new_status:
             return jsonify({'error': 'Nieprawidłowy status'}), 400
-        
-        platform.update_order_status(order_id, new_status)
+
+        if not platform.update_order_status(order_id, new_status):
+            return jsonify({
+                'error': f'Niedozwolona zmiana statusu z '
+                         f'{order.status.value} na {new_status.value}'
+            }), 409
         return jsonify({'message': 'Status zamówienia zaktualizowany'})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -325,22 +376,33 @@ def update_order_status(order_id):
 @app.route("/api/orders/<order_id>/xml", methods=["GET"])
 def download_order_xml(order_id):
     try:
-        order = platform.get_order(order_id)
-        if not order:
+        export = platform.get_order_xml(order_id)
+        if not export:
             return jsonify({'error': 'Zamówienie nie znaleziono'}), 404
-        
-        xml_content = order.to_xml()
-        
-        # Save to file
-        file_path = data_dir / f'{order_id}.xml'
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
-        
-        return send_file(
-            file_path,
+
+        etag, xml_content = export
+        response = Response(
+            xml_content,
+            mimetype='application/xml',
+            headers={
+                'Content-Disposition':
+                    f'attachment; filename={order_id}.xml'
+            }
+        )
+        response.set_etag(etag)
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route("/api/orders/xml", methods=["GET"])
+def download_all_orders_xml():
+    try:
+        return Response(
+            stream_with_context(iter_orders_xml(platform.get_all_orders())),
             mimetype='application/xml',
-            as_attachment=True,
-            download_name=f'{order_id}.xml'
+            headers={
+                'Content-Disposition': 'attachment; filename=orders.xml'
+            }
         )
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -352,30 +414,61 @@ def get_user_orders(user_id):
         if not user:
             return jsonify({'error': 'Użytkownik nie znaleziony'}), 404
         
-        orders = platform.get_user_orders(user_id)
-        return jsonify({
-            'orders': [
-                {
-                    'order_id': o.order_id,
-                    'user_id': o.user.user_id,
-                    'status': o.status.value,
-                    'total_price': o.total_price,
-                    'creation_date': o.creation_date.isoformat(),
-                    'items': [
-                        {
-                            'product_id': product.product_id,
-                            'name': product.name,
-                            'price': product.price,
-                            'quantity': quantity
-                        }
-                        for product, quantity in o.items
-                    ]
-                }
-                for o in orders
-            ]
+        limit = orders_page_limit()
+        after = request.args.get('after_order_id')
+        orders = platform.get_user_orders(
+            user_id, limit=limit + 1, after_order_id=after
+        )
+        has_more = len(orders) > limit
+        orders = orders[:limit]
+        next_cursor = orders[-1].order_id if has_more else None
+        return json_response(encode_list(
+            'orders', map(encode_order, orders), next_cursor=next_cursor
+        ))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route("/api/analytics/products", methods=["GET"])
+def get_top_products():
+    try:
+        start, end = analytics_period()
+        products = platform.get_top_products(
+            start, end,
+            limit=min(
+                request.args.get('limit', 10, type=int),
+                MAX_PRODUCTS_PAGE_SIZE
+            ),
+            by=request.args.get('by', 'revenue')
+        )
+        return json_response({
+            'products': [sales._asdict() for sales in products]
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@app.route("/api/analytics/timeseries", methods=["GET"])
+def get_sales_timeseries():
+    try:
+        start, end = analytics_period()
+        granularity = request.args.get('granularity', 'day')
+        buckets = platform.get_sales_timeseries(
+            granularity, start, end,
+            product_id=request.args.get('product_id')
+        )
+        return json_response({
+            'granularity': granularity,
+            'buckets': [sales_bucket_to_dict(bucket) for bucket in buckets]
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route("/api/analytics/summary", methods=["GET"])
+def get_sales_summary():
+    try:
+        start, end = analytics_period()
+        return json_response(platform.get_sales_totals(start, end)._asdict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
 if __name__ == "__main__":
     app.run(debug=True, host='0.0.0.0', port=5004)
@@ -0,0 +1,98 @@
+import time
+from collections import OrderedDict
+from threading import Event, Lock
+from typing import Callable, Dict, Hashable, Optional
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "done")
+
+    def __init__(self, expires_at: float):
+        self.value: Optional[str] = None
+        self.expires_at = expires_at
+        self.done: Optional[Event] = None
+
+
+class IdempotencyTable:
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        ttl: float = 86_400.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries <= 0:
+            raise ValueError("Max entries must be positive")
+        if ttl <= 0:
+            raise ValueError("TTL must be positive")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._running: Dict[Hashable, _Entry] = {}
+        self._lock = Lock()
+
+    def run(
+        self, key: Hashable, produce: Callable[[], Optional[str]]
+    ) -> Optional[str]:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._expire(now)
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return entry.value
+                entry = self._running.get(key)
+                if entry is None:
+                    entry = self._running[key] = _Entry(now + self.ttl)
+                    done = None
+                else:
+                    if entry.done is None:
+                        entry.done = Event()
+                    done = entry.done
+
+            if done is None:
+                return self._produce(key, entry, produce)
+            done.wait()
+            if entry.value is not None:
+                return entry.value
+
+    def _produce(
+        self,
+        key: Hashable,
+        entry: _Entry,
+        produce: Callable[[], Optional[str]],
+    ) -> Optional[str]:
+        try:
+            entry.value = produce()
+        finally:
+            with self._lock:
+                del self._running[key]
+                if entry.value is not None:
+                    entry.expires_at = self._clock() + self.ttl
+                    self._entries[key] = entry
+                    if len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                if entry.done is not None:
+                    entry.done.set()
+        return entry.value
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            self._expire(self._clock())
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def _expire(self, now: float) -> None:
+        entries = self._entries
+        while entries:
+            key, entry = next(iter(entries.items()))
+            if entry.expires_at > now:
+                break
+            del entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._running)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries or key in self._running
@@ -0,0 +1,260 @@
+import os
+from array import array
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+from time import perf_counter_ns
+from typing import (
+    Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+Labels = Tuple[Tuple[str, str], ...]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_TRACKED_NS = 1 << 40
+BUCKET_COUNT = (
+    2 * SUB_BUCKETS
+    + (MAX_TRACKED_NS.bit_length() - SUB_BUCKET_BITS - 2) * SUB_BUCKETS
+)
+
+LATENCY_BUCKETS = tuple(
+    float(f"{mantissa}e{exponent}")
+    for exponent in range(-6, 1)
+    for mantissa in (1, 2.5, 5)
+) + (10.0,)
+
+CALL_SECONDS = "ecommerce_call_duration_seconds"
+CALL_ERRORS = "ecommerce_call_errors_total"
+HTTP_SECONDS = "ecommerce_http_request_duration_seconds"
+HTTP_REQUESTS = "ecommerce_http_requests_total"
+UNMATCHED_ROUTE = "unmatched"
+
+
+def bucket_index(value: int) -> int:
+    if value < 2 * SUB_BUCKETS:
+        return max(value, 0)
+    if value >= MAX_TRACKED_NS:
+        return BUCKET_COUNT - 1
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKETS + (value >> shift)
+
+
+def bucket_upper_bound(index: int) -> int:
+    if index < 2 * SUB_BUCKETS:
+        return index + 1
+    shift, mantissa = divmod(index, SUB_BUCKETS)
+    return (mantissa + SUB_BUCKETS + 1) << (shift - 1)
+
+
+def _le_index(index: int) -> int:
+    highest = (bucket_upper_bound(index) - 1) / 1e9
+    for position, bound in enumerate(LATENCY_BUCKETS):
+        if highest <= bound:
+            return position
+    return len(LATENCY_BUCKETS)
+
+
+_LE_POSITIONS = array("H", (_le_index(i) for i in range(BUCKET_COUNT)))
+
+
+class Counter:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    __slots__ = ("count", "total_ns", "_counts", "_lock")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self._counts = array("q", bytes(8 * BUCKET_COUNT))
+        self._lock = Lock()
+
+    def record(self, value_ns: int) -> None:
+        index = bucket_index(value_ns)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total_ns += value_ns
+
+    def snapshot(self) -> Tuple[array, int, int]:
+        with self._lock:
+            return array("q", self._counts), self.count, self.total_ns
+
+    def quantile(self, q: float) -> float:
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        counts, count, _ = self.snapshot()
+        if count == 0:
+            return 0.0
+        rank = max(1, round(q * count))
+        seen = 0
+        for index, bucket in enumerate(counts):
+            seen += bucket
+            if seen >= rank:
+                return (bucket_upper_bound(index) - 1) / 1e9
+        return MAX_TRACKED_NS / 1e9
+
+    def cumulative(self) -> Tuple[List[int], int, int]:
+        counts, count, total_ns = self.snapshot()
+        per_le = [0] * (len(LATENCY_BUCKETS) + 1)
+        for index, bucket in enumerate(counts):
+            if bucket:
+                per_le[_LE_POSITIONS[index]] += bucket
+        running = 0
+        for position, bucket in enumerate(per_le):
+            running += bucket
+            per_le[position] = running
+        return per_le[:-1], count, total_ns
+
+
+Metric = Union[Counter, Histogram]
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._families: Dict[
+            str, Tuple[str, str, Dict[Labels, Metric]]
+        ] = {}
+        self._lock = Lock()
+
+    def counter(self, name: str, help_text: str, **labels: str) -> Counter:
+        return self._metric(name, "counter", help_text, labels, Counter)
+
+    def histogram(
+        self, name: str, help_text: str, **labels: str
+    ) -> Histogram:
+        return self._metric(name, "histogram", help_text, labels, Histogram)
+
+    def _metric(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        labels: Dict[str, str],
+        factory: Callable[[], Metric],
+    ) -> Any:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = (kind, help_text, {})
+            elif family[0] != kind:
+                raise ValueError(f"Metric {name} is a {family[0]}")
+            metric = family[2].get(key)
+            if metric is None:
+                metric = family[2][key] = factory()
+            return metric
+
+    def timed(self, func: F, name: Optional[str] = None) -> F:
+        function = name or func.__qualname__
+        histogram = self.histogram(
+            CALL_SECONDS, "Time spent in instrumented calls.",
+            function=function,
+        )
+        errors = self.counter(
+            CALL_ERRORS, "Instrumented calls that raised.",
+            function=function,
+        )
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not self.enabled:
+                return func(*args, **kwargs)
+            started = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                histogram.record(perf_counter_ns() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        histogram = self.histogram(
+            CALL_SECONDS, "Time spent in instrumented calls.", function=name
+        )
+        started = perf_counter_ns()
+        try:
+            yield
+        finally:
+            histogram.record(perf_counter_ns() - started)
+
+    def observe_request(
+        self, method: str, route: str, status: int, elapsed_ns: int
+    ) -> None:
+        self.histogram(
+            HTTP_SECONDS, "HTTP request latency by route.",
+            method=method, route=route,
+        ).record(elapsed_ns)
+        self.counter(
+            HTTP_REQUESTS, "HTTP requests by route and status.",
+            method=method, route=route, status=str(status),
+        ).inc()
+
+    def render(self) -> str:
+        with self._lock:
+            families = [
+                (name, kind, help_text, list(metrics.items()))
+                for name, (kind, help_text, metrics)
+                in self._families.items()
+            ]
+
+        lines: List[str] = []
+        for name, kind, help_text, metrics in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in metrics:
+                if isinstance(metric, Counter):
+                    lines.append(f"{name}{_labels(labels)} {metric.value}")
+                    continue
+                buckets, count, total_ns = metric.cumulative()
+                for bound, cumulative in zip(LATENCY_BUCKETS, buckets):
+                    le = labels + (("le", repr(bound)),)
+                    lines.append(f"{name}_bucket{_labels(le)} {cumulative}")
+                le = labels + (("le", "+Inf"),)
+                lines.append(f"{name}_bucket{_labels(le)} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {total_ns / 1e9}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            key,
+            value.replace("\\", "\\\\").replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for key, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+registry = MetricsRegistry(os.environ.get("ECOMMERCE_METRICS") == "1")
+
+
+def timed(func: F) -> F:
+    return registry.timed(func)
@@ -0,0 +1,14 @@
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+
+MINOR_UNITS_PER_MAJOR = 100
+
+
+@lru_cache(maxsize=65536)
+def to_minor_units(amount: float) -> int:
+    cents = Decimal(str(amount)) * MINOR_UNITS_PER_MAJOR
+    return int(cents.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_minor_units(amount: int) -> float:
+    return amount / MINOR_UNITS_PER_MAJOR
@@ -1,11 +1,30 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import List, Tuple
-from xml.etree.ElementTree import Element, SubElement, tostring
-from xml.dom import minidom
+from typing import (
+    Dict, FrozenSet, Iterable, Iterator, NamedTuple, Sequence, Tuple, Union
+)
+from xml.sax.saxutils import escape
+from metrics import timed
+from money import from_minor_units, to_minor_units
 from product import Product
 from user import User
 
+XML_DECLARATION = '<?xml version="1.0" ?>\n'
+XML_INDENT = "  "
+
+
+def _xml_text(value: object) -> str:
+    return escape(str(value), {'"': "&quot;"})
+
+
+def _xml_field(tag: str, value: object, depth: int) -> str:
+    indent = XML_INDENT * depth
+    text = _xml_text(value)
+    if not text:
+        return f"{indent}<{tag}/>\n"
+    return f"{indent}<{tag}>{text}</{tag}>\n"
+
+
 class OrderStatus(Enum):
     PENDING = "pending"
     CONFIRMED = "confirmed"
@@ -13,62 +32,144 @@ class OrderStatus(Enum):
     DELIVERED = "delivered"
     CANCELLED = "cancelled"
 
+
+ALLOWED_TRANSITIONS: Dict[OrderStatus, FrozenSet[OrderStatus]] = {
+    OrderStatus.PENDING: frozenset({
+        OrderStatus.CONFIRMED, OrderStatus.SHIPPED, OrderStatus.CANCELLED,
+    }),
+    OrderStatus.CONFIRMED: frozenset({
+        OrderStatus.SHIPPED, OrderStatus.CANCELLED,
+    }),
+    OrderStatus.SHIPPED: frozenset({OrderStatus.DELIVERED}),
+    OrderStatus.DELIVERED: frozenset(),
+    OrderStatus.CANCELLED: frozenset(),
+}
+
+class OrderLine(NamedTuple):
+    product_id: str
+    name: str
+    unit_price: float
+    quantity: int
+
+    @classmethod
+    def snapshot(cls, product: Product, quantity: int) -> "OrderLine":
+        return cls(product.product_id, product.name, product.price, quantity)
+
+    @property
+    def total_minor_units(self) -> int:
+        return to_minor_units(self.unit_price) * self.quantity
+
+    @property
+    def total_price(self) -> float:
+        return from_minor_units(self.total_minor_units)
+
+
 class Order:
+    __slots__ = (
+        "order_id", "user", "items", "status", "version",
+        "creation_date", "total_price",
+    )
+
     def __init__(
         self,
         order_id: str,
         user: User,
-        items: List[Tuple[Product, int]],
+        items: Sequence[Union[OrderLine, Tuple[Product, int]]],
     ):
         if not items:
             raise ValueError("Order must contain at least one item")
 
         self.order_id = order_id
         self.user = user
-        self.items = items
+        self.items: Tuple[OrderLine, ...] = tuple(
+            item if isinstance(item, OrderLine) else OrderLine.snapshot(*item)
+            for item in items
+        )
         self.status = OrderStatus.PENDING
-        self.creation_date = datetime.now()
+        self.version = 1
+        self.creation_date = datetime.now(timezone.utc)
         self.total_price = self._calculate_total()
 
     def _calculate_total(self) -> float:
-        return sum(product.price * quantity for product, quantity in self.items)
+        return from_minor_units(
+            sum(line.total_minor_units for line in self.items)
+        )
+
+    def can_transition_to(self, new_status: OrderStatus) -> bool:
+        return new_status in ALLOWED_TRANSITIONS[self.status]
 
     def update_status(self, new_status: OrderStatus) -> None:
+        if not self.can_transition_to(new_status):
+            raise ValueError(
+                f"Cannot change status from {self.status.value} "
+                f"to {new_status.value}"
+            )
         self.status = new_status
+        self.version += 1
 
+    @timed
     def to_xml(self) -> str:
-        root = Element("order")
-        root.set("id", self.order_id)
+        return "".join(self.iter_xml())
 
-        metadata = SubElement(root, "metadata")
-        SubElement(metadata, "status").text = self.status.value
-        SubElement(metadata, "creation_date").text = self.creation_date.isoformat()
-        SubElement(metadata, "total_price").text = str(self.total_price)
+    def iter_xml(self) -> Iterator[str]:
+        yield XML_DECLARATION
+        yield from self._iter_xml_element(0)
 
-        user_elem = SubElement(root, "user")
-        SubElement(user_elem, "id").text = self.user.user_id
-        SubElement(user_elem, "username").text = self.user.username
-        SubElement(user_elem, "email").text = self.user.email
+    def _iter_xml_element(self, depth: int) -> Iterator[str]:
+        indent = XML_INDENT * depth
+        yield (
+            f'{indent}<order id="{_xml_text(self.order_id)}">\n'
+            f"{indent}{XML_INDENT}<metadata>\n"
+            + _xml_field("status", self.status.value, depth + 2)
+            + _xml_field(
+                "creation_date", self.creation_date.isoformat(), depth + 2
+            )
+            + _xml_field("total_price", self.total_price, depth + 2)
+            + f"{indent}{XML_INDENT}</metadata>\n"
+        )
 
+        user_xml = (
+            f"{indent}{XML_INDENT}<user>\n"
+            + _xml_field("id", self.user.user_id, depth + 2)
+            + _xml_field("username", self.user.username, depth + 2)
+            + _xml_field("email", self.user.email, depth + 2)
+        )
         if self.user.address:
-            SubElement(user_elem, "address").text = self.user.address
-
-        items_elem = SubElement(root, "items")
-        for product, quantity in self.items:
-            item = SubElement(items_elem, "item")
-            SubElement(item, "product_id").text = product.product_id
-            SubElement(item, "product_name").text = product.name
-            SubElement(item, "unit_price").text = str(product.price)
-            SubElement(item, "quantity").text = str(quantity)
-            item_total = product.price * quantity
-            SubElement(item, "item_total").text = str(item_total)
-
-        rough_string = tostring(root, encoding="unicode")
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ")
+            user_xml += _xml_field("address", self.user.address, depth + 2)
+        yield user_xml + f"{indent}{XML_INDENT}</user>\n"
+
+        yield f"{indent}{XML_INDENT}<items>\n"
+        item_indent = XML_INDENT * (depth + 2)
+        for line in self.items:
+            yield (
+                f"{item_indent}<item>\n"
+                + _xml_field("product_id", line.product_id, depth + 3)
+                + _xml_field("product_name", line.name, depth + 3)
+                + _xml_field("unit_price", line.unit_price, depth + 3)
+                + _xml_field("quantity", line.quantity, depth + 3)
+                + _xml_field("item_total", line.total_price, depth + 3)
+                + f"{item_indent}</item>\n"
+            )
+        yield f"{indent}{XML_INDENT}</items>\n{indent}</order>\n"
 
     def __repr__(self) -> str:
         return (
             f"Order(id={self.order_id}, user={self.user.username}, "
             f"status={self.status.value}, total={self.total_price})"
         )
+
+
+def iter_orders_xml(orders: Iterable[Order]) -> Iterator[str]:
+    yield XML_DECLARATION
+    empty = True
+    for order in orders:
+        if empty:
+            yield "<orders>\n"
+            empty = False
+        yield from order._iter_xml_element(1)
+    yield "<orders/>\n" if empty else "</orders>\n"
+
+
+def write_orders_xml(orders: Iterable[Order], file_path: str) -> None:
+    with open(file_path, "w", encoding="utf-8") as xml_file:
+        xml_file.writelines(iter_orders_xml(orders))
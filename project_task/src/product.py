@@ -1,4 +1,6 @@
 class Product:
+    __slots__ = ("product_id", "name", "price", "stock", "reserved")
+
     def __init__(self, product_id: str, name: str, price: float, stock: int):
         if price < 0:
             raise ValueError("Price cannot be negative")
@@ -9,6 +11,11 @@ class Product:
         self.name = name
         self.price = price
         self.stock = stock
+        self.reserved = 0
+
+    @property
+    def available(self) -> int:
+        return self.stock - self.reserved
 
     def decrease_stock(self, quantity: int) -> bool:
         if quantity > self.stock:
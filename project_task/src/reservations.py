@@ -0,0 +1,107 @@
+import heapq
+import time
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Tuple
+from product import Product
+
+HoldKey = Tuple[str, str]
+Hold = Tuple[Product, int, float]
+
+
+class ReservationBook:
+    def __init__(
+        self,
+        ttl: float = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl <= 0:
+            raise ValueError("Reservation TTL must be positive")
+
+        self.ttl = ttl
+        self._clock = clock
+        self._holds: Dict[HoldKey, Hold] = {}
+        self._expiry: List[Tuple[float, str, str]] = []
+        self._lock = Lock()
+
+    def held(self, user_id: str, product_id: str) -> int:
+        with self._lock:
+            self._release_expired(self._clock())
+            hold = self._holds.get((user_id, product_id))
+            return hold[1] if hold else 0
+
+    def available_for(self, user_id: str, product: Product) -> int:
+        with self._lock:
+            self._release_expired(self._clock())
+            hold = self._holds.get((user_id, product.product_id))
+            return product.available + (hold[1] if hold else 0)
+
+    def hold(self, user_id: str, product: Product, quantity: int) -> bool:
+        if quantity < 0:
+            raise ValueError("Quantity cannot be negative")
+
+        key = (user_id, product.product_id)
+        with self._lock:
+            now = self._clock()
+            self._release_expired(now)
+            hold = self._holds.get(key)
+            current = hold[1] if hold else 0
+            if quantity - current > product.available:
+                return False
+
+            product.reserved += quantity - current
+            if quantity == 0:
+                self._holds.pop(key, None)
+                return True
+
+            expires_at = now + self.ttl
+            self._holds[key] = (product, quantity, expires_at)
+            heapq.heappush(self._expiry, (expires_at, *key))
+            if len(self._expiry) > 2 * len(self._holds) + 1024:
+                self._rebuild_expiry()
+        return True
+
+    def release(self, user_id: str, product_id: str) -> int:
+        with self._lock:
+            hold = self._holds.pop((user_id, product_id), None)
+            if hold is None:
+                return 0
+            hold[0].reserved -= hold[1]
+            return hold[1]
+
+    def consume(
+        self, user_id: str, items: Iterable[Tuple[Product, int]]
+    ) -> None:
+        with self._lock:
+            for product, quantity in items:
+                hold = self._holds.pop((user_id, product.product_id), None)
+                if hold is not None:
+                    product.reserved -= hold[1]
+                product.decrease_stock(quantity)
+
+    def release_expired(self) -> int:
+        with self._lock:
+            return self._release_expired(self._clock())
+
+    def _release_expired(self, now: float) -> int:
+        released = 0
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= now:
+            expires_at, user_id, product_id = heapq.heappop(expiry)
+            key = (user_id, product_id)
+            hold = self._holds.get(key)
+            if hold is not None and hold[2] == expires_at:
+                del self._holds[key]
+                hold[0].reserved -= hold[1]
+                released += 1
+        return released
+
+    def _rebuild_expiry(self) -> None:
+        self._expiry = [
+            (expires_at, user_id, product_id)
+            for (user_id, product_id), (_, _, expires_at)
+            in self._holds.items()
+        ]
+        heapq.heapify(self._expiry)
+
+    def __len__(self) -> int:
+        return len(self._holds)
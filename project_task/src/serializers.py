@@ -0,0 +1,166 @@
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+from analytics import SalesBucket
+from cart import Cart
+from order import Order
+from product import Product
+from user import User
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(
+        payload, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def product_to_dict(product: Product) -> Dict[str, Any]:
+    return {
+        "product_id": product.product_id,
+        "name": product.name,
+        "price": product.price,
+        "stock": product.stock,
+        "available": product.available,
+    }
+
+
+def user_to_dict(user: User) -> Dict[str, Any]:
+    return {
+        "user_id": user.user_id,
+        "username": user.username,
+        "email": user.email,
+        "address": user.address,
+    }
+
+
+def order_to_dict(order: Order) -> Dict[str, Any]:
+    return {
+        "order_id": order.order_id,
+        "user_id": order.user.user_id,
+        "status": order.status.value,
+        "total_price": order.total_price,
+        "creation_date": order.creation_date.isoformat(),
+        "items": [
+            {
+                "product_id": line.product_id,
+                "name": line.name,
+                "price": line.unit_price,
+                "quantity": line.quantity,
+            }
+            for line in order.items
+        ],
+    }
+
+
+def cart_to_dict(cart: Cart) -> Dict[str, Any]:
+    return {
+        "items": [
+            {
+                "product_id": product.product_id,
+                "name": product.name,
+                "price": product.price,
+                "quantity": quantity,
+            }
+            for product, quantity in cart.get_items()
+        ],
+        "total": cart.get_total_price(),
+    }
+
+
+def sales_bucket_to_dict(bucket: SalesBucket) -> Dict[str, Any]:
+    return {
+        "start": bucket.start.isoformat(),
+        "revenue": bucket.revenue,
+        "units": bucket.units,
+        "orders": bucket.orders,
+    }
+
+
+class FragmentCache:
+    def __init__(self, max_entries: int = 100_000):
+        if max_entries <= 0:
+            raise ValueError("Max entries must be positive")
+        self.max_entries = max_entries
+        self._fragments: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+            return fragment
+
+    def put(self, key: Hashable, fragment: bytes) -> None:
+        with self._lock:
+            self._fragments[key] = fragment
+            self._fragments.move_to_end(key)
+            if len(self._fragments) > self.max_entries:
+                self._fragments.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+
+fragment_cache = FragmentCache()
+
+
+def _encode_cached(
+    key: Hashable, obj: Any, to_dict: Callable[[Any], Dict[str, Any]]
+) -> bytes:
+    fragment = fragment_cache.get(key)
+    if fragment is None:
+        fragment = dumps(to_dict(obj))
+        fragment_cache.put(key, fragment)
+    return fragment
+
+
+def encode_product(product: Product) -> bytes:
+    key = (
+        "product", product.product_id, product.name,
+        product.price, product.stock, product.reserved,
+    )
+    return _encode_cached(key, product, product_to_dict)
+
+
+def encode_user(user: User) -> bytes:
+    key = ("user", user.user_id, user.username, user.email, user.address)
+    return _encode_cached(key, user, user_to_dict)
+
+
+def encode_order(order: Order) -> bytes:
+    key = ("order", order.order_id, order.version)
+    return _encode_cached(key, order, order_to_dict)
+
+
+def encode_object(name: str, fragment: bytes, **fields: Any) -> bytes:
+    return _encode_envelope(name, fragment, fields)
+
+
+def encode_list(
+    name: str, fragments: Iterable[bytes], **fields: Any
+) -> bytes:
+    body = b"[" + b",".join(fragments) + b"]"
+    return _encode_envelope(name, body, fields)
+
+
+def _encode_envelope(
+    name: str, body: bytes, fields: Dict[str, Any]
+) -> bytes:
+    parts = [
+        dumps(key) + b":" + dumps(value) for key, value in fields.items()
+    ]
+    parts.append(dumps(name) + b":" + body)
+    return b"{" + b",".join(parts) + b"}"
@@ -0,0 +1,85 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional
+
+BLOCK_SIZE = 1024
+
+
+class SortedOrderSet:
+    __slots__ = ("_blocks", "_maxes", "_order_ids")
+
+    def __init__(self):
+        self._blocks: List[List[int]] = []
+        self._maxes: List[int] = []
+        self._order_ids: Dict[int, str] = {}
+
+    def add(self, sequence: int, order_id: str) -> None:
+        if sequence in self._order_ids:
+            return
+        self._order_ids[sequence] = order_id
+        if not self._blocks:
+            self._blocks.append([sequence])
+            self._maxes.append(sequence)
+            return
+
+        index = bisect_left(self._maxes, sequence)
+        if index == len(self._blocks):
+            index -= 1
+            self._blocks[index].append(sequence)
+            self._maxes[index] = sequence
+        else:
+            insort(self._blocks[index], sequence)
+        if len(self._blocks[index]) > 2 * BLOCK_SIZE:
+            self._split(index)
+
+    def remove(self, sequence: int) -> None:
+        del self._order_ids[sequence]
+        index = bisect_left(self._maxes, sequence)
+        block = self._blocks[index]
+        del block[bisect_left(block, sequence)]
+        if not block:
+            del self._blocks[index]
+            del self._maxes[index]
+            return
+
+        self._maxes[index] = block[-1]
+        if len(block) < BLOCK_SIZE // 2 and len(self._blocks) > 1:
+            self._join(min(index, len(self._blocks) - 2))
+
+    def page(self, limit: int, after: Optional[int] = None) -> List[str]:
+        index = position = 0
+        if after is not None:
+            index = bisect_right(self._maxes, after)
+            if index < len(self._blocks):
+                position = bisect_right(self._blocks[index], after)
+
+        order_ids: List[str] = []
+        while index < len(self._blocks) and len(order_ids) < limit:
+            block = self._blocks[index]
+            end = position + limit - len(order_ids)
+            order_ids.extend(
+                self._order_ids[sequence] for sequence in block[position:end]
+            )
+            index += 1
+            position = 0
+        return order_ids
+
+    def _split(self, index: int) -> None:
+        block = self._blocks[index]
+        self._blocks[index:index + 1] = [
+            block[:BLOCK_SIZE], block[BLOCK_SIZE:]
+        ]
+        self._maxes[index:index + 1] = [block[BLOCK_SIZE - 1], block[-1]]
+
+    def _join(self, index: int) -> None:
+        block = self._blocks[index] + self._blocks.pop(index + 1)
+        del self._maxes[index + 1]
+        self._blocks[index] = block
+        self._maxes[index] = block[-1]
+        if len(block) > 2 * BLOCK_SIZE:
+            self._split(index)
+
+    def __contains__(self, sequence: int) -> bool:
+        return sequence in self._order_ids
+
+    def __len__(self) -> int:
+        return len(self._order_ids)
@@ -0,0 +1,394 @@
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import groupby, islice
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from order import Order, OrderLine, OrderStatus
+from product import Product
+from user import User
+
+
+class Storage(ABC):
+    @abstractmethod
+    def load_products(self) -> Iterator[Product]:
+        ...
+
+    @abstractmethod
+    def load_users(self) -> Iterator[User]:
+        ...
+
+    @abstractmethod
+    def load_orders(self, users: Dict[str, User]) -> Iterator[Order]:
+        ...
+
+    def load_carts(self) -> Iterator[Tuple[str, str, int]]:
+        return iter(())
+
+    def load_stock(self, product_ids: Iterable[str]) -> Dict[str, int]:
+        return {}
+
+    def load_product(self, product_id: str) -> Optional[Product]:
+        return None
+
+    def load_user(self, user_id: str) -> Optional[User]:
+        return None
+
+    @abstractmethod
+    def save_products(self, products: Iterable[Product]) -> None:
+        ...
+
+    @abstractmethod
+    def save_users(self, users: Iterable[User]) -> None:
+        ...
+
+    def insert_products(self, products: List[Product]) -> List[Product]:
+        self.save_products(products)
+        return products
+
+    def insert_users(self, users: List[User]) -> List[User]:
+        self.save_users(users)
+        return users
+
+    def save_cart_item(
+        self, user_id: str, product_id: str, quantity: int
+    ) -> None:
+        pass
+
+    def save_restock(self, product: Product, quantity: int) -> None:
+        self.save_products([product])
+
+    @abstractmethod
+    def save_checkout(self, order: Order) -> Optional[Dict[str, int]]:
+        ...
+
+    @abstractmethod
+    def save_order_status(self, order: Order) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryStorage(Storage):
+    def load_products(self) -> Iterator[Product]:
+        return iter(())
+
+    def load_users(self) -> Iterator[User]:
+        return iter(())
+
+    def load_orders(self, users: Dict[str, User]) -> Iterator[Order]:
+        return iter(())
+
+    def save_products(self, products: Iterable[Product]) -> None:
+        pass
+
+    def save_users(self, users: Iterable[User]) -> None:
+        pass
+
+    def save_checkout(self, order: Order) -> Optional[Dict[str, int]]:
+        return {}
+
+    def save_order_status(self, order: Order) -> None:
+        pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    stock INTEGER NOT NULL CHECK (stock >= 0)
+);
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    email TEXT NOT NULL,
+    address TEXT
+);
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL REFERENCES users (user_id),
+    status TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    creation_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS order_lines (
+    order_id TEXT NOT NULL REFERENCES orders (order_id),
+    position INTEGER NOT NULL,
+    product_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    unit_price REAL NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (order_id, position)
+);
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO sequences (name, value)
+    SELECT 'orders', COALESCE(MAX(CAST(substr(order_id, 5) AS INTEGER)), 0)
+    FROM orders;
+CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders (user_id);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status);
+CREATE INDEX IF NOT EXISTS idx_orders_creation_date
+    ON orders (creation_date);
+"""
+
+UPSERT_PRODUCT = (
+    "INSERT INTO products (product_id, name, price, stock) "
+    "VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (product_id) DO UPDATE SET "
+    "name = excluded.name, price = excluded.price, stock = excluded.stock"
+)
+UPSERT_USER = (
+    "INSERT INTO users (user_id, username, email, address) "
+    "VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (user_id) DO UPDATE SET "
+    "username = excluded.username, email = excluded.email, "
+    "address = excluded.address"
+)
+INSERT_PRODUCT = (
+    "INSERT INTO products (product_id, name, price, stock) "
+    "VALUES (?, ?, ?, ?) ON CONFLICT (product_id) DO NOTHING"
+)
+INSERT_USER = (
+    "INSERT INTO users (user_id, username, email, address) "
+    "VALUES (?, ?, ?, ?) ON CONFLICT (user_id) DO NOTHING"
+)
+SELECT_PRODUCT = (
+    "SELECT product_id, name, price, stock FROM products "
+    "WHERE product_id = ?"
+)
+SELECT_USER = (
+    "SELECT user_id, username, email, address FROM users WHERE user_id = ?"
+)
+ADD_STOCK = (
+    "UPDATE products SET stock = stock + ? WHERE product_id = ? "
+    "RETURNING stock"
+)
+TAKE_STOCK = (
+    "UPDATE products SET stock = stock - ? "
+    "WHERE product_id = ? AND stock >= ?"
+)
+NEXT_ORDER_NUMBER = (
+    "UPDATE sequences SET value = value + 1 WHERE name = 'orders' "
+    "RETURNING value"
+)
+INSERT_ORDER = (
+    "INSERT INTO orders (order_id, user_id, status, version, creation_date) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+INSERT_ORDER_LINE = (
+    "INSERT INTO order_lines "
+    "(order_id, position, product_id, name, unit_price, quantity) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+UPDATE_ORDER_STATUS = (
+    "UPDATE orders SET status = ?, version = ? WHERE order_id = ?"
+)
+SELECT_ORDERS = (
+    "SELECT order_id, user_id, status, version, creation_date "
+    "FROM orders ORDER BY creation_date, order_id"
+)
+SELECT_ORDER_LINES = (
+    "SELECT order_id, product_id, name, unit_price, quantity "
+    "FROM order_lines ORDER BY order_id, position"
+)
+
+
+class SQLiteStorage(Storage):
+    def __init__(self, database: str, batch_size: int = 1000):
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+
+        self.batch_size = batch_size
+        self._lock = Lock()
+        self._connection = sqlite3.connect(
+            database, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(SCHEMA)
+
+    def load_products(self) -> Iterator[Product]:
+        rows = self._connection.execute(
+            "SELECT product_id, name, price, stock FROM products"
+        )
+        for row in rows:
+            yield Product(*row)
+
+    def load_users(self) -> Iterator[User]:
+        rows = self._connection.execute(
+            "SELECT user_id, username, email, address FROM users"
+        )
+        for row in rows:
+            yield _user_from_row(row)
+
+    def load_product(self, product_id: str) -> Optional[Product]:
+        with self._lock:
+            row = self._connection.execute(
+                SELECT_PRODUCT, (product_id,)
+            ).fetchone()
+        return Product(*row) if row is not None else None
+
+    def load_user(self, user_id: str) -> Optional[User]:
+        with self._lock:
+            row = self._connection.execute(
+                SELECT_USER, (user_id,)
+            ).fetchone()
+        return _user_from_row(row) if row is not None else None
+
+    def load_orders(self, users: Dict[str, User]) -> Iterator[Order]:
+        lines: Dict[str, List[OrderLine]] = {
+            order_id: [OrderLine(*row[1:]) for row in rows]
+            for order_id, rows in groupby(
+                self._connection.execute(SELECT_ORDER_LINES),
+                key=lambda row: row[0],
+            )
+        }
+        rows = self._connection.execute(SELECT_ORDERS)
+        for order_id, user_id, status, version, creation_date in rows:
+            order = Order(order_id, users[user_id], lines[order_id])
+            order.status = OrderStatus(status)
+            order.version = version
+            order.creation_date = datetime.fromisoformat(
+                creation_date
+            ).astimezone(timezone.utc)
+            yield order
+
+    def save_products(self, products: Iterable[Product]) -> None:
+        rows = (
+            (p.product_id, p.name, p.price, p.stock) for p in products
+        )
+        self._execute_batched(UPSERT_PRODUCT, rows)
+
+    def save_users(self, users: Iterable[User]) -> None:
+        rows = (
+            (u.user_id, u.username, u.email, u.address) for u in users
+        )
+        self._execute_batched(UPSERT_USER, rows)
+
+    def insert_products(self, products: List[Product]) -> List[Product]:
+        return self._insert(INSERT_PRODUCT, products, [
+            (p.product_id, p.name, p.price, p.stock) for p in products
+        ])
+
+    def insert_users(self, users: List[User]) -> List[User]:
+        return self._insert(INSERT_USER, users, [
+            (u.user_id, u.username, u.email, u.address) for u in users
+        ])
+
+    def save_restock(self, product: Product, quantity: int) -> None:
+        with self._transaction() as cursor:
+            row = cursor.execute(
+                ADD_STOCK, (quantity, product.product_id)
+            ).fetchone()
+            if row is None:
+                cursor.execute(UPSERT_PRODUCT, (
+                    product.product_id, product.name, product.price,
+                    product.stock,
+                ))
+            else:
+                product.stock = row[0]
+
+    def load_stock(self, product_ids: Iterable[str]) -> Dict[str, int]:
+        with self._lock:
+            return self._select_stock(self._connection.cursor(), product_ids)
+
+    def save_checkout(self, order: Order) -> Optional[Dict[str, int]]:
+        try:
+            with self._transaction() as cursor:
+                for line in order.items:
+                    cursor.execute(
+                        TAKE_STOCK,
+                        (line.quantity, line.product_id, line.quantity),
+                    )
+                    if cursor.rowcount != 1:
+                        raise _InsufficientStock(line.product_id)
+                number = cursor.execute(NEXT_ORDER_NUMBER).fetchone()[0]
+                order.order_id = f"ORD-{number:06d}"
+                cursor.execute(INSERT_ORDER, (
+                    order.order_id, order.user.user_id, order.status.value,
+                    order.version, order.creation_date.isoformat(),
+                ))
+                cursor.executemany(INSERT_ORDER_LINE, (
+                    (order.order_id, position, *line)
+                    for position, line in enumerate(order.items)
+                ))
+                return self._select_stock(
+                    cursor, [line.product_id for line in order.items]
+                )
+        except _InsufficientStock:
+            return None
+
+    def save_order_status(self, order: Order) -> None:
+        with self._transaction() as cursor:
+            cursor.execute(UPDATE_ORDER_STATUS, (
+                order.status.value, order.version, order.order_id
+            ))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _select_stock(
+        self, cursor: sqlite3.Cursor, product_ids: Iterable[str]
+    ) -> Dict[str, int]:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return {}
+        placeholders = ", ".join("?" * len(product_ids))
+        return dict(cursor.execute(
+            "SELECT product_id, stock FROM products "
+            f"WHERE product_id IN ({placeholders})", product_ids
+        ))
+
+    def _insert(
+        self, statement: str, items: List[Any], rows: List[Tuple[Any, ...]]
+    ) -> List[Any]:
+        if not items:
+            return []
+        inserted = []
+        with self._transaction() as cursor:
+            for item, row in zip(items, rows):
+                cursor.execute(statement, row)
+                if cursor.rowcount == 1:
+                    inserted.append(item)
+        return inserted
+
+    def _execute_batched(
+        self, statement: str, rows: Iterable[Tuple[Any, ...]]
+    ) -> None:
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return
+            with self._transaction() as cursor:
+                cursor.executemany(statement, batch)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Cursor]:
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+
+
+class _InsufficientStock(Exception):
+    pass
+
+
+def _user_from_row(row: Tuple[str, str, str, Optional[str]]) -> User:
+    user_id, username, email, address = row
+    user = User(user_id, username, email)
+    user.address = address
+    return user
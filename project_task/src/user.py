@@ -1,6 +1,8 @@
 from typing import Optional
 
 class User:
+    __slots__ = ("user_id", "username", "email", "address")
+
     def __init__(self, user_id: str, username: str, email: str):
         if "@" not in email:
             raise ValueError("Invalid email format")
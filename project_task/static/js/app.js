@@ -1,4 +1,5 @@
 const API_BASE = window.location.port === '5004' ? '' : 'http://127.0.0.1:5004';
+const PRODUCTS_PAGE_SIZE = 100;
 
 let currentUser = null;
 let cart = {};
@@ -52,7 +53,12 @@ function showAlert(message, type = 'info') {
 
 async function loadProducts() {
     try {
-        const response = await fetch(`${API_BASE}/api/products`);
+        const params = new URLSearchParams({ sort: 'name', limit: PRODUCTS_PAGE_SIZE });
+        const searchInput = document.getElementById('productSearch');
+        if (searchInput && searchInput.value.trim()) {
+            params.set('q', searchInput.value.trim());
+        }
+        const response = await fetch(`${API_BASE}/api/products?${params}`);
         const data = await response.json();
 
         if (!response.ok) throw new Error(data.error);
@@ -342,22 +348,28 @@ async function createOrder() {
     }
 }
 
-async function loadOrders() {
+async function loadOrders(afterOrderId = null) {
     if (!currentUser) {
         showAlert('Musisz wybrać użytkownika', 'error');
         return;
     }
 
     try {
-        const response = await fetch(`${API_BASE}/api/users/${currentUser.user_id}/orders`);
+        const params = new URLSearchParams();
+        if (afterOrderId) {
+            params.set('after_order_id', afterOrderId);
+        }
+        const response = await fetch(`${API_BASE}/api/users/${currentUser.user_id}/orders?${params}`);
         const data = await response.json();
 
         if (!response.ok) throw new Error(data.error);
 
         const ordersList = document.getElementById('ordersList');
-        ordersList.innerHTML = '';
+        const loadMore = document.getElementById('ordersLoadMore');
+        if (loadMore) loadMore.remove();
+        if (!afterOrderId) ordersList.innerHTML = '';
 
-        if (!data.orders || data.orders.length === 0) {
+        if (!afterOrderId && (!data.orders || data.orders.length === 0)) {
             ordersList.innerHTML = '<div style="color: #999; text-align: center; padding: 40px;">Brak zamówień</div>';
             return;
         }
@@ -404,6 +416,15 @@ async function loadOrders() {
 
             ordersList.appendChild(orderCard);
         });
+
+        if (data.next_cursor) {
+            const button = document.createElement('button');
+            button.id = 'ordersLoadMore';
+            button.textContent = 'Pokaż więcej zamówień';
+            button.style.width = '100%';
+            button.onclick = () => loadOrders(data.next_cursor);
+            ordersList.appendChild(button);
+        }
     } catch (error) {
         showAlert(`Błąd: ${error.message}`, 'error');
     }
@@ -0,0 +1,164 @@
+"""Unit tests for sales analytics module."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from src import analytics
+from src.analytics import SalesAnalytics, bucket_start, hour_bucket
+from src.order import Order
+from src.product import Product
+from src.user import User
+
+
+def backends():
+    """Yield the aggregation backends available in this environment."""
+    yield pytest.param(None, id="python")
+    try:
+        import numpy
+    except ImportError:
+        return
+    yield pytest.param(numpy, id="numpy")
+
+
+class TestSalesAnalytics:
+    """Test cases for SalesAnalytics class."""
+
+    @pytest.fixture(autouse=True, params=list(backends()))
+    def backend(self, request, monkeypatch):
+        """Run every test against each aggregation backend."""
+        monkeypatch.setattr(analytics, "np", request.param)
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.analytics = SalesAnalytics()
+        self.user = User("U001", "john_doe", "john@example.com")
+        self.laptop = Product("P001", "Laptop", 999.99, 100)
+        self.mouse = Product("P002", "Mouse", 29.99, 100)
+        self.counter = 0
+
+    def order(self, moment, *items):
+        """Create an order placed at the given moment."""
+        self.counter += 1
+        order = Order(f"ORD-{self.counter:06d}", self.user, list(items))
+        order.creation_date = moment
+        return order
+
+    def test_hour_bucket_round_trip(self):
+        """Test converting moments to hour buckets and back."""
+        moment = datetime(2024, 3, 1, 14, 35)
+        assert bucket_start(hour_bucket(moment)) == datetime(2024, 3, 1, 14)
+        aware = datetime(2024, 3, 1, 14, 35, tzinfo=timezone.utc)
+        assert hour_bucket(aware) == hour_bucket(moment)
+
+    def test_empty(self):
+        """Test queries without any recorded orders."""
+        assert self.analytics.top_products() == []
+        assert self.analytics.timeseries() == []
+        assert self.analytics.totals() == (0.0, 0, 0)
+
+    def test_top_products(self):
+        """Test ranking products by revenue, units and orders."""
+        moment = datetime(2024, 3, 1, 10)
+        self.analytics.record_order(
+            self.order(moment, (self.laptop, 1), (self.mouse, 2))
+        )
+        self.analytics.record_order(self.order(moment, (self.mouse, 5)))
+
+        by_revenue = self.analytics.top_products()
+        assert [p.product_id for p in by_revenue] == ["P001", "P002"]
+        assert by_revenue[0].revenue == 999.99
+        assert by_revenue[1].revenue == 209.93
+        assert by_revenue[1].units == 7
+        assert by_revenue[1].orders == 2
+
+        by_units = self.analytics.top_products(by="units", limit=1)
+        assert [p.product_id for p in by_units] == ["P002"]
+
+    def test_timeseries_by_day_and_hour(self):
+        """Test bucketing sales by day and by hour."""
+        for moment in (
+            datetime(2024, 3, 1, 10, 5),
+            datetime(2024, 3, 1, 10, 55),
+            datetime(2024, 3, 1, 18),
+            datetime(2024, 3, 2, 9),
+        ):
+            self.analytics.record_order(self.order(moment, (self.mouse, 1)))
+
+        days = self.analytics.timeseries("day")
+        assert [bucket.start for bucket in days] == [
+            datetime(2024, 3, 1), datetime(2024, 3, 2)
+        ]
+        assert [bucket.orders for bucket in days] == [3, 1]
+
+        hours = self.analytics.timeseries(
+            "hour", start=datetime(2024, 3, 1), end=datetime(2024, 3, 2)
+        )
+        assert [(bucket.start.hour, bucket.orders) for bucket in hours] == [
+            (10, 2), (18, 1)
+        ]
+
+    def test_timeseries_for_product(self):
+        """Test filtering the timeseries by product."""
+        moment = datetime(2024, 3, 1, 10)
+        self.analytics.record_order(
+            self.order(moment, (self.laptop, 2), (self.mouse, 1))
+        )
+        buckets = self.analytics.timeseries(product_id="P001")
+        assert [(b.revenue, b.units) for b in buckets] == [(1999.98, 2)]
+        assert self.analytics.timeseries(product_id="P999") == []
+
+    def test_cancel_order_subtracts(self):
+        """Test that cancelled orders are removed from the rollups."""
+        first = self.order(datetime(2024, 3, 1, 10), (self.laptop, 1))
+        second = self.order(datetime(2024, 3, 2, 10), (self.mouse, 3))
+        self.analytics.record_order(first)
+        self.analytics.record_order(second)
+        self.analytics.cancel_order(first)
+
+        assert self.analytics.totals() == (89.97, 3, 1)
+        assert [p.product_id for p in self.analytics.top_products()] == [
+            "P002"
+        ]
+        days = self.analytics.timeseries()
+        assert [bucket.start for bucket in days] == [datetime(2024, 3, 2)]
+
+    def test_totals_for_period(self):
+        """Test totals limited to a time range."""
+        self.analytics.record_order(
+            self.order(datetime(2024, 3, 1, 10), (self.laptop, 1))
+        )
+        self.analytics.record_order(
+            self.order(datetime(2024, 3, 5, 10), (self.mouse, 1))
+        )
+        totals = self.analytics.totals(start=datetime(2024, 3, 2))
+        assert totals == (29.99, 1, 1)
+
+    def test_new_orders_use_utc_buckets(self):
+        """Test that a fresh order lands in the current UTC hour."""
+        before = hour_bucket(datetime.now(timezone.utc))
+        order = Order("ORD-000001", self.user, [(self.laptop, 1)])
+        self.analytics.record_order(order)
+        after = hour_bucket(datetime.now(timezone.utc))
+        bucket = self.analytics.timeseries("hour")[0]
+        assert hour_bucket(bucket.start) in (before, after)
+
+    def test_totals_releases_column_views(self):
+        """Test that rollup columns can grow after a totals query."""
+        self.analytics.record_order(
+            self.order(datetime(2024, 3, 1, 10), (self.laptop, 1))
+        )
+        self.analytics.totals()
+        self.analytics.record_order(
+            self.order(datetime(2024, 3, 2, 10), (self.mouse, 1))
+        )
+        assert self.analytics.totals().orders == 2
+
+    def test_invalid_arguments(self):
+        """Test validation of query arguments."""
+        with pytest.raises(ValueError):
+            self.analytics.top_products(by="profit")
+        with pytest.raises(ValueError):
+            self.analytics.top_products(limit=0)
+        with pytest.raises(ValueError):
+            self.analytics.timeseries("week")
@@ -0,0 +1,387 @@
+"""Unit tests for the ASGI API module."""
+
+import asyncio
+import json
+
+import pytest
+
+from src import asgi_api
+from src.ecommerce import ECommercePlatform
+from src.product import Product
+from src.user import User
+
+
+def call(method, path, body=None, query=b"", headers=(), chunk_size=None):
+    """Run one request through the ASGI app and collect the response."""
+    if isinstance(body, bytes):
+        payload = body
+    else:
+        payload = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": list(headers),
+    }
+    size = chunk_size or max(len(payload), 1)
+    messages = [
+        {"type": "http.request", "body": payload[start:start + size],
+         "more_body": start + size < len(payload)}
+        for start in range(0, max(len(payload), 1), size)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi_api.app(scope, receive, send))
+    start = sent[0]
+    content = b"".join(message.get("body", b"") for message in sent[1:])
+    return start["status"], dict(start["headers"]), content
+
+
+class TestAsgiApi:
+    """Test cases for the ASGI application."""
+
+    @pytest.fixture(autouse=True)
+    def platform(self, monkeypatch):
+        """Swap the module platform for an isolated one."""
+        platform = ECommercePlatform()
+        platform.register_product(Product("P001", "Laptop", 999.99, 10))
+        user = User("U001", "john_doe", "john@example.com")
+        user.set_address("Main St 1")
+        platform.register_user(user)
+        monkeypatch.setattr(asgi_api, "platform", platform)
+        self.platform = platform
+
+    def test_get_products(self):
+        """Test listing products."""
+        status, headers, content = call("GET", "/api/products")
+        assert status == 200
+        assert headers[b"content-type"] == b"application/json"
+        assert headers[b"access-control-allow-origin"] == b"*"
+        products = json.loads(content)["products"]
+        assert [p["product_id"] for p in products] == ["P001"]
+
+    def test_search_products(self):
+        """Test searching products through query arguments."""
+        status, _, content = call(
+            "GET", "/api/products", query=b"q=lap&limit=5"
+        )
+        assert status == 200
+        assert len(json.loads(content)["products"]) == 1
+
+    def test_unrelated_arguments_list_all_products(self):
+        """Test that only search arguments switch to a paged search."""
+        for number in range(2, 61):
+            self.platform.register_product(
+                Product(f"P{number:03d}", "Item", 1.0, 1)
+            )
+        status, _, content = call("GET", "/api/products", query=b"_=123")
+        assert status == 200
+        assert len(json.loads(content)["products"]) == 60
+
+    def test_get_missing_product(self):
+        """Test a 404 for an unknown product."""
+        status, _, content = call("GET", "/api/products/P999")
+        assert status == 404
+        assert "error" in json.loads(content)
+
+    def test_unknown_route_and_method(self):
+        """Test 404 for unknown paths and 405 for wrong methods."""
+        assert call("GET", "/api/nothing")[0] == 404
+        assert call("DELETE", "/api/products")[0] == 405
+
+    def test_invalid_body(self):
+        """Test that malformed payloads become 400 errors."""
+        status, _, content = call("POST", "/api/products", body={})
+        assert status == 400
+        assert "error" in json.loads(content)
+
+    def test_checkout_flow(self):
+        """Test adding to cart and placing an order."""
+        status, _, _ = call(
+            "POST", "/api/cart/U001/add",
+            body={"product_id": "P001", "quantity": 2}
+        )
+        assert status == 201
+
+        status, _, content = call(
+            "POST", "/api/orders", body={"user_id": "U001"}
+        )
+        assert status == 201
+        order = json.loads(content)["order"]
+        assert self.platform.get_product("P001").stock == 8
+
+        status, _, content = call(
+            "GET", "/api/orders", query=b"status=pending"
+        )
+        assert status == 200
+        orders = json.loads(content)["orders"]
+        assert [o["order_id"] for o in orders] == [order["order_id"]]
+
+    def test_orders_limit_must_be_positive(self):
+        """Test a 400 instead of an index error for limit below 1."""
+        self.platform.add_to_cart("U001", "P001", 1)
+        self.platform.checkout("U001")
+        for path, query in (
+            ("/api/users/U001/orders", b"limit=0"),
+            ("/api/orders", b"status=pending&limit=-1"),
+        ):
+            status, _, content = call("GET", path, query=query)
+            assert status == 400
+            assert "limit" in json.loads(content)["error"]
+
+    def test_checkout_retry_with_idempotency_key(self):
+        """Test that a retried checkout returns the original order."""
+        call(
+            "POST", "/api/cart/U001/add",
+            body={"product_id": "P001", "quantity": 2}
+        )
+        headers = [(b"idempotency-key", b"req-1")]
+        responses = [
+            call("POST", "/api/orders", body={"user_id": "U001"},
+                 headers=headers)
+            for _ in range(2)
+        ]
+        assert [status for status, _, _ in responses] == [201, 201]
+        first, second = (
+            json.loads(content)["order"] for _, _, content in responses
+        )
+        assert first["order_id"] == second["order_id"]
+        assert self.platform.get_product("P001").stock == 8
+
+    def test_metrics_endpoint(self, monkeypatch):
+        """Test that instrumented calls show up at /metrics."""
+        monkeypatch.setattr(asgi_api.metrics.registry, "enabled", True)
+        call(
+            "POST", "/api/cart/U001/add",
+            body={"product_id": "P001", "quantity": 1}
+        )
+        call("POST", "/api/orders", body={"user_id": "U001"})
+
+        status, headers, content = call("GET", "/metrics")
+        assert status == 200
+        assert headers[b"content-type"].startswith(b"text/plain")
+        text = content.decode()
+        assert (
+            'ecommerce_http_requests_total{method="POST",'
+            'route="/api/orders",status="201"}'
+        ) in text
+        assert 'function="ECommercePlatform.checkout"' in text
+
+    def test_metrics_record_unmatched_requests(self, monkeypatch):
+        """Test that 404 and 405 responses are counted as unmatched."""
+        monkeypatch.setattr(asgi_api.metrics.registry, "enabled", True)
+        call("GET", "/api/nothing")
+        call("DELETE", "/api/products")
+        call("GET", "/api/orders/xml")
+
+        text = call("GET", "/metrics")[2].decode()
+        assert 'method="GET",route="unmatched",status="404"' in text
+        assert 'method="DELETE",route="unmatched",status="405"' in text
+        assert 'route="/api/orders/xml",status="200"' in text
+
+    def test_cart_batch(self):
+        """Test applying several cart operations in one request."""
+        status, _, content = call(
+            "POST", "/api/cart/U001/batch", body={"operations": [
+                {"action": "add", "product_id": "P001", "quantity": 3},
+                {"action": "update", "product_id": "P001", "quantity": 2},
+            ]}
+        )
+        assert status == 200
+        assert json.loads(content)["applied"] is True
+        cart = self.platform.get_cart("U001")
+        assert cart.get_items()[0][1] == 2
+
+    def test_cart_batch_rejected(self):
+        """Test a 409 when an atomic batch cannot be applied."""
+        status, _, content = call(
+            "POST", "/api/cart/U001/batch", body={"operations": [
+                {"action": "add", "product_id": "P001", "quantity": 1},
+                {"action": "add", "product_id": "P001", "quantity": 50},
+            ]}
+        )
+        assert status == 409
+        report = json.loads(content)
+        assert report["applied"] is False
+        assert report["failed"] == 2
+        assert self.platform.get_cart("U001").is_empty()
+
+    def test_analytics_endpoints(self):
+        """Test the sales analytics endpoints."""
+        self.platform.add_to_cart("U001", "P001", 2)
+        order = self.platform.checkout("U001")
+        day = order.creation_date.date().isoformat()
+
+        status, _, content = call("GET", "/api/analytics/products")
+        assert status == 200
+        products = json.loads(content)["products"]
+        assert products[0]["product_id"] == "P001"
+        assert products[0]["units"] == 2
+
+        status, _, content = call(
+            "GET", "/api/analytics/timeseries",
+            query=f"granularity=day&start={day}".encode()
+        )
+        assert status == 200
+        buckets = json.loads(content)["buckets"]
+        assert buckets[0]["start"].startswith(day)
+        assert buckets[0]["revenue"] == 1999.98
+
+        status, _, content = call("GET", "/api/analytics/summary")
+        assert json.loads(content) == {
+            "revenue": 1999.98, "units": 2, "orders": 1
+        }
+
+    def test_analytics_invalid_period(self):
+        """Test a 400 for malformed dates and granularities."""
+        assert call(
+            "GET", "/api/analytics/summary", query=b"start=yesterday"
+        )[0] == 400
+        assert call(
+            "GET", "/api/analytics/timeseries", query=b"granularity=week"
+        )[0] == 400
+
+    def test_illegal_status_transition(self):
+        """Test a 409 for an illegal status change."""
+        self.platform.add_to_cart("U001", "P001", 1)
+        order = self.platform.checkout("U001")
+        path = f"/api/orders/{order.order_id}/status"
+        assert call("PUT", path, body={"status": "delivered"})[0] == 409
+        assert call("PUT", path, body={"status": "shipped"})[0] == 200
+
+    def test_order_xml_conditional_get(self):
+        """Test ETag revalidation of a single order export."""
+        self.platform.add_to_cart("U001", "P001", 1)
+        order = self.platform.checkout("U001")
+        path = f"/api/orders/{order.order_id}/xml"
+
+        status, headers, content = call("GET", path)
+        assert status == 200
+        assert content.startswith(b"<?xml")
+        etag = headers[b"etag"]
+
+        status, headers, content = call(
+            "GET", path, headers=[(b"if-none-match", etag)]
+        )
+        assert status == 304
+        assert content == b""
+        assert b"content-type" not in headers
+
+    def test_order_xml_if_none_match_list(self):
+        """Test If-None-Match with a list, weak tags and a wildcard."""
+        self.platform.add_to_cart("U001", "P001", 1)
+        order = self.platform.checkout("U001")
+        path = f"/api/orders/{order.order_id}/xml"
+        etag = call("GET", path)[1][b"etag"]
+
+        def revalidate(value):
+            return call("GET", path, headers=[(b"if-none-match", value)])[0]
+
+        assert revalidate(b'"other", ' + etag) == 304
+        assert revalidate(b'"other", W/' + etag) == 304
+        assert revalidate(b"*") == 304
+        assert revalidate(b'"other", W/"stale"') == 200
+
+    def test_stream_all_orders_xml(self):
+        """Test streaming the bulk XML export in chunks."""
+        for _ in range(3):
+            self.platform.add_to_cart("U001", "P001", 1)
+            self.platform.checkout("U001")
+
+        status, headers, content = call("GET", "/api/orders/xml")
+        assert status == 200
+        assert headers[b"content-type"] == b"application/xml"
+        assert content.count(b"<order id=") == 3
+
+    def test_import_products_ndjson(self):
+        """Test bulk importing products from NDJSON."""
+        body = (
+            b'{"product_id": "P100", "name": "Desk", "price": 10, '
+            b'"stock": 1}\n{"product_id": "P101"}\n'
+        )
+        status, _, content = call(
+            "POST", "/api/products/import", body=body,
+            headers=[(b"content-type", b"application/x-ndjson")]
+        )
+        assert status == 200
+        report = json.loads(content)
+        assert report["imported"] == 1
+        assert report["failed"] == 1
+
+    def test_import_products_streams_body(self):
+        """Test importing an upload delivered in many small chunks."""
+        body = b"".join(
+            b'{"product_id": "P%03d", "name": "Item", "price": 1, '
+            b'"stock": 1}\n' % number
+            for number in range(100, 150)
+        )
+        status, _, content = call(
+            "POST", "/api/products/import", body=body, chunk_size=7,
+            query=b"batch_size=8",
+            headers=[(b"content-type", b"application/x-ndjson")]
+        )
+        assert status == 200
+        assert json.loads(content)["imported"] == 50
+        assert self.platform.get_product("P149") is not None
+
+    def test_json_body_in_chunks(self):
+        """Test that a request body split into chunks is reassembled."""
+        status, _, _ = call(
+            "POST", "/api/cart/U001/add", chunk_size=3,
+            body={"product_id": "P001", "quantity": 2}
+        )
+        assert status == 201
+        assert self.platform.get_cart("U001").get_quantity("P001") == 2
+
+    def test_import_products_reports_invalid_utf8(self):
+        """Test that undecodable lines are reported and skipped."""
+        body = (
+            b'{"product_id": "P100", "name": "Desk", "price": 10, '
+            b'"stock": 1}\n{"name": "\xff"}\n'
+            b'{"product_id": "P101", "name": "Lamp", "price": 5, '
+            b'"stock": 2}\n'
+        )
+        status, _, content = call(
+            "POST", "/api/products/import", body=body,
+            query=b"batch_size=1",
+            headers=[(b"content-type", b"application/x-ndjson")]
+        )
+        assert status == 200
+        report = json.loads(content)
+        assert report["imported"] == 2
+        assert report["errors"][0]["row"] == 2
+
+    def test_concurrent_requests(self):
+        """Test that many requests can be served on one event loop."""
+        self.platform.add_to_cart("U001", "P001", 1)
+        order = self.platform.checkout("U001")
+
+        async def fetch(path):
+            sent = []
+
+            async def receive():
+                return {"type": "http.request", "body": b""}
+
+            async def send(message):
+                sent.append(message)
+
+            await asgi_api.app({
+                "type": "http", "method": "GET", "path": path,
+                "query_string": b"", "headers": [],
+            }, receive, send)
+            return sent[0]["status"]
+
+        async def run():
+            return await asyncio.gather(*(
+                fetch(f"/api/orders/{order.order_id}/xml")
+                for _ in range(20)
+            ))
+
+        assert asyncio.run(run()) == [200] * 20
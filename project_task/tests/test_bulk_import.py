@@ -0,0 +1,118 @@
+"""Unit tests for bulk import module."""
+
+import io
+
+import pytest
+
+from src.bulk_import import (
+    ImportReport, InvalidRecord, batched, iter_csv, iter_ndjson,
+    product_from_record, read_records, user_from_record
+)
+
+class TestBulkImport:
+    """Test cases for bulk import helpers."""
+
+    def test_product_from_json_line(self):
+        """Test parsing a product from NDJSON text."""
+        product = product_from_record(
+            '{"product_id": "P001", "name": "Laptop", '
+            '"price": 999.99, "stock": 10}'
+        )
+        assert product.product_id == "P001"
+        assert product.price == 999.99
+
+    def test_product_from_csv_row(self):
+        """Test parsing a product from CSV string values."""
+        rows = list(iter_csv(io.StringIO(
+            "product_id,name,price,stock\nP001,Laptop,999.99,10\n"
+        )))
+        product = product_from_record(rows[0])
+        assert product.stock == 10
+
+    def test_product_missing_field(self):
+        """Test that missing fields raise ValueError."""
+        with pytest.raises(ValueError):
+            product_from_record({"product_id": "P001", "name": "Laptop"})
+        with pytest.raises(ValueError):
+            product_from_record(
+                {"product_id": " ", "name": "X", "price": 1, "stock": 1}
+            )
+
+    def test_product_invalid_row(self):
+        """Test that malformed rows raise ValueError."""
+        with pytest.raises(ValueError):
+            product_from_record("not json")
+        with pytest.raises(ValueError):
+            product_from_record("[1, 2]")
+
+    def test_product_rejects_fractional_stock(self):
+        """Test that non-integral stock is not truncated."""
+        record = {"product_id": "P001", "name": "X", "price": 1}
+        with pytest.raises(ValueError):
+            product_from_record({**record, "stock": 2.5})
+        with pytest.raises(ValueError):
+            product_from_record({**record, "stock": "2.5"})
+        assert product_from_record({**record, "stock": 2.0}).stock == 2
+
+    def test_product_rejects_non_finite_price(self):
+        """Test that NaN and infinite prices are rejected."""
+        record = {"product_id": "P001", "name": "X", "stock": 1}
+        for price in ("nan", "inf", "-Infinity", float("nan")):
+            with pytest.raises(ValueError):
+                product_from_record({**record, "price": price})
+        with pytest.raises(ValueError):
+            product_from_record(
+                '{"product_id": "P001", "name": "X", "price": NaN, '
+                '"stock": 1}'
+            )
+
+    def test_iter_csv_reports_invalid_utf8(self):
+        """Test that undecodable CSV rows become per-row errors."""
+        rows = list(iter_csv(io.BytesIO(
+            b"product_id,name,price,stock\n"
+            b"P001,\xff,1,1\nP002,Mouse,1,1\n"
+        )))
+        assert isinstance(rows[0], InvalidRecord)
+        assert product_from_record(rows[1]).product_id == "P002"
+        with pytest.raises(ValueError):
+            product_from_record(rows[0])
+
+    def test_read_records_stops_on_unreadable_input(self):
+        """Test that a failing stream ends with an invalid record."""
+        def records():
+            yield "first"
+            raise ValueError("broken")
+
+        result = list(read_records(records()))
+        assert result[0] == "first"
+        assert result[1] == InvalidRecord("Unreadable input: broken")
+
+    def test_user_from_record(self):
+        """Test parsing a user with optional address."""
+        user = user_from_record({
+            "user_id": "U001", "username": "john_doe",
+            "email": "john@example.com", "address": "123 Main St",
+        })
+        assert user.address == "123 Main St"
+        with pytest.raises(ValueError):
+            user_from_record(
+                {"user_id": "U002", "username": "x", "email": "invalid"}
+            )
+
+    def test_iter_ndjson_skips_blank_lines(self):
+        """Test that blank lines are ignored."""
+        lines = list(iter_ndjson(io.StringIO('{"a": 1}\n\n  \n{"b": 2}\n')))
+        assert lines == ['{"a": 1}', '{"b": 2}']
+
+    def test_batched(self):
+        """Test splitting records into batches."""
+        assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+    def test_report_limits_errors(self, monkeypatch):
+        """Test that reported errors are capped but counted."""
+        monkeypatch.setattr("src.bulk_import.MAX_REPORTED_ERRORS", 2)
+        report = ImportReport()
+        for row in range(5):
+            report.add_error(row, "bad")
+        assert report.failed == 5
+        assert len(report.to_dict()["errors"]) == 2
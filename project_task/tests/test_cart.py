@@ -2,7 +2,7 @@
 
 import pytest
 
-from src.cart import Cart
+from src.cart import Cart, CartOperation
 from src.product import Product
 
 class TestCart:
@@ -97,3 +97,155 @@ class TestCart:
         repr_str = repr(self.cart)
         assert "U001" in repr_str
         assert "items=1" in repr_str
+
+    def test_total_price_tracks_updates(self):
+        """Test that running total follows every cart mutation."""
+        self.cart.add_item(self.product1, 2)
+        self.cart.add_item(self.product2, 3)
+        self.cart.add_item(self.product2, 1)
+        assert self.cart.get_total_minor_units() == 99999 * 2 + 2999 * 4
+
+        self.cart.update_quantity("P001", 1)
+        assert self.cart.get_total_minor_units() == 99999 + 2999 * 4
+
+        self.cart.remove_item("P002")
+        assert self.cart.get_total_minor_units() == 99999
+
+        self.cart.update_quantity("P001", 0)
+        assert self.cart.get_total_minor_units() == 0
+
+        self.cart.add_item(self.product2, 1)
+        self.cart.clear()
+        assert self.cart.get_total_price() == 0
+
+    def test_total_price_has_no_float_drift(self):
+        """Test that summing many small prices stays exact."""
+        product = Product("P003", "Sticker", 0.1, 1000)
+        for _ in range(10):
+            self.cart.add_item(product, 1)
+        assert self.cart.get_total_price() == 1.0
+
+    def test_failed_add_does_not_change_total(self):
+        """Test that rejected additions leave the total untouched."""
+        self.cart.add_item(self.product1, 9)
+        assert self.cart.add_item(self.product1, 5) is False
+        assert self.cart.get_total_minor_units() == 99999 * 9
+
+    def test_cart_has_no_instance_dict(self):
+        """Test that cart uses slots."""
+        assert not hasattr(self.cart, "__dict__")
+
+    def test_apply_batch_atomic(self):
+        """Test applying a batch of add, update and remove operations."""
+        self.cart.add_item(self.product2, 1)
+        products = {"P001": self.product1, "P002": self.product2}
+        result = self.cart.apply_batch([
+            CartOperation("add", "P001", 2),
+            CartOperation("add", "P001", 1),
+            CartOperation("update", "P002", 5),
+            CartOperation("remove", "P002"),
+            CartOperation("add", "P002", 4),
+        ], products)
+        assert result.applied is True
+        assert result.failed == 0
+        quantities = {p.product_id: q for p, q in self.cart.get_items()}
+        assert quantities == {"P001": 3, "P002": 4}
+        assert self.cart.get_total_minor_units() == 99999 * 3 + 2999 * 4
+
+    def test_apply_batch_checks_final_stock(self):
+        """Test that stock is checked against the batch's net quantity."""
+        products = {"P001": self.product1}
+        result = self.cart.apply_batch([
+            CartOperation("add", "P001", 8),
+            CartOperation("add", "P001", 8),
+            CartOperation("update", "P001", 10),
+        ], products)
+        assert result.applied is True
+        assert self.cart.get_items()[0][1] == 10
+
+    def test_apply_batch_atomic_failure_changes_nothing(self):
+        """Test that one failing operation rejects an atomic batch."""
+        self.cart.add_item(self.product1, 1)
+        products = {"P001": self.product1, "P002": self.product2}
+        result = self.cart.apply_batch([
+            CartOperation("add", "P002", 5),
+            CartOperation("add", "P001", 20),
+            CartOperation("remove", "P999"),
+        ], products)
+        assert result.applied is False
+        assert [r.ok for r in result.results] == [True, False, False]
+        assert result.results[1].error == "Insufficient stock"
+        assert result.results[2].error == "Product not in cart"
+        assert [q for _, q in self.cart.get_items()] == [1]
+        assert self.cart.get_total_minor_units() == 99999
+
+    def test_apply_batch_partial(self):
+        """Test that a non-atomic batch applies the valid products."""
+        products = {"P001": self.product1, "P002": self.product2}
+        result = self.cart.apply_batch([
+            CartOperation("add", "P002", 5),
+            CartOperation("add", "P001", 20),
+            CartOperation("explode", "P001"),
+        ], products, atomic=False)
+        assert result.applied is True
+        assert result.failed == 2
+        assert result.results[2].error == "Unknown action: explode"
+        quantities = {p.product_id: q for p, q in self.cart.get_items()}
+        assert quantities == {"P002": 5}
+
+    def test_apply_batch_partial_skips_whole_product(self):
+        """Test that a failed operation drops all changes to its product."""
+        self.cart.add_item(self.product1, 1)
+        products = {"P001": self.product1, "P002": self.product2}
+        result = self.cart.apply_batch([
+            CartOperation("add", "P001", 2),
+            CartOperation("update", "P001", -1),
+            CartOperation("add", "P002", 1),
+        ], products, atomic=False)
+        assert result.applied is True
+        assert [r.ok for r in result.results] == [False, False, True]
+        assert result.results[0].error == "Another operation on product failed"
+        quantities = {p.product_id: q for p, q in self.cart.get_items()}
+        assert quantities == {"P001": 1, "P002": 1}
+
+    def test_apply_batch_validates_quantities(self):
+        """Test per-operation quantity validation."""
+        self.cart.add_item(self.product1, 1)
+        result = self.cart.apply_batch([
+            CartOperation("add", "P001", 0),
+            CartOperation("update", "P001", -1),
+            CartOperation("add", "P404", 1),
+        ], {"P001": self.product1}, atomic=False)
+        assert [r.error for r in result.results] == [
+            "Quantity must be positive",
+            "Quantity cannot be negative",
+            "Unknown product",
+        ]
+        assert result.applied is False
+
+    def test_apply_empty_batch(self):
+        """Test that an empty batch is rejected."""
+        with pytest.raises(ValueError):
+            self.cart.apply_batch([], {})
+
+    def test_operation_from_dict(self):
+        """Test building an operation from a request payload."""
+        operation = CartOperation.from_dict(
+            {"action": "add", "product_id": "P001", "quantity": "3"}
+        )
+        assert operation == CartOperation("add", "P001", 3)
+        assert CartOperation.from_dict(
+            {"action": "remove", "product_id": "P001"}
+        ).quantity == 0
+
+    def test_set_quantity(self):
+        """Test setting a line quantity directly."""
+        self.cart.add_item(self.product1, 2)
+        self.cart.set_quantity(self.product1, 5)
+        self.cart.set_quantity(self.product2, 1)
+        assert self.cart.get_quantity("P001") == 5
+        assert self.cart.get_total_minor_units() == 99999 * 5 + 2999
+        self.cart.set_quantity(self.product1, 0)
+        assert self.cart.get_quantity("P001") == 0
+        with pytest.raises(ValueError):
+            self.cart.set_quantity(self.product2, -1)
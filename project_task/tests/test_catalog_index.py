@@ -0,0 +1,100 @@
+"""Unit tests for catalog index module."""
+
+import pytest
+
+from src.catalog_index import CatalogIndex, tokenize
+from src.product import Product
+
+class TestCatalogIndex:
+    """Test cases for CatalogIndex class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.index = CatalogIndex()
+        for product in [
+            Product("P001", "Gaming Laptop", 999.99, 10),
+            Product("P002", "Wireless Mouse", 29.99, 0),
+            Product("P003", "Mechanical Keyboard", 99.99, 30),
+            Product("P004", "Laptop Stand", 49.99, 15),
+            Product("P005", "Mouse Pad", 9.99, 100),
+        ]:
+            self.index.add(product)
+
+    def ids(self, products):
+        """Return product ids of search results."""
+        return [product.product_id for product in products]
+
+    def test_tokenize(self):
+        """Test splitting names into lowercase tokens."""
+        assert tokenize("Gaming Laptop-15\"") == ["gaming", "laptop", "15"]
+
+    def test_default_sort_by_name(self):
+        """Test that results are sorted by name by default."""
+        assert self.ids(self.index.search()) == [
+            "P001", "P004", "P003", "P005", "P002"
+        ]
+
+    def test_prefix_query(self):
+        """Test token prefix search."""
+        assert self.ids(self.index.search(query="lap")) == ["P001", "P004"]
+        assert self.ids(self.index.search(query="lap sta")) == ["P004"]
+        assert self.index.search(query="zzz") == []
+
+    def test_substring_query(self):
+        """Test substring search inside names."""
+        assert self.ids(self.index.search(contains="ous")) == [
+            "P005", "P002"
+        ]
+        assert self.ids(self.index.search(contains="top st")) == ["P004"]
+
+    def test_price_range_and_sort(self):
+        """Test price range filtering and price ordering."""
+        products = self.index.search(
+            min_price=10, max_price=100, sort="price"
+        )
+        assert self.ids(products) == ["P002", "P004", "P003"]
+        products = self.index.search(max_price=50, sort="-price")
+        assert self.ids(products) == ["P004", "P002", "P005"]
+
+    def test_in_stock_only(self):
+        """Test that out-of-stock products can be skipped."""
+        products = self.index.search(query="mouse", in_stock=True)
+        assert self.ids(products) == ["P005"]
+
+    def test_limit_and_offset(self):
+        """Test result paging."""
+        assert self.ids(self.index.search(sort="price", limit=2)) == [
+            "P005", "P002"
+        ]
+        assert self.ids(
+            self.index.search(sort="price", limit=2, offset=2)
+        ) == ["P004", "P003"]
+
+    def test_added_products_are_searchable(self):
+        """Test that index follows products added after a query."""
+        self.index.search()
+        self.index.add(Product("P006", "Laptop Bag", 39.99, 5))
+        assert self.ids(self.index.search(query="laptop", sort="price")) == [
+            "P006", "P004", "P001"
+        ]
+
+    def test_bulk_added_products_are_searchable(self):
+        """Test that large batches of additions are indexed."""
+        for index in range(1000):
+            self.index.add(Product(f"B{index:04d}", f"Bulk {index}", 1, 1))
+        assert len(self.index) == 1005
+        assert self.ids(self.index.search(query="bulk", limit=2)) == [
+            "B0000", "B0001"
+        ]
+        assert self.ids(self.index.search(sort="-price", limit=1)) == [
+            "P001"
+        ]
+
+    def test_invalid_arguments(self):
+        """Test that invalid paging or sort raises ValueError."""
+        with pytest.raises(ValueError):
+            self.index.search(sort="stock")
+        with pytest.raises(ValueError):
+            self.index.search(limit=0)
+        with pytest.raises(ValueError):
+            self.index.search(offset=-1)
@@ -1,9 +1,12 @@
 """Unit tests for E-Commerce Platform module."""
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
-from src.ecommerce import ECommercePlatform
-from src.order import OrderStatus
+from src.cart import CartOperation
+from src.ecommerce import ECommercePlatform, OrderStatus
 from src.product import Product
 from src.user import User
 
@@ -92,6 +95,35 @@ class TestECommercePlatform:
         self.platform.add_to_cart("U001", "P001", 2)
         assert self.platform.remove_from_cart("U001", "P001") is True
 
+    def test_restock(self):
+        """Test increasing product stock."""
+        self.platform.register_product(self.product1)
+        assert self.platform.restock("P001", 5) is True
+        assert self.platform.get_product("P001").stock == 15
+        assert self.platform.restock("P999", 5) is False
+        with pytest.raises(ValueError):
+            self.platform.restock("P001", -1)
+
+    def test_apply_cart_batch(self):
+        """Test applying a batch of cart operations."""
+        self.platform.register_product(self.product1)
+        self.platform.register_product(self.product2)
+        self.platform.register_user(self.user)
+        result = self.platform.apply_cart_batch("U001", [
+            CartOperation("add", "P001", 2),
+            CartOperation("add", "P002", 3),
+            CartOperation("add", "P999", 1),
+        ], atomic=False)
+        assert result.failed == 1
+        cart = self.platform.get_cart("U001")
+        assert len(cart.get_items()) == 2
+
+    def test_apply_cart_batch_invalid_user(self):
+        """Test batch operations for non-existent user."""
+        assert self.platform.apply_cart_batch(
+            "U999", [CartOperation("add", "P001", 1)]
+        ) is None
+
     def test_checkout_successful(self):
         """Test successful checkout."""
         self.platform.register_product(self.product1)
@@ -104,7 +136,7 @@ class TestECommercePlatform:
         assert order is not None
         assert order.order_id == "ORD-000001"
         assert len(order.items) == 1
-        assert order.items[0][1] == 2  # quantity is 2
+        assert order.items[0].quantity == 2
 
     def test_checkout_without_address(self):
         """Test checkout fails without address."""
@@ -175,6 +207,31 @@ class TestECommercePlatform:
         ) is True
         assert order.status == OrderStatus.SHIPPED
 
+    def test_sales_analytics_follow_orders(self):
+        """Test that checkout and cancellation update sales rollups."""
+        self.platform.register_product(self.product1)
+        self.platform.register_product(self.product2)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+
+        self.platform.add_to_cart("U001", "P001", 1)
+        first = self.platform.checkout("U001")
+        self.platform.add_to_cart("U001", "P002", 2)
+        self.platform.checkout("U001")
+
+        totals = self.platform.get_sales_totals()
+        assert totals.orders == 2
+        assert totals.revenue == 1059.97
+        top = self.platform.get_top_products()
+        assert [sales.product_id for sales in top] == ["P001", "P002"]
+
+        self.platform.update_order_status(
+            first.order_id, OrderStatus.CANCELLED
+        )
+        assert self.platform.get_sales_totals().revenue == 59.98
+        days = self.platform.get_sales_timeseries("day")
+        assert [bucket.orders for bucket in days] == [1]
+
     def test_get_user_orders(self):
         """Test getting all orders for a user."""
         self.platform.register_product(self.product1)
@@ -190,3 +247,431 @@ class TestECommercePlatform:
 
         orders = self.platform.get_user_orders("U001")
         assert len(orders) == 2
+
+    def test_get_user_orders_only_returns_own_orders(self):
+        """Test that user order index is kept per user."""
+        other = User("U002", "anna", "anna@example.com")
+        other.set_address("456 Side St")
+        self.user.set_address("123 Main St")
+        self.platform.register_product(self.product1)
+        self.platform.register_user(self.user)
+        self.platform.register_user(other)
+
+        self.platform.add_to_cart("U001", "P001", 1)
+        first = self.platform.checkout("U001")
+        self.platform.add_to_cart("U002", "P001", 1)
+        self.platform.checkout("U002")
+        self.platform.add_to_cart("U001", "P001", 1)
+        second = self.platform.checkout("U001")
+
+        orders = self.platform.get_user_orders("U001")
+        assert orders == [first, second]
+        assert self.platform.get_user_orders("U999") == []
+
+    def test_get_user_orders_pagination(self):
+        """Test cursor based pagination of user orders."""
+        self.platform.register_product(self.product2)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+
+        for _ in range(5):
+            self.platform.add_to_cart("U001", "P002", 1)
+            self.platform.checkout("U001")
+
+        page = self.platform.get_user_orders("U001", limit=2)
+        assert [o.order_id for o in page] == ["ORD-000001", "ORD-000002"]
+
+        page = self.platform.get_user_orders(
+            "U001", limit=2, after_order_id=page[-1].order_id
+        )
+        assert [o.order_id for o in page] == ["ORD-000003", "ORD-000004"]
+
+        page = self.platform.get_user_orders(
+            "U001", limit=2, after_order_id="ORD-000004"
+        )
+        assert [o.order_id for o in page] == ["ORD-000005"]
+
+    def test_get_user_orders_invalid_cursor(self):
+        """Test that unknown cursor raises ValueError."""
+        self.platform.register_user(self.user)
+        with pytest.raises(ValueError):
+            self.platform.get_user_orders("U001", after_order_id="ORD-999999")
+        with pytest.raises(ValueError):
+            self.platform.get_user_orders("U001", limit=0)
+
+    def test_checkout_insufficient_stock_is_all_or_nothing(self):
+        """Test that failed checkout leaves stock and cart untouched."""
+        self.platform.register_product(self.product1)
+        self.platform.register_product(self.product2)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+
+        self.platform.add_to_cart("U001", "P001", 5)
+        self.platform.add_to_cart("U001", "P002", 10)
+        self.product2.decrease_stock(45)
+
+        assert self.platform.checkout("U001") is None
+        assert self.product1.stock == 10
+        assert self.product2.stock == 5
+        assert len(self.platform.get_cart("U001").get_items()) == 2
+
+    def test_concurrent_checkout_does_not_oversell(self):
+        """Test that concurrent checkouts never sell more than stock."""
+        now = [0.0]
+        self.platform = ECommercePlatform(
+            reservation_ttl=60, clock=lambda: now[0]
+        )
+        hot_product = Product("P100", "Console", 499.99, 25)
+        self.platform.register_product(hot_product)
+        self.platform.register_product(self.product2)
+
+        user_ids = [f"U{i:03d}" for i in range(100)]
+        for user_id in user_ids:
+            user = User(user_id, user_id, f"{user_id}@example.com")
+            user.set_address("123 Main St")
+            self.platform.register_user(user)
+            self.platform.add_to_cart(user_id, "P002", 1)
+            self.platform.add_to_cart(user_id, "P100", 1)
+            now[0] += 60
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            orders = list(executor.map(self.platform.checkout, user_ids))
+
+        placed = [order for order in orders if order is not None]
+        assert len(placed) == 25
+        assert hot_product.stock == 0
+        assert self.product2.stock == 25
+        assert len({order.order_id for order in placed}) == 25
+
+    def test_cart_reserves_stock(self):
+        """Test that items in a cart are held back from other carts."""
+        self.platform.register_product(self.product1)
+        self.platform.register_user(self.user)
+        self.platform.register_user(User("U002", "anna", "anna@example.com"))
+
+        assert self.platform.add_to_cart("U001", "P001", 8) is True
+        assert self.product1.reserved == 8
+        assert self.product1.available == 2
+        assert self.platform.add_to_cart("U002", "P001", 3) is False
+        assert self.platform.get_cart("U002").is_empty()
+        assert self.platform.add_to_cart("U002", "P001", 2) is True
+
+        self.platform.remove_from_cart("U001", "P001")
+        assert self.product1.reserved == 2
+        assert self.platform.add_to_cart("U002", "P001", 8) is True
+        assert self.product1.available == 0
+
+    def test_expired_reservation_is_released(self):
+        """Test that holds lapse after the TTL without clearing the cart."""
+        now = [0.0]
+        platform = ECommercePlatform(reservation_ttl=60, clock=lambda: now[0])
+        platform.register_product(self.product1)
+        platform.register_user(self.user)
+        platform.register_user(User("U002", "anna", "anna@example.com"))
+        self.user.set_address("123 Main St")
+
+        platform.add_to_cart("U001", "P001", 10)
+        assert platform.add_to_cart("U002", "P001", 1) is False
+
+        now[0] = 60
+        assert platform.get_product("P001").available == 0
+        assert platform.release_expired_reservations() == 1
+        assert platform.get_product("P001").available == 10
+        assert platform.get_cart("U001").get_quantity("P001") == 10
+        assert platform.add_to_cart("U002", "P001", 4) is True
+        assert platform.checkout("U001") is None
+
+        platform.remove_from_cart("U002", "P001")
+        order = platform.checkout("U001")
+        assert order is not None
+        assert self.product1.stock == 0
+        assert self.product1.reserved == 0
+
+    def test_search_in_stock_skips_reserved_products(self):
+        """Test that fully reserved products are not listed as in stock."""
+        self.platform.register_product(self.product1)
+        self.platform.register_user(self.user)
+        self.platform.add_to_cart("U001", "P001", 10)
+        assert self.platform.search_products(in_stock=True) == []
+        self.platform.remove_from_cart("U001", "P001")
+        assert self.platform.search_products(in_stock=True) == [self.product1]
+
+    def test_reservation_sweeper_releases_holds(self):
+        """Test that the background sweeper releases expired holds."""
+        now = [0.0]
+        platform = ECommercePlatform(
+            reservation_ttl=60, reservation_sweep_interval=0.01,
+            clock=lambda: now[0],
+        )
+        platform.register_product(self.product1)
+        platform.register_user(self.user)
+        platform.add_to_cart("U001", "P001", 10)
+        now[0] = 60
+        deadline = time.monotonic() + 5
+        while self.product1.reserved and time.monotonic() < deadline:
+            time.sleep(0.01)
+        platform.close()
+        assert self.product1.available == 10
+
+    def test_checkout_consumes_reservation(self):
+        """Test that checkout turns the hold into a stock decrease."""
+        self.platform.register_product(self.product1)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+
+        self.platform.add_to_cart("U001", "P001", 3)
+        assert self.platform.checkout("U001") is not None
+        assert self.product1.stock == 7
+        assert self.product1.reserved == 0
+        assert self.product1.available == 7
+
+    def test_cart_batch_respects_reservations(self):
+        """Test that batches cannot claim units held by other carts."""
+        self.platform.register_product(self.product1)
+        self.platform.register_product(self.product2)
+        self.platform.register_user(self.user)
+        self.platform.register_user(User("U002", "anna", "anna@example.com"))
+        self.platform.add_to_cart("U002", "P001", 9)
+
+        result = self.platform.apply_cart_batch("U001", [
+            CartOperation("add", "P001", 2),
+            CartOperation("add", "P002", 1),
+        ])
+        assert result.applied is False
+        assert result.results[0].error == "Insufficient stock"
+        assert self.product2.reserved == 0
+
+        result = self.platform.apply_cart_batch("U002", [
+            CartOperation("update", "P001", 10),
+            CartOperation("add", "P002", 5),
+        ])
+        assert result.applied is True
+        assert self.product1.reserved == 10
+        assert self.product2.reserved == 5
+
+    def test_checkout_with_idempotency_key(self):
+        """Test that retrying a checkout returns the first order."""
+        self.platform.register_product(self.product1)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+        self.platform.add_to_cart("U001", "P001", 2)
+
+        order = self.platform.checkout("U001", "key-1")
+        assert order is not None
+        self.platform.add_to_cart("U001", "P001", 1)
+        assert self.platform.checkout("U001", "key-1") is order
+        assert self.product1.stock == 8
+        assert len(self.platform.get_all_orders()) == 1
+        assert self.platform.checkout("U001", "key-2").order_id != (
+            order.order_id
+        )
+
+    def test_failed_checkout_does_not_claim_key(self):
+        """Test that a key can be retried after a failed checkout."""
+        self.platform.register_product(self.product1)
+        self.platform.register_user(self.user)
+        self.platform.add_to_cart("U001", "P001", 1)
+
+        assert self.platform.checkout("U001", "key-1") is None
+        self.user.set_address("123 Main St")
+        assert self.platform.checkout("U001", "key-1") is not None
+
+    def test_concurrent_checkouts_with_same_key(self):
+        """Test that concurrent retries place exactly one order."""
+        self.platform.register_product(self.product1)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+        self.platform.add_to_cart("U001", "P001", 1)
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            orders = list(executor.map(
+                lambda _: self.platform.checkout("U001", "key-1"), range(64)
+            ))
+
+        assert all(order is orders[0] for order in orders)
+        assert orders[0] is not None
+        assert self.product1.stock == 9
+        assert len(self.platform.get_all_orders()) == 1
+
+    def test_export_orders_xml(self, tmp_path):
+        """Test exporting all platform orders into one file."""
+        self.platform.register_product(self.product1)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+        for _ in range(3):
+            self.platform.add_to_cart("U001", "P001", 1)
+            self.platform.checkout("U001")
+
+        file_path = tmp_path / "orders.xml"
+        assert self.platform.export_orders_xml(str(file_path)) == 3
+        assert file_path.read_text(encoding="utf-8").count("<order ") == 3
+
+    def test_get_order_xml_is_cached_per_version(self):
+        """Test that XML export is reused until the order changes."""
+        self.platform.register_product(self.product1)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+        self.platform.add_to_cart("U001", "P001", 1)
+        order = self.platform.checkout("U001")
+
+        etag, data = self.platform.get_order_xml(order.order_id)
+        assert self.platform.get_order_xml(order.order_id)[1] is data
+
+        self.platform.update_order_status(
+            order.order_id, OrderStatus.CONFIRMED
+        )
+        new_etag, new_data = self.platform.get_order_xml(order.order_id)
+        assert new_etag != etag
+        assert b"confirmed" in new_data
+        assert self.platform.get_order_xml("ORD-999999") is None
+
+    def test_get_order_xml_tracks_user_changes(self, tmp_path):
+        """Test that a new address invalidates the cached export."""
+        platform = ECommercePlatform(export_dir=tmp_path)
+        platform.register_product(self.product1)
+        platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+        platform.add_to_cart("U001", "P001", 1)
+        order = platform.checkout("U001")
+
+        etag, _ = platform.get_order_xml(order.order_id)
+        platform.set_user_address("U001", "9 New Road")
+        new_etag, data = platform.get_order_xml(order.order_id)
+        assert new_etag != etag
+        assert b"9 New Road" in data
+        assert [path.name for path in tmp_path.iterdir()] == [
+            f"{order.order_id}.export"
+        ]
+
+    def test_order_does_not_reference_catalog(self):
+        """Test that placed orders hold snapshots, not live products."""
+        self.platform.register_product(self.product1)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+        self.platform.add_to_cart("U001", "P001", 2)
+        order = self.platform.checkout("U001")
+
+        self.product1.price = 10.0
+        assert order.total_price == 1999.98
+        assert all(
+            not isinstance(line, Product) and not isinstance(value, Product)
+            for line in order.items
+            for value in line
+        )
+
+    def test_set_user_address(self):
+        """Test updating user address through the platform."""
+        self.platform.register_user(self.user)
+        assert self.platform.set_user_address("U001", "1 New St") is True
+        assert self.user.address == "1 New St"
+        assert self.platform.set_user_address("U999", "1 New St") is False
+
+    def test_register_products_bulk(self):
+        """Test bulk product import with per-row errors."""
+        self.platform.register_product(self.product1)
+        records = [
+            {"product_id": "P010", "name": "Cable", "price": 5, "stock": 1},
+            {"product_id": "P001", "name": "Dup", "price": 5, "stock": 1},
+            {"product_id": "P011", "name": "Bad", "price": -5, "stock": 1},
+            {"product_id": "P010", "name": "Dup", "price": 5, "stock": 1},
+            '{"product_id": "P012", "name": "Hub", "price": 9, "stock": 2}',
+        ]
+        report = self.platform.register_products_bulk(records, batch_size=2)
+
+        assert report.imported == 2
+        assert [error.row for error in report.errors] == [2, 3, 4]
+        assert self.platform.get_product("P012").stock == 2
+        assert len(self.platform.get_all_products()) == 3
+
+    def test_register_users_bulk(self):
+        """Test bulk user import creates carts."""
+        records = [
+            {"user_id": f"U{i:03d}", "username": "u",
+             "email": "u@example.com"}
+            for i in range(10)
+        ]
+        report = self.platform.register_users_bulk(records, batch_size=3)
+        assert report.imported == 10
+        assert report.failed == 0
+        assert self.platform.get_cart("U009").is_empty() is True
+
+    def test_register_bulk_invalid_batch_size(self):
+        """Test that non-positive batch size raises ValueError."""
+        with pytest.raises(ValueError):
+            self.platform.register_products_bulk([], batch_size=0)
+
+    def test_search_products(self):
+        """Test searching the platform catalog."""
+        self.platform.register_product(self.product1)
+        self.platform.register_product(self.product2)
+        products = self.platform.search_products(query="mou")
+        assert [p.product_id for p in products] == ["P002"]
+        products = self.platform.search_products(sort="-price", limit=1)
+        assert [p.product_id for p in products] == ["P001"]
+
+    def test_get_orders_by_status(self):
+        """Test that per-status order sets follow transitions."""
+        self.platform.register_product(self.product2)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+        for _ in range(4):
+            self.platform.add_to_cart("U001", "P002", 1)
+            self.platform.checkout("U001")
+
+        self.platform.update_order_status("ORD-000002", OrderStatus.CONFIRMED)
+        self.platform.update_order_status("ORD-000004", OrderStatus.CONFIRMED)
+
+        pending = self.platform.get_orders_by_status(OrderStatus.PENDING)
+        assert [o.order_id for o in pending] == ["ORD-000001", "ORD-000003"]
+        confirmed = self.platform.get_orders_by_status(
+            OrderStatus.CONFIRMED, limit=1
+        )
+        assert [o.order_id for o in confirmed] == ["ORD-000002"]
+        confirmed = self.platform.get_orders_by_status(
+            OrderStatus.CONFIRMED, after_order_id="ORD-000002"
+        )
+        assert [o.order_id for o in confirmed] == ["ORD-000004"]
+        assert self.platform.count_orders_by_status(OrderStatus.SHIPPED) == 0
+
+    def test_get_orders_by_status_after_moved_order(self):
+        """Test paging after the cursor order changed its status."""
+        self.platform.register_product(self.product2)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+        for _ in range(4):
+            self.platform.add_to_cart("U001", "P002", 1)
+            self.platform.checkout("U001")
+
+        page = self.platform.get_orders_by_status(OrderStatus.PENDING, limit=2)
+        for order in page:
+            self.platform.update_order_status(
+                order.order_id, OrderStatus.CONFIRMED
+            )
+        rest = self.platform.get_orders_by_status(
+            OrderStatus.PENDING, after_order_id=page[-1].order_id
+        )
+        assert [o.order_id for o in rest] == ["ORD-000003", "ORD-000004"]
+        with pytest.raises(ValueError):
+            self.platform.get_orders_by_status(
+                OrderStatus.PENDING, after_order_id="ORD-999999"
+            )
+
+    def test_update_order_status_rejects_illegal_transition(self):
+        """Test that platform refuses illegal status changes."""
+        self.platform.register_product(self.product1)
+        self.platform.register_user(self.user)
+        self.user.set_address("123 Main St")
+        self.platform.add_to_cart("U001", "P001", 1)
+        order = self.platform.checkout("U001")
+
+        self.platform.update_order_status(
+            order.order_id, OrderStatus.CANCELLED
+        )
+        assert self.platform.update_order_status(
+            order.order_id, OrderStatus.PENDING
+        ) is False
+        assert order.status == OrderStatus.CANCELLED
+        assert self.platform.count_orders_by_status(OrderStatus.PENDING) == 0
+        assert self.platform.count_orders_by_status(
+            OrderStatus.CANCELLED
+        ) == 1
@@ -0,0 +1,249 @@
+"""Unit tests for event log storage module."""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition, Event, Thread, current_thread
+
+import pytest
+
+from src.cart import CartOperation
+from src.ecommerce import ECommercePlatform, OrderStatus
+from src.event_log import EventLogStorage, RecordReader, encode_cart_item
+from src.product import Product
+from src.user import User
+
+
+class TestEventLogStorage:
+    """Test cases for EventLogStorage backend."""
+
+    def open_platform(self, directory, **options):
+        """Create a platform backed by an event log in the directory."""
+        storage = EventLogStorage(directory, fsync=False, **options)
+        return ECommercePlatform(storage=storage), storage
+
+    def seed(self, platform):
+        """Register products and a user with an address."""
+        platform.register_product(Product("P001", "Laptop", 999.99, 10))
+        platform.register_product(Product("P002", "Mouse", 29.99, 50))
+        platform.register_user(User("U001", "john_doe", "john@example.com"))
+        platform.register_user(User("U002", "anna", "anna@example.com"))
+        platform.set_user_address("U001", "123 Main St")
+
+    def test_state_survives_restart(self, tmp_path):
+        """Test replaying every kind of event after a restart."""
+        platform, storage = self.open_platform(tmp_path)
+        self.seed(platform)
+        platform.add_to_cart("U001", "P001", 2)
+        order = platform.checkout("U001")
+        platform.update_order_status(order.order_id, OrderStatus.SHIPPED)
+        platform.add_to_cart("U001", "P002", 3)
+        platform.add_to_cart("U002", "P001", 1)
+        platform.remove_from_cart("U002", "P001")
+        platform.restock("P002", 5)
+        storage.close()
+
+        restored, storage = self.open_platform(tmp_path)
+        assert restored.get_product("P001").stock == 8
+        assert restored.get_product("P002").stock == 55
+        assert restored.get_user("U001").address == "123 Main St"
+        restored_order = restored.get_order(order.order_id)
+        assert restored_order.status.value == "shipped"
+        assert restored_order.version == order.version
+        assert restored_order.creation_date == order.creation_date
+        assert restored_order.total_price == order.total_price
+        cart = restored.get_cart("U001")
+        assert [(p.product_id, q) for p, q in cart.get_items()] == [
+            ("P002", 3)
+        ]
+        assert restored.get_cart("U002").is_empty()
+
+        restored.add_to_cart("U001", "P001", 1)
+        assert restored.checkout("U001").order_id == "ORD-000002"
+        storage.close()
+
+    def test_cart_batch_is_logged(self, tmp_path):
+        """Test that applied cart batches are replayed."""
+        platform, storage = self.open_platform(tmp_path)
+        self.seed(platform)
+        platform.apply_cart_batch("U002", [
+            CartOperation("add", "P001", 2),
+            CartOperation("add", "P002", 1),
+            CartOperation("remove", "P002"),
+        ])
+        storage.close()
+
+        restored, storage = self.open_platform(tmp_path)
+        items = restored.get_cart("U002").get_items()
+        assert [(p.product_id, q) for p, q in items] == [("P001", 2)]
+        storage.close()
+
+    def test_snapshot_replaces_old_segments(self, tmp_path):
+        """Test that a snapshot compacts the log it covers."""
+        platform, storage = self.open_platform(tmp_path)
+        self.seed(platform)
+        for _ in range(3):
+            platform.add_to_cart("U001", "P002", 1)
+            platform.checkout("U001")
+        storage.snapshot()
+        platform.add_to_cart("U001", "P001", 1)
+        storage.close()
+
+        names = sorted(path.name for path in tmp_path.iterdir())
+        assert names == ["log-00000001.bin", "snapshot-00000001.bin"]
+        segment = (tmp_path / "log-00000001.bin").read_bytes()
+        assert len(list(RecordReader(segment))) == 1
+
+        restored, storage = self.open_platform(tmp_path)
+        assert restored.get_product("P002").stock == 47
+        assert len(restored.get_all_orders()) == 3
+        assert restored.get_cart("U001").get_quantity("P001") == 1
+        storage.close()
+
+    def test_periodic_snapshot(self, tmp_path):
+        """Test that compaction starts after the configured interval."""
+        platform, storage = self.open_platform(
+            tmp_path, snapshot_interval=10
+        )
+        self.seed(platform)
+        for _ in range(20):
+            platform.add_to_cart("U001", "P002", 1)
+            platform.remove_from_cart("U001", "P002")
+        storage.close()
+
+        assert list(tmp_path.glob("snapshot-*.bin"))
+        restored, storage = self.open_platform(tmp_path)
+        assert restored.get_cart("U001").is_empty()
+        assert len(restored.get_all_products()) == 2
+        storage.close()
+
+    def test_torn_tail_is_truncated(self, tmp_path):
+        """Test recovery from a partially written last record."""
+        platform, storage = self.open_platform(tmp_path)
+        self.seed(platform)
+        storage.close()
+
+        segment = tmp_path / "log-00000000.bin"
+        valid_size = segment.stat().st_size
+        with open(segment, "ab") as log:
+            log.write(encode_cart_item("U001", "P001", 1)[:-3])
+
+        restored, storage = self.open_platform(tmp_path)
+        assert segment.stat().st_size == valid_size
+        assert restored.get_cart("U001").is_empty()
+        restored.add_to_cart("U001", "P001", 1)
+        storage.close()
+
+        restored, storage = self.open_platform(tmp_path)
+        assert restored.get_cart("U001").get_quantity("P001") == 1
+        storage.close()
+
+    def test_concurrent_appends_are_all_durable(self, tmp_path):
+        """Test group commit under concurrent writers."""
+        platform, storage = self.open_platform(tmp_path)
+        platform.register_product(Product("P001", "Laptop", 999.99, 100))
+        for number in range(50):
+            platform.register_user(
+                User(f"U{number:03d}", "user", "user@example.com")
+            )
+
+        def add(number):
+            return platform.add_to_cart(f"U{number:03d}", "P001", 1)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert all(executor.map(add, range(50)))
+        storage.close()
+
+        restored, storage = self.open_platform(tmp_path)
+        assert all(
+            restored.get_cart(f"U{number:03d}").get_quantity("P001") == 1
+            for number in range(50)
+        )
+        storage.close()
+
+    def test_recovers_after_failed_write(self, tmp_path):
+        """Test that a torn write fails once and later appends succeed."""
+        platform, storage = self.open_platform(tmp_path)
+        self.seed(platform)
+        write = storage._write
+
+        def fail_once(batch):
+            storage._write = write
+            storage._file.write(batch[:len(batch) // 2])
+            raise OSError("disk hiccup")
+
+        storage._write = fail_once
+        with pytest.raises(OSError):
+            platform.restock("P001", 5)
+        assert platform.restock("P002", 5) is True
+        storage.close()
+
+        restored, storage = self.open_platform(tmp_path)
+        assert restored.get_product("P001").stock == 10
+        assert restored.get_product("P002").stock == 55
+        storage.close()
+
+    def test_waiter_in_failed_group_is_not_told_success(self, tmp_path):
+        """Test that a later successful flush does not cover lost records."""
+        storage = EventLogStorage(tmp_path, fsync=False)
+        write = storage._write
+        writing, gate, waiting, resume = (Event() for _ in range(4))
+        writes = []
+
+        def scripted_write(batch):
+            writes.append(batch)
+            if len(writes) == 1:
+                writing.set()
+                gate.wait()
+            elif len(writes) == 2:
+                raise OSError("disk hiccup")
+            write(batch)
+
+        class SlowWaiter(Condition):
+            def wait(self, timeout=None):
+                if current_thread().name != "waiter":
+                    return super().wait(timeout)
+                self.release()
+                waiting.set()
+                resume.wait()
+                self.acquire()
+                return True
+
+        def save(product_id):
+            storage.save_products([Product(product_id, "Item", 1.0, 1)])
+
+        storage._write = scripted_write
+        storage._condition = SlowWaiter()
+        first = Thread(target=save, args=("P001",))
+        first.start()
+        writing.wait()
+        outcome = []
+
+        def wait_for_lost_record():
+            try:
+                save("P002")
+                outcome.append("ok")
+            except OSError:
+                outcome.append("error")
+
+        waiter = Thread(target=wait_for_lost_record, name="waiter")
+        waiter.start()
+        waiting.wait()
+        gate.set()
+        first.join()
+        with pytest.raises(OSError):
+            save("P003")
+        save("P004")
+        resume.set()
+        waiter.join()
+        storage.close()
+
+        assert outcome == ["error"]
+        storage = EventLogStorage(tmp_path, fsync=False)
+        assert [p.product_id for p in storage.load_products()] == [
+            "P001", "P004"
+        ]
+        storage.close()
+
+    def test_invalid_snapshot_interval(self, tmp_path):
+        """Test that the snapshot interval must be positive."""
+        with pytest.raises(ValueError):
+            EventLogStorage(tmp_path, snapshot_interval=0)
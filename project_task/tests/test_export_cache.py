@@ -0,0 +1,91 @@
+"""Unit tests for XML export cache module."""
+
+import pytest
+
+from src.export_cache import XmlExportCache
+
+class TestXmlExportCache:
+    """Test cases for XmlExportCache class."""
+
+    def test_put_and_get(self):
+        """Test storing and reading an export."""
+        cache = XmlExportCache()
+        etag, data = cache.put(("ORD-000001", "r1"), b"<order/>")
+        assert data == b"<order/>"
+        assert cache.get(("ORD-000001", "r1")) == (etag, b"<order/>")
+        assert cache.get(("ORD-000001", "r2")) is None
+
+    def test_etag_depends_on_content(self):
+        """Test that ETag is derived from the document content."""
+        cache = XmlExportCache()
+        first, _ = cache.put(("ORD-000001", "r1"), b"<order/>")
+        second, _ = cache.put(("ORD-000002", "r1"), b"<order/>")
+        third, _ = cache.put(("ORD-000001", "r2"), b"<order id='1'/>")
+        assert first == second
+        assert first != third
+
+    def test_evicts_least_recently_used_by_count(self):
+        """Test eviction when entry limit is exceeded."""
+        cache = XmlExportCache(max_entries=2)
+        cache.put(("A", "r1"), b"a")
+        cache.put(("B", "r1"), b"b")
+        cache.get(("A", "r1"))
+        cache.put(("C", "r1"), b"c")
+        assert ("A", "r1") in cache
+        assert ("B", "r1") not in cache
+        assert len(cache) == 2
+
+    def test_evicts_by_size(self):
+        """Test eviction when byte limit is exceeded."""
+        cache = XmlExportCache(max_bytes=10)
+        cache.put(("A", "r1"), b"aaaa")
+        cache.put(("B", "r1"), b"bbbb")
+        cache.put(("C", "r1"), b"cccc")
+        assert ("A", "r1") not in cache
+        assert cache.size_bytes == 8
+
+    def test_oversized_export_is_not_cached(self):
+        """Test that documents larger than the cache are not stored."""
+        cache = XmlExportCache(max_bytes=4)
+        etag, data = cache.put(("A", "r1"), b"too large")
+        assert etag and data == b"too large"
+        assert len(cache) == 0
+
+    def test_shares_files_between_instances(self, tmp_path):
+        """Test that another worker reads an export written to disk."""
+        XmlExportCache(directory=tmp_path).put(("A", "r1"), b"a")
+        other = XmlExportCache(directory=tmp_path)
+        assert other.get(("A", "r1"))[1] == b"a"
+        assert other.get(("A", "r2")) is None
+
+    def test_new_revision_replaces_file(self, tmp_path):
+        """Test that each order keeps a single file and memory entry."""
+        cache = XmlExportCache(directory=tmp_path)
+        cache.put(("A", "r1"), b"a")
+        cache.put(("A", "r2"), b"aa")
+        assert ("A", "r1") not in cache
+        assert len(cache) == 1 and cache.size_bytes == 2
+        assert [path.name for path in tmp_path.iterdir()] == ["A.export"]
+        assert XmlExportCache(directory=tmp_path).get(("A", "r1")) is None
+
+    def test_eviction_removes_file(self, tmp_path):
+        """Test that evicted exports are deleted from disk."""
+        cache = XmlExportCache(max_entries=1, directory=tmp_path)
+        cache.put(("A", "r1"), b"a")
+        cache.put(("B", "r1"), b"b")
+        assert [path.name for path in tmp_path.iterdir()] == ["B.export"]
+        assert cache.get(("A", "r1")) is None
+
+    def test_invalid_limits(self):
+        """Test that non-positive limits raise ValueError."""
+        with pytest.raises(ValueError):
+            XmlExportCache(max_entries=0)
+        with pytest.raises(ValueError):
+            XmlExportCache(max_bytes=0)
+
+    def test_keeps_files_on_start(self, tmp_path):
+        """Test that starting a worker does not delete shared exports."""
+        (tmp_path / "A.export").write_bytes(b"r1\na")
+        cache = XmlExportCache(directory=tmp_path)
+        assert cache.get(("A", "r1"))[1] == b"a"
+        assert cache.get(("A", "r2")) is None
@@ -0,0 +1,120 @@
+"""Unit tests for idempotency key module."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.idempotency import IdempotencyTable
+
+
+class TestIdempotencyTable:
+    """Test cases for IdempotencyTable class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.now = 0.0
+        self.table = IdempotencyTable(
+            max_entries=3, ttl=60, clock=lambda: self.now
+        )
+        self.calls = 0
+
+    def produce(self, value="ORD-000001"):
+        """Return a producer that counts its calls."""
+        def run():
+            self.calls += 1
+            return value
+        return run
+
+    def test_repeated_key_returns_first_result(self):
+        """Test that the producer runs once per key."""
+        assert self.table.run("a", self.produce("ORD-1")) == "ORD-1"
+        assert self.table.run("a", self.produce("ORD-2")) == "ORD-1"
+        assert self.calls == 1
+        assert self.table.get("a") == "ORD-1"
+
+    def test_failed_result_is_not_stored(self):
+        """Test that None results leave the key unclaimed."""
+        assert self.table.run("a", self.produce(None)) is None
+        assert "a" not in self.table
+        assert self.table.run("a", self.produce("ORD-1")) == "ORD-1"
+        assert self.calls == 2
+
+    def test_exception_releases_key(self):
+        """Test that a raising producer does not block the key."""
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            self.table.run("a", fail)
+        assert self.table.run("a", self.produce()) == "ORD-000001"
+
+    def test_entries_expire(self):
+        """Test that keys are forgotten after the TTL."""
+        self.table.run("a", self.produce())
+        self.now = 30
+        self.table.run("b", self.produce())
+        self.now = 60
+        assert self.table.get("a") is None
+        assert self.table.get("b") == "ORD-000001"
+        assert len(self.table) == 1
+
+    def test_table_is_bounded(self):
+        """Test that the oldest keys are evicted beyond the limit."""
+        for key in "abcd":
+            self.table.run(key, self.produce())
+        assert len(self.table) == 3
+        assert "a" not in self.table
+
+    def test_concurrent_same_key_runs_once(self):
+        """Test that concurrent callers wait for the first producer."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait()
+            self.calls += 1
+            return "ORD-1"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            first = executor.submit(self.table.run, "a", slow)
+            started.wait()
+            others = [
+                executor.submit(self.table.run, "a", slow) for _ in range(7)
+            ]
+            release.set()
+            results = [first.result()] + [f.result() for f in others]
+
+        assert results == ["ORD-1"] * 8
+        assert self.calls == 1
+
+    def test_running_key_is_never_evicted(self):
+        """Test that limits and TTL do not drop an in-flight claim."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait()
+            return "ORD-1"
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(self.table.run, "a", slow)
+            started.wait()
+            for key in "bcde":
+                self.table.run(key, self.produce())
+            self.now = 120
+            retry = executor.submit(self.table.run, "a", self.produce("X"))
+            release.set()
+            assert first.result() == "ORD-1"
+            assert retry.result() == "ORD-1"
+        assert self.calls == 4
+        assert self.table.get("a") == "ORD-1"
+
+    def test_invalid_arguments(self):
+        """Test validation of table limits."""
+        with pytest.raises(ValueError):
+            IdempotencyTable(max_entries=0)
+        with pytest.raises(ValueError):
+            IdempotencyTable(ttl=0)
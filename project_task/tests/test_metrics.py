@@ -0,0 +1,150 @@
+"""Unit tests for metrics module."""
+
+import random
+
+import pytest
+
+from src.metrics import (
+    BUCKET_COUNT, MAX_TRACKED_NS, Histogram, MetricsRegistry,
+    bucket_index, bucket_upper_bound
+)
+
+
+class TestHistogram:
+    """Test cases for Histogram class."""
+
+    def test_buckets_cover_values_in_order(self):
+        """Test that every value falls inside its bucket bounds."""
+        generator = random.Random(1)
+        values = list(range(1, 5000)) + [
+            generator.randrange(1, MAX_TRACKED_NS) for _ in range(10000)
+        ]
+        for value in values:
+            index = bucket_index(value)
+            assert bucket_upper_bound(index - 1) <= value
+            assert value < bucket_upper_bound(index)
+
+    def test_relative_error_is_bounded(self):
+        """Test that bucket width stays within about 3% of the value."""
+        for value in (100, 12_345, 987_654_321, MAX_TRACKED_NS - 1):
+            upper = bucket_upper_bound(bucket_index(value)) - 1
+            assert (upper - value) / value <= 1 / 32
+
+    def test_memory_is_fixed(self):
+        """Test that huge values are clamped into the last bucket."""
+        histogram = Histogram()
+        histogram.record(MAX_TRACKED_NS * 10)
+        histogram.record(-5)
+        counts, count, _ = histogram.snapshot()
+        assert len(counts) == BUCKET_COUNT
+        assert counts[-1] == 1 and counts[0] == 1
+        assert count == 2
+
+    def test_quantiles(self):
+        """Test quantiles of a uniform distribution."""
+        histogram = Histogram()
+        for value in range(1, 1001):
+            histogram.record(value * 1000)
+        assert histogram.quantile(0.5) == pytest.approx(500e-6, rel=0.04)
+        assert histogram.quantile(0.99) == pytest.approx(990e-6, rel=0.04)
+        assert Histogram().quantile(0.5) == 0.0
+        with pytest.raises(ValueError):
+            histogram.quantile(1.5)
+
+    def test_cumulative_buckets(self):
+        """Test folding samples into cumulative latency buckets."""
+        histogram = Histogram()
+        histogram.record(500)
+        histogram.record(3_000_000)
+        histogram.record(20 * 10 ** 9)
+        buckets, count, total_ns = histogram.cumulative()
+        assert buckets[0] == 1
+        assert buckets[-1] == 2
+        assert count == 3
+        assert total_ns == 20_003_000_500
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.registry = MetricsRegistry(enabled=True)
+
+    def test_timed_records_calls_and_errors(self):
+        """Test that decorated calls are timed and failures counted."""
+        @self.registry.timed
+        def work(fail=False):
+            if fail:
+                raise RuntimeError("boom")
+            return 42
+
+        assert work() == 42
+        with pytest.raises(RuntimeError):
+            work(fail=True)
+
+        qualname = work.__qualname__
+        histogram = self.registry.histogram(
+            "ecommerce_call_duration_seconds", "", function=qualname
+        )
+        errors = self.registry.counter(
+            "ecommerce_call_errors_total", "", function=qualname
+        )
+        assert histogram.count == 2
+        assert errors.value == 1
+
+    def test_disabled_registry_records_nothing(self):
+        """Test that a disabled registry only forwards calls."""
+        registry = MetricsRegistry(enabled=False)
+        work = registry.timed(lambda: 1, name="work")
+        assert work() == 1
+        with registry.time("block"):
+            pass
+        histogram = registry.histogram(
+            "ecommerce_call_duration_seconds", "", function="work"
+        )
+        assert histogram.count == 0
+        assert "block" not in registry.render()
+
+    def test_time_context_manager(self):
+        """Test timing a block of code."""
+        with self.registry.time("block"):
+            pass
+        histogram = self.registry.histogram(
+            "ecommerce_call_duration_seconds", "", function="block"
+        )
+        assert histogram.count == 1
+
+    def test_render_prometheus_text(self):
+        """Test the Prometheus exposition format."""
+        self.registry.observe_request("GET", "/api/products", 200, 2500)
+        self.registry.observe_request("GET", "/api/products", 404, 1500)
+        text = self.registry.render()
+        assert "# TYPE ecommerce_http_requests_total counter" in text
+        assert (
+            'ecommerce_http_requests_total{method="GET",'
+            'route="/api/products",status="200"} 1'
+        ) in text
+        assert "# TYPE ecommerce_http_request_duration_seconds histogram" in (
+            text
+        )
+        assert (
+            'ecommerce_http_request_duration_seconds_bucket{method="GET",'
+            'route="/api/products",le="5e-06"} 2'
+        ) in text
+        assert (
+            'ecommerce_http_request_duration_seconds_count{method="GET",'
+            'route="/api/products"} 2'
+        ) in text
+        assert text.endswith("\n")
+
+    def test_label_values_are_escaped(self):
+        """Test escaping quotes and backslashes in label values."""
+        self.registry.counter("hits_total", "Hits.", path='a"b\\c').inc()
+        assert 'hits_total{path="a\\"b\\\\c"} 1' in self.registry.render()
+
+    def test_kind_mismatch(self):
+        """Test that a name cannot be reused for another metric type."""
+        self.registry.counter("requests", "Requests.")
+        with pytest.raises(ValueError):
+            self.registry.histogram("requests", "Requests.")
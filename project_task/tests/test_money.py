@@ -0,0 +1,22 @@
+"""Unit tests for money helpers."""
+
+from src.money import from_minor_units, to_minor_units
+
+class TestMoney:
+    """Test cases for minor unit conversion."""
+
+    def test_to_minor_units(self):
+        """Test converting prices to minor units."""
+        assert to_minor_units(999.99) == 99999
+        assert to_minor_units(0.1) == 10
+        assert to_minor_units(5) == 500
+
+    def test_to_minor_units_rounds_half_up(self):
+        """Test that half a minor unit is rounded up."""
+        assert to_minor_units(0.285) == 29
+        assert to_minor_units(1.005) == 101
+
+    def test_from_minor_units(self):
+        """Test converting minor units back to prices."""
+        assert from_minor_units(99999) == 999.99
+        assert from_minor_units(0) == 0
@@ -1,8 +1,13 @@
 """Unit tests for Order module."""
 
+from xml.dom import minidom
+from xml.etree.ElementTree import fromstring, tostring
+
 import pytest
 
-from src.order import Order, OrderStatus
+from src.order import (
+    Order, OrderLine, OrderStatus, iter_orders_xml, write_orders_xml
+)
 from src.product import Product
 from src.user import User
 
@@ -71,3 +76,96 @@ class TestOrder:
         assert "ORD-000001" in repr_str
         assert "john_doe" in repr_str
         assert "pending" in repr_str
+
+    def test_order_xml_matches_pretty_printed_tree(self):
+        """Test that streamed XML equals the minidom pretty print."""
+        self.user.set_address('Flat 3 <"A"> & Co')
+        product = Product("P003", "Cable & <Adapter>", 9.5, 5)
+        order = Order("ORD-000001", self.user, self.items + [(product, 3)])
+
+        chunks = list(order.iter_xml())
+        assert len(chunks) > 1
+
+        tree = fromstring("".join(chunks[1:]))
+        for element in tree.iter():
+            if element.text and not element.text.strip():
+                element.text = None
+            element.tail = None
+        expected = minidom.parseString(
+            tostring(tree, encoding="unicode")
+        ).toprettyxml(indent="  ")
+        assert order.to_xml() == expected
+
+    def test_orders_bulk_xml(self, tmp_path):
+        """Test exporting several orders into one XML document."""
+        orders = [
+            Order("ORD-000001", self.user, self.items),
+            Order("ORD-000002", self.user, [(self.product2, 4)]),
+        ]
+        file_path = tmp_path / "orders.xml"
+        write_orders_xml(iter(orders), str(file_path))
+
+        root = fromstring(file_path.read_text(encoding="utf-8"))
+        assert root.tag == "orders"
+        assert [o.get("id") for o in root] == ["ORD-000001", "ORD-000002"]
+        assert root[1].find("items/item/quantity").text == "4"
+
+    def test_orders_bulk_xml_empty(self):
+        """Test bulk XML export without any orders."""
+        xml_string = "".join(iter_orders_xml([]))
+        assert fromstring(xml_string.split("\n", 1)[1]).tag == "orders"
+
+    def test_update_status_bumps_version(self):
+        """Test that every status change creates a new order version."""
+        order = Order("ORD-000001", self.user, self.items)
+        assert order.version == 1
+        order.update_status(OrderStatus.CONFIRMED)
+        assert order.version == 2
+
+    def test_order_stores_compact_lines(self):
+        """Test that order lines are records, not live products."""
+        order = Order("ORD-000001", self.user, self.items)
+        line = order.items[0]
+        assert line.product_id == "P001"
+        assert line.name == "Laptop"
+        assert line.unit_price == 999.99
+        assert line.quantity == 2
+        assert line.total_price == pytest.approx(1999.98)
+        assert not hasattr(order, "__dict__")
+
+    def test_order_keeps_prices_from_creation_time(self):
+        """Test that later price changes do not affect the order."""
+        order = Order("ORD-000001", self.user, self.items)
+        self.product1.price = 1.0
+        self.product2.name = "Renamed"
+
+        assert order.total_price == 2029.97
+        assert order.items[0].unit_price == 999.99
+        xml_string = order.to_xml()
+        assert "<unit_price>999.99</unit_price>" in xml_string
+        assert "<product_name>Mouse</product_name>" in xml_string
+
+    def test_order_accepts_line_snapshots(self):
+        """Test creating an order from existing line snapshots."""
+        lines = [OrderLine.snapshot(self.product2, 3)]
+        order = Order("ORD-000002", self.user, lines)
+        assert order.items == tuple(lines)
+        assert order.total_price == 89.97
+
+    def test_illegal_status_transition(self):
+        """Test that orders cannot move backwards in the workflow."""
+        order = Order("ORD-000001", self.user, self.items)
+        order.update_status(OrderStatus.SHIPPED)
+        order.update_status(OrderStatus.DELIVERED)
+        assert order.can_transition_to(OrderStatus.PENDING) is False
+        with pytest.raises(ValueError):
+            order.update_status(OrderStatus.PENDING)
+        assert order.status == OrderStatus.DELIVERED
+        assert order.version == 3
+
+    def test_cancelled_order_is_final(self):
+        """Test that cancelled orders cannot be reopened."""
+        order = Order("ORD-000001", self.user, self.items)
+        order.update_status(OrderStatus.CANCELLED)
+        for status in OrderStatus:
+            assert order.can_transition_to(status) is False
@@ -25,6 +25,14 @@ class TestProduct:
         with pytest.raises(ValueError):
             Product("P001", "Laptop", 999.99, -5)
 
+    def test_available_excludes_reserved(self):
+        """Test that reserved units are not available."""
+        product = Product("P001", "Laptop", 999.99, 10)
+        assert product.reserved == 0
+        assert product.available == 10
+        product.reserved = 4
+        assert product.available == 6
+
     def test_decrease_stock_successful(self):
         """Test successful stock decrease."""
         product = Product("P001", "Laptop", 999.99, 10)
@@ -54,3 +62,10 @@ class TestProduct:
         product = Product("P001", "Laptop", 999.99, 10)
         assert "P001" in repr(product)
         assert "Laptop" in repr(product)
+
+    def test_product_has_no_instance_dict(self):
+        """Test that product uses slots."""
+        product = Product("P001", "Laptop", 999.99, 10)
+        assert not hasattr(product, "__dict__")
+        with pytest.raises(AttributeError):
+            product.color = "black"
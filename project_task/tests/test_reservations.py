@@ -0,0 +1,94 @@
+"""Unit tests for stock reservation module."""
+
+import pytest
+
+from src.product import Product
+from src.reservations import ReservationBook
+
+
+class TestReservationBook:
+    """Test cases for ReservationBook class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.now = 0.0
+        self.book = ReservationBook(ttl=60, clock=lambda: self.now)
+        self.product = Product("P001", "Laptop", 999.99, 10)
+
+    def test_hold_reserves_stock(self):
+        """Test that a hold moves units from available to reserved."""
+        assert self.book.hold("U001", self.product, 4) is True
+        assert self.product.reserved == 4
+        assert self.product.available == 6
+        assert self.book.held("U001", "P001") == 4
+
+    def test_hold_cannot_exceed_available(self):
+        """Test that holds never exceed unreserved stock."""
+        self.book.hold("U001", self.product, 7)
+        assert self.book.hold("U002", self.product, 4) is False
+        assert self.book.available_for("U002", self.product) == 3
+        assert self.book.available_for("U001", self.product) == 10
+        assert self.book.hold("U001", self.product, 10) is True
+
+    def test_hold_replaces_quantity(self):
+        """Test growing, shrinking and dropping an existing hold."""
+        self.book.hold("U001", self.product, 5)
+        self.book.hold("U001", self.product, 2)
+        assert self.product.reserved == 2
+        self.book.hold("U001", self.product, 0)
+        assert self.product.reserved == 0
+        assert len(self.book) == 0
+
+    def test_release(self):
+        """Test releasing a hold explicitly."""
+        self.book.hold("U001", self.product, 5)
+        assert self.book.release("U001", "P001") == 5
+        assert self.book.release("U001", "P001") == 0
+        assert self.product.reserved == 0
+
+    def test_expired_holds_are_released_lazily(self):
+        """Test that holds lapse once their TTL has passed."""
+        self.book.hold("U001", self.product, 5)
+        self.now = 30
+        self.book.hold("U002", self.product, 3)
+        self.now = 60
+        assert self.book.release_expired() == 1
+        assert self.product.reserved == 3
+        assert self.book.held("U001", "P001") == 0
+        self.now = 90
+        assert self.book.held("U002", "P001") == 0
+        assert self.product.reserved == 0
+
+    def test_renewed_hold_outlives_first_deadline(self):
+        """Test that updating a hold restarts its TTL."""
+        self.book.hold("U001", self.product, 5)
+        self.now = 50
+        self.book.hold("U001", self.product, 6)
+        self.now = 100
+        assert self.book.release_expired() == 0
+        assert self.book.held("U001", "P001") == 6
+        self.now = 110
+        assert self.book.release_expired() == 1
+
+    def test_stale_expiry_entries_are_compacted(self):
+        """Test that renewing holds does not grow the expiry heap forever."""
+        for step in range(5000):
+            self.now = step * 0.001
+            self.book.hold("U001", self.product, 1 + step % 5)
+        assert len(self.book._expiry) < 2048
+        assert self.product.reserved == 5
+
+    def test_consume(self):
+        """Test that consuming a hold decreases stock."""
+        self.book.hold("U001", self.product, 3)
+        self.book.consume("U001", [(self.product, 3)])
+        assert self.product.stock == 7
+        assert self.product.reserved == 0
+        assert len(self.book) == 0
+
+    def test_invalid_arguments(self):
+        """Test validation of TTL and quantity."""
+        with pytest.raises(ValueError):
+            ReservationBook(ttl=0)
+        with pytest.raises(ValueError):
+            self.book.hold("U001", self.product, -1)
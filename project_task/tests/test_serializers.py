@@ -0,0 +1,104 @@
+"""Unit tests for serializers module."""
+
+import json
+
+import pytest
+
+from src import serializers
+from src.cart import Cart
+from src.order import Order, OrderStatus
+from src.product import Product
+from src.user import User
+
+class TestSerializers:
+    """Test cases for JSON serialization layer."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        serializers.fragment_cache.clear()
+        self.product = Product("P001", "Laptop", 999.99, 10)
+        self.user = User("U001", "john_doe", "john@example.com")
+        self.user.set_address("123 Main St")
+        self.order = Order("ORD-000001", self.user, [(self.product, 2)])
+
+    def test_encode_product(self):
+        """Test encoding a product."""
+        assert json.loads(serializers.encode_product(self.product)) == {
+            "product_id": "P001",
+            "name": "Laptop",
+            "price": 999.99,
+            "stock": 10,
+            "available": 10,
+        }
+
+    def test_encode_user(self):
+        """Test encoding a user."""
+        data = json.loads(serializers.encode_user(self.user))
+        assert data["username"] == "john_doe"
+        assert data["address"] == "123 Main St"
+
+    def test_encode_order(self):
+        """Test encoding an order."""
+        data = json.loads(serializers.encode_order(self.order))
+        assert data["order_id"] == "ORD-000001"
+        assert data["status"] == "pending"
+        assert data["items"] == [{
+            "product_id": "P001",
+            "name": "Laptop",
+            "price": 999.99,
+            "quantity": 2,
+        }]
+
+    def test_cart_to_dict(self):
+        """Test converting a cart to a dict."""
+        cart = Cart("U001")
+        cart.add_item(self.product, 3)
+        data = serializers.cart_to_dict(cart)
+        assert data["items"][0]["quantity"] == 3
+        assert data["total"] == pytest.approx(999.99 * 3)
+
+    def test_unchanged_object_reuses_fragment(self):
+        """Test that encoded payloads are reused for unchanged objects."""
+        first = serializers.encode_product(self.product)
+        assert serializers.encode_product(self.product) is first
+
+        self.product.decrease_stock(1)
+        changed = serializers.encode_product(self.product)
+        assert changed is not first
+        assert json.loads(changed)["stock"] == 9
+
+    def test_order_fragment_changes_with_version(self):
+        """Test that order status change invalidates its fragment."""
+        first = serializers.encode_order(self.order)
+        self.order.update_status(OrderStatus.CONFIRMED)
+        changed = serializers.encode_order(self.order)
+        assert changed is not first
+        assert json.loads(changed)["status"] == "confirmed"
+
+    def test_encode_list(self):
+        """Test wrapping fragments into a list envelope."""
+        body = serializers.encode_list(
+            "products",
+            [serializers.encode_product(self.product)],
+            next_cursor=None,
+        )
+        data = json.loads(body)
+        assert data["next_cursor"] is None
+        assert data["products"][0]["product_id"] == "P001"
+
+    def test_stdlib_fallback(self, monkeypatch):
+        """Test encoding without the optional orjson backend."""
+        monkeypatch.setattr(serializers, "orjson", None)
+        body = serializers.dumps({"name": "Klawiatura ł", "price": 1.5})
+        assert json.loads(body.decode("utf-8")) == {
+            "name": "Klawiatura ł", "price": 1.5
+        }
+
+    def test_fragment_cache_is_bounded(self):
+        """Test that fragment cache evicts old entries."""
+        cache = serializers.FragmentCache(max_entries=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.put("c", b"3")
+        assert len(cache) == 2
+        assert cache.get("a") is None
@@ -0,0 +1,90 @@
+"""Unit tests for status index module."""
+
+from src import status_index
+from src.status_index import SortedOrderSet
+
+class TestSortedOrderSet:
+    """Test cases for SortedOrderSet class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.orders = SortedOrderSet()
+        for number in range(1, 6):
+            self.orders.add(number, f"ORD-{number:06d}")
+
+    def test_page_in_sequence_order(self):
+        """Test paging from the start with a cursor."""
+        assert self.orders.page(2) == ["ORD-000001", "ORD-000002"]
+        assert self.orders.page(2, 2) == ["ORD-000003", "ORD-000004"]
+        assert self.orders.page(10, 5) == []
+
+    def test_remove(self):
+        """Test removing first, middle and last entries."""
+        self.orders.remove(1)
+        self.orders.remove(3)
+        self.orders.remove(5)
+        assert self.orders.page(10) == ["ORD-000002", "ORD-000004"]
+        assert len(self.orders) == 2
+        assert 3 not in self.orders
+        self.orders.add(6, "ORD-000006")
+        assert self.orders.page(10, 4) == ["ORD-000006"]
+
+    def test_remove_all(self):
+        """Test emptying the set and adding again."""
+        for number in range(1, 6):
+            self.orders.remove(number)
+        assert self.orders.page(10) == []
+        self.orders.add(7, "ORD-000007")
+        assert self.orders.page(10) == ["ORD-000007"]
+
+    def test_add_keeps_sequence_order(self):
+        """Test that re-added entries return to their original place."""
+        self.orders.remove(2)
+        self.orders.add(2, "ORD-000002")
+        assert self.orders.page(3) == [
+            "ORD-000001", "ORD-000002", "ORD-000003"
+        ]
+
+    def test_add_is_idempotent(self):
+        """Test that adding an existing sequence does not duplicate it."""
+        self.orders.add(1, "ORD-000001")
+        assert len(self.orders) == 5
+
+    def test_cursor_survives_removal(self):
+        """Test paging after a sequence that is no longer in the set."""
+        self.orders.remove(2)
+        assert self.orders.page(2, 2) == ["ORD-000003", "ORD-000004"]
+
+    def test_many_blocks(self, monkeypatch):
+        """Test adds, removes and paging across split and joined blocks."""
+        monkeypatch.setattr(status_index, "BLOCK_SIZE", 4)
+        orders = SortedOrderSet()
+        expected = set()
+        for number in [*range(0, 200, 2), *range(199, 0, -2)]:
+            orders.add(number, f"ORD-{number:06d}")
+            expected.add(number)
+        for number in [*range(0, 150, 3), *range(190, 120, -1)]:
+            if number in expected:
+                orders.remove(number)
+                expected.remove(number)
+
+        remaining = [f"ORD-{number:06d}" for number in sorted(expected)]
+        assert len(orders) == len(expected)
+        assert orders.page(1000) == remaining
+        assert orders.page(7, 100) == [
+            f"ORD-{number:06d}"
+            for number in sorted(n for n in expected if n > 100)[:7]
+        ]
+        pages = []
+        cursor = None
+        while True:
+            page = orders.page(5, cursor)
+            if not page:
+                break
+            pages.extend(page)
+            cursor = int(page[-1][4:])
+        assert pages == remaining
+        assert all(
+            0 < len(block) <= 8 for block in orders._blocks
+        )
+        assert orders._maxes == [block[-1] for block in orders._blocks]
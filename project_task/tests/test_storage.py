@@ -0,0 +1,195 @@
+"""Unit tests for storage module."""
+
+import pytest
+
+from src.ecommerce import ECommercePlatform, OrderStatus
+from src.product import Product
+from src.storage import InMemoryStorage, SQLiteStorage
+from src.user import User
+
+class TestSQLiteStorage:
+    """Test cases for SQLiteStorage backend."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.products = [
+            Product("P001", "Laptop", 999.99, 10),
+            Product("P002", "Mouse", 29.99, 50),
+        ]
+        self.user = User("U001", "john_doe", "john@example.com")
+        self.user.set_address("123 Main St")
+
+    def open_platform(self, database):
+        """Create a platform backed by the given database file."""
+        return ECommercePlatform(storage=SQLiteStorage(str(database)))
+
+    def seed(self, platform):
+        """Register fixtures on the platform."""
+        for product in self.products:
+            platform.register_product(product)
+        platform.register_user(self.user)
+
+    def test_uses_wal_journal(self, tmp_path):
+        """Test that the database runs in WAL mode."""
+        storage = SQLiteStorage(str(tmp_path / "shop.db"))
+        mode = storage._connection.execute("PRAGMA journal_mode").fetchone()
+        assert mode[0] == "wal"
+        storage.close()
+
+    def test_products_and_users_survive_restart(self, tmp_path):
+        """Test that registered data is loaded on start-up."""
+        platform = self.open_platform(tmp_path / "shop.db")
+        self.seed(platform)
+        platform.set_user_address("U001", "456 Side St")
+        platform.close()
+
+        restarted = self.open_platform(tmp_path / "shop.db")
+        assert len(restarted.get_all_products()) == 2
+        assert restarted.get_product("P002").price == 29.99
+        assert restarted.get_user("U001").address == "456 Side St"
+        restarted.close()
+
+    def test_checkout_survives_restart(self, tmp_path):
+        """Test that orders, lines and stock are persisted."""
+        platform = self.open_platform(tmp_path / "shop.db")
+        self.seed(platform)
+        platform.add_to_cart("U001", "P001", 2)
+        platform.add_to_cart("U001", "P002", 1)
+        order = platform.checkout("U001")
+        platform.update_order_status(order.order_id, OrderStatus.CONFIRMED)
+        platform.close()
+
+        restarted = self.open_platform(tmp_path / "shop.db")
+        restored = restarted.get_order(order.order_id)
+        assert restored.status.value == "confirmed"
+        assert restored.version == 2
+        assert restored.creation_date == order.creation_date
+        assert restored.items == order.items
+        assert restored.total_price == order.total_price
+        assert restarted.get_product("P001").stock == 8
+        assert restarted.get_user_orders("U001") == [restored]
+
+        restarted.add_to_cart("U001", "P002", 1)
+        assert restarted.checkout("U001").order_id == "ORD-000002"
+        restarted.close()
+
+    def test_checkout_checks_stock_in_database(self, tmp_path):
+        """Test that two platforms sharing a database cannot oversell."""
+        first = self.open_platform(tmp_path / "shop.db")
+        self.seed(first)
+        second = self.open_platform(tmp_path / "shop.db")
+        other = User("U002", "anna", "anna@example.com")
+        other.set_address("456 Side St")
+        second.register_user(other)
+
+        first.add_to_cart("U001", "P001", 6)
+        second.add_to_cart("U002", "P001", 6)
+        assert first.checkout("U001") is not None
+        assert second.checkout("U002") is None
+        assert second.get_product("P001").stock == 4
+        assert second.get_cart("U002").is_empty() is False
+        first.close()
+        second.close()
+
+    def test_order_ids_are_shared_between_platforms(self, tmp_path):
+        """Test that platforms on one database never reuse order ids."""
+        first = self.open_platform(tmp_path / "shop.db")
+        self.seed(first)
+        second = self.open_platform(tmp_path / "shop.db")
+
+        first.add_to_cart("U001", "P001", 1)
+        second.add_to_cart("U001", "P002", 1)
+        assert first.checkout("U001").order_id == "ORD-000001"
+        assert second.checkout("U001").order_id == "ORD-000002"
+        assert second.get_product("P001").stock == 10
+        first.close()
+        second.close()
+
+        restarted = self.open_platform(tmp_path / "shop.db")
+        assert len(restarted.get_all_orders()) == 2
+        restarted.close()
+
+    def test_checkout_refreshes_stock_from_database(self, tmp_path):
+        """Test that stale in-memory stock does not block a checkout."""
+        first = self.open_platform(tmp_path / "shop.db")
+        self.seed(first)
+        second = self.open_platform(tmp_path / "shop.db")
+
+        first.add_to_cart("U001", "P001", 10)
+        assert first.checkout("U001") is not None
+        assert second.restock("P001", 3)
+        assert second.get_product("P001").stock == 3
+
+        first.add_to_cart("U001", "P001", 1)
+        assert first.checkout("U001") is not None
+        assert first.get_product("P001").stock == 2
+        first.close()
+        second.close()
+
+    def test_registration_does_not_overwrite_other_platform(self, tmp_path):
+        """Test that an id registered by another platform is rejected."""
+        first = self.open_platform(tmp_path / "shop.db")
+        second = self.open_platform(tmp_path / "shop.db")
+        self.seed(first)
+
+        assert second.register_product(
+            Product("P001", "Copy", 1.0, 99)
+        ) is False
+        assert second.register_user(
+            User("U001", "someone", "someone@example.com")
+        ) is False
+        report = second.register_products_bulk([
+            {"product_id": "P002", "name": "Copy", "price": 1, "stock": 99},
+            {"product_id": "P003", "name": "Cable", "price": 5, "stock": 7},
+        ])
+        assert (report.imported, report.failed) == (1, 1)
+        assert report.errors[0].row == 1
+        first.close()
+        second.close()
+
+        restarted = self.open_platform(tmp_path / "shop.db")
+        assert restarted.get_product("P001").name == "Laptop"
+        assert restarted.get_product("P001").stock == 10
+        assert restarted.get_product("P002").stock == 50
+        assert restarted.get_user("U001").username == "john_doe"
+        assert restarted.get_product("P003").stock == 7
+        restarted.close()
+
+    def test_sees_data_registered_by_other_platform(self, tmp_path):
+        """Test that products and users are looked up in the database."""
+        first = self.open_platform(tmp_path / "shop.db")
+        second = self.open_platform(tmp_path / "shop.db")
+        self.seed(first)
+
+        assert second.get_product("P001").name == "Laptop"
+        assert second.get_user("U001").address == "123 Main St"
+        assert second.add_to_cart("U001", "P002", 2)
+        assert second.checkout("U001") is not None
+        assert second.get_product("P404") is None
+        assert second.add_to_cart("U404", "P001", 1) is False
+        first.close()
+        second.close()
+
+    def test_batched_product_writes(self, tmp_path):
+        """Test saving more products than one batch."""
+        storage = SQLiteStorage(str(tmp_path / "shop.db"), batch_size=7)
+        storage.save_products(
+            Product(f"P{i:03d}", "Item", 1.0, i) for i in range(50)
+        )
+        assert len(list(storage.load_products())) == 50
+        storage.close()
+
+    def test_invalid_batch_size(self, tmp_path):
+        """Test that non-positive batch size raises ValueError."""
+        with pytest.raises(ValueError):
+            SQLiteStorage(str(tmp_path / "shop.db"), batch_size=0)
+
+
+class TestInMemoryStorage:
+    """Test cases for InMemoryStorage backend."""
+
+    def test_starts_empty(self):
+        """Test that in-memory platform starts without data."""
+        platform = ECommercePlatform(storage=InMemoryStorage())
+        assert platform.get_all_products() == []
+        assert platform.get_all_orders() == []
@@ -43,3 +43,8 @@ class TestUser:
         user = User("U001", "john_doe", "john@example.com")
         assert "U001" in repr(user)
         assert "john_doe" in repr(user)
+
+    def test_user_has_no_instance_dict(self):
+        """Test that user uses slots."""
+        user = User("U001", "john_doe", "john@example.com")
+        assert not hasattr(user, "__dict__")